@@ -14,6 +14,8 @@ from .TestRun import TestRun
 from ipet.concepts.Manager import Manager
 from ipet.misc.integrals import calcIntegralValue, getProcessPlotData
 from ipet.parsing.ReaderManager import ReaderManager
+from ipet.parsing.ParseSession import ParseSession
+from ipet.parsing.LogArchive import LogArchive
 
 import pandas as pd
 import pickle
@@ -48,6 +50,8 @@ class Experiment:
         self.gaptol = gaptol
         self.validatedual = validatedual
         self.joineddata = None
+        self.joinedsources = []
+        self.joinedrequest = None
 
     def set_gaptol(self, gaptol : float):
         """
@@ -70,9 +74,22 @@ class Experiment:
         If a file with an unrecognized file extension is passed to this method, a ValueError is raised.
 
         For a list of allowed file extensions, see ipet.parsing.ReaderManager.
+
+        Members of tar or zip archives are specified as 'archive::member'. An archive itself is
+        expanded into all its members with allowed file extensions.
+
+        A directory is parsed as a log file, in which every file of the directory is a problem named after the file.
         """
+        if LogArchive.isArchive(filename):
+            extensions = [extension for extension in self.readermanager.getFileExtensions() if extension]
+            for membername in LogArchive(filename).getMemberFilenames(extensions):
+                self.addOutputFile(membername)
+            return
 
-        filebasename, fileextension = os.path.splitext(filename)
+        # compressed files are handled by the extension of the uncompressed file
+        filebasename, fileextension = os.path.splitext(misc.filenameStripCompression(filename))
+        if os.path.isdir(filename):
+            filebasename, fileextension = os.path.normpath(filename), ""
 
         if not fileextension in [TestRun.FILE_EXTENSION] + self.readermanager.getFileExtensions():
             raise ValueError("Experiment cannot handle extension '%s' of file '%s'" % (fileextension, filename))
@@ -177,16 +194,34 @@ class Experiment:
         except:
             raise ValueError("Error reading file name %s" % filename)
 
-    def collectData(self):
+    def collectData(self, evaluations = None):
         """ Iterate over log files and solu file and collect data via installed readers
+
+        Parameters
+        ----------
+        evaluations
+            optional list of evaluations. If specified, only the readers that can contribute data required
+            by at least one of the evaluations are used during this data collection.
         """
         testruns = self.getTestRuns()
 
-        for testrun in testruns:
-            self.readermanager.setTestRun(testrun)
-            testrun.setupForDataCollection()
-            testrun.setValidation(self.validation)
-            self.readermanager.collectData()
+        pruned = self.readermanager.pruneReaders(evaluations) if evaluations else []
+
+        try:
+            if self.readermanager.getNThreads() > 1 and len(testruns) > 1:
+                self.collectDataOnThreads(testruns)
+            else:
+                # archives are read in a single pass for all test runs
+                self.readermanager.openArchives([filename for testrun in testruns for filename in testrun.getSortedFilenames()])
+                for testrun in testruns:
+                    testrun.setupForDataCollection()
+                    testrun.setValidation(self.validation)
+                    session = self.readermanager.getSession(testrun)
+                    session.collectData()
+                    self.readermanager.mergeSession(session)
+        finally:
+            self.readermanager.closeArchives()
+            self.readermanager.activate(pruned)
 
         # TODO Is this calculated only for validation?
         self.makeProbNameList()
@@ -200,13 +235,33 @@ class Experiment:
         self.updateDatakeys()
         self.joineddata = None
 
+    def collectDataOnThreads(self, testruns):
+        """ Collect the data of several test runs at the same time on the threads of a thread pool
+
+        Every test run is parsed by its own session of the reader manager, see ReaderManager.getSession().
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        sessions = []
+        for testrun in testruns:
+            testrun.setupForDataCollection()
+            testrun.setValidation(self.validation)
+            sessions.append(self.readermanager.getSession(testrun))
+
+        with ThreadPoolExecutor(min(self.readermanager.getNThreads(), len(sessions))) as pool:
+            # exceptions of the sessions are raised here
+            list(pool.map(ParseSession.collectData, sessions))
+
+        for session in sessions:
+            self.readermanager.mergeSession(session)
+
     def getDatakeys(self):
         return self.datakeymanager.getAllRepresentations()
 
     def concatenateData(self):
         """ Concatenate data over all run TestRuns
         """
-        self.data = pd.concat([tr.data for tr in self.getTestRuns()])
+        self.data = pd.concat([tr.getData() for tr in self.getTestRuns()])
 
     def calculateGaps(self):
         """ Calculate and store primal and dual gap
@@ -234,12 +289,37 @@ class Experiment:
 
         this may result in nonunique index, the data is simply concatenated
         """
-        if self.joineddata is not None:
+        return self.getJoinedDataFor(None)
+
+    def getJoinedDataFor(self, datakeys, patterns = ()):
+        """ Concatenate the testrun data (possibly joined with external data) with only the needed table data
+
+        Lazy tables are only parsed if they can contribute one of the needed data keys, see TestRun.materializeTables().
+
+        Parameters
+        ----------
+        datakeys
+            the data keys that are needed from the table data of the test runs, or None to include all table data,
+            see TestRun.getData()
+        patterns
+            regular expression patterns of further needed data keys
+        """
+        for tr in self.getTestRuns():
+            tr.materializeTables(datakeys, patterns)
+
+        # the table data of a test run is replaced when its lazy tables are parsed
+        request = (None if datakeys is None else frozenset(datakeys), frozenset(patterns))
+        sources = [(tr.data, tr.getLongTableData(), tr.getHistories()) for tr in self.getTestRuns()]
+        # experiments saved by earlier versions do not store the sources of the joined data
+        joinedsources = getattr(self, "joinedsources", [])
+        if self.joineddata is not None and getattr(self, "joinedrequest", None) == request and len(joinedsources) == len(sources) and \
+                all(a is b for source, joinedsource in zip(sources, joinedsources) for a, b in zip(source, joinedsource)):
             return self.joineddata
 
         datalist = []
-        for tr in self.getTestRuns():
-            trdata = tr.data
+        self.joinedsources = sources
+        self.joinedrequest = request
+        for trdata in [tr.getData(datakeys, patterns) for tr in self.getTestRuns()]:
             if self.externaldata is not None:
                 # Suggestion:
                 # trdata = trdata.join(self.externaldata, on=Key.ProblemName, suffixes = ("", "_ext"))
@@ -336,5 +416,5 @@ class Experiment:
         Create a panel from testrun data, using the testrun settings as key
         Set onlyactive to True to only get active testruns as defined by the testrun manager
         """
-        trdatadict = {tr.getSettings():tr.data for tr in self.getTestRuns(onlyactive)}
+        trdatadict = {tr.getSettings():tr.getData() for tr in self.getTestRuns(onlyactive)}
         return pd.Panel(trdatadict)
@@ -79,6 +79,15 @@ ViolationInt = "Viol_Int"
 ViolationLP = "Viol_LP"
 ViolationCons = "Viol_Cons"
 
+#
+# parse statistics of every problem (optional)
+#
+ParseBytes = "ParseBytes"
+ParseHistoryPoints = "ParseHistoryPoints"
+ParseLines = "ParseLines"
+ParseLongLines = "ParseLongLines"
+ParseSeconds = "ParseSeconds"
+
 #
 # sol checker output (optional)
 #
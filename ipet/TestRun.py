@@ -11,11 +11,14 @@ please refer to README.md for how to cite IPET.
 """
 from ipet import Key
 from ipet import misc
-from pandas import DataFrame, notnull
-import os, sys
+from pandas import DataFrame, Series, Categorical, notnull, concat
+import numpy as np
+import os, sys, re
 import logging
 from ipet.Key import CONTEXT_LOGFILE, CONTEXT_METAFILE
 from ipet.validation import Validation
+from ipet.parsing.LogFile import LogFile
+from ipet.parsing.StatisticReader_TableReader import TableReader
 # from lib2to3.fixes.fix_input import context
 # from matplotlib.tests import test_lines
 
@@ -33,6 +36,12 @@ class TestRun:
     FILE_EXTENSION = ".trn"
     """ the file extension for saving and loading test runs from """
 
+    TABLECOLUMNS = ["ProblemId", "Table", "Column", "Row", "Key", "Value"]
+    """ the columns of the long-format table data, see getLongTableData() """
+
+    HISTORYKEYS = [Key.PrimalBoundHistory, Key.DualBoundHistory]
+    """ the data keys of the bound histories, which are stored as ragged arrays, see getHistoryArrays() """
+
     def __init__(self, filenames = []):
         self.inputfromstdin = False
         self.filenames = []
@@ -53,24 +62,37 @@ class TestRun:
 
         self.currentfileiterator = None
         self.currentfile = None
-        self.consumedStdinput = []
+        self.currentlines = None
+        self.followstates = {}
+        self.lazytables = {}
+        self.tabledata = None
+        self.tablerows = []
+        self.currenttabledata = {}
+        self.histories = {}
+        self.widedata = None
+        self.problemnameindex = None
 
     def __iter__(self):
-        if(self.currentfile != ""):
-            with open(self.currentfile, "r") as f:
-                for line in enumerate(f):
-                    yield line
+        """ Yield tuples (linenumber, line) of the current file, which is read in large chunks
+        """
+        if getattr(self, "currentlines", None) is not None:
+            yield from self.currentlines
+        elif(self.currentfile != ""):
+            yield from LogFile(self.currentfile)
         else:
-            for line in enumerate(self.consumedStdinput):
-                yield line
-            for line in enumerate(sys.stdin, len(self.consumedStdinput)):
-                yield line
+            # enumerate does not close stdin together with this generator
+            yield from enumerate(sys.stdin)
+
+    def getSortedFilenames(self):
+        """ Return the file names of this test run in the order in which they are parsed
+        """
+        return sorted(self.filenames, key = lambda x:misc.sortingKeyContext(misc.filenameGetContext(x)))
 
     def iterationPrepare(self):
-        filenames = sorted(self.filenames, key = lambda x:misc.sortingKeyContext(misc.filenameGetContext(x)))
-        self.currentfileiterator = iter(filenames)
+        self.currentfileiterator = iter(self.getSortedFilenames())
 
     def iterationNextFile(self):
+        self.iterationSetCurrentLines(None)
         try:
             self.currentproblemid = 0
             # order: .meta, .out, .err, .set, .solu, trace
@@ -79,12 +101,404 @@ class TestRun:
         except StopIteration:
             return False
 
-    def iterationAddConsumedStdinput(self, consumedlines):
-        if self.currentfile == "":
-            for line in consumedlines:
-                self.consumedStdinput.append(line)
+    def getFollowState(self, filename):
+        """ Return the state after the last finished problem of a log file that was parsed in follow mode
+
+        Returns
+        -------
+        tuple
+            (byte offset, line number, problem id, meta data) of the last problem end, or None
+        """
+        # test runs saved by earlier versions do not store follow states
+        return getattr(self, "followstates", {}).get(filename)
+
+    def setFollowState(self, filename, offset, linenumber, problemid, metadatadict):
+        """ Store the state after the last finished problem of a log file, from which parsing is resumed in follow mode
+
+        Parameters
+        ----------
+        filename
+            the log file
+        offset
+            byte offset of the line that ends the last finished problem
+        linenumber
+            the line number of this line
+        problemid
+            the id of the next problem
+        metadatadict
+            the meta data that is valid for the next problem
+        """
+        if not hasattr(self, "followstates"):
+            self.followstates = {}
+        self.followstates[filename] = (offset, linenumber, problemid, dict(metadatadict))
+
+    def getLazyTables(self, filename):
+        """ Return the LazyTables of a log file whose tables were not parsed yet, or None
+        """
+        # test runs saved by earlier versions do not store lazy tables
+        return getattr(self, "lazytables", {}).get(filename)
+
+    def addLazyTables(self, lazytables):
+        """ Add or replace the LazyTables of a log file, whose tables are parsed when their data is requested first
+        """
+        if not hasattr(self, "lazytables"):
+            self.lazytables = {}
+        self.lazytables[lazytables.filename] = lazytables
+
+    def materializeTables(self, datakeys = None, patterns = ()):
+        """ Parse the lazy tables that can contribute data keys and add their data to the data frame of this test run
+
+        Lazy tables are only parsed after the data collection. Every log file is parsed at most once.
+
+        Parameters
+        ----------
+        datakeys
+            the requested data keys, or None to parse all lazy tables
+        patterns
+            regular expression patterns of further requested data keys
+
+        Returns
+        -------
+        bool
+            True if the data of any lazy tables was added, otherwise False
+        """
+        if not getattr(self, "lazytables", None) or self.datadict != {}:
+            return False
+        if datakeys is not None:
+            datakeys = [key for key in datakeys if key not in self.data.columns]
+            if not datakeys and not patterns:
+                return False
+
+        materialized = False
+        for filename, lazytables in list(self.lazytables.items()):
+            if datakeys is not None and not lazytables.canContribute(datakeys, patterns):
+                continue
+            del self.lazytables[filename]
+            logger.debug("Parsing lazy tables of %d problems of %s" % (len(lazytables.getProblemIds()), filename))
+            try:
+                tablerows = lazytables.collectData(self)
+            except IOError as e:
+                logger.warning("Could not parse lazy tables of %s: %s" % (filename, e))
+                continue
+            if tablerows:
+                self.appendTableData(tablerows)
+                materialized = True
+        return materialized
+
+    def addTableData(self, tableid, columns, rowname, data):
+        """ Add the values of a row of a statistics table to the current problem
+
+        Table data is stored separately from the other data, see getLongTableData().
+
+        Parameters
+        ----------
+        tableid
+            the name of the table
+        columns
+            the column names of the table, or an empty list for a table with a single column
+        rowname
+            the name of the row
+        data
+            the values of the row, values without a column are ignored
+        """
+        cells = self.currenttabledata
+        if columns:
+            for column, datum in zip(columns, data):
+                cells[(tableid, column, rowname)] = datum
+        else:
+            cells[(tableid, "", rowname)] = data[0]
+
+    @staticmethod
+    def buildTableData(tablerows):
+        """ Return a long-format data frame of the table data of finished problems
+
+        Parameters
+        ----------
+        tablerows
+            list of tuples (problemid, cells), where cells is a dictionary {(tableid, column, rowname) : value}
+        """
+        lengths = [len(cells) for _, cells in tablerows]
+        entries = [entry for _, cells in tablerows for entry in cells]
+        tables, columns, rows = zip(*entries) if entries else ((), (), ())
+
+        # every data key is built only once
+        keys = {}
+        for entry in entries:
+            if entry not in keys:
+                keys[entry] = TableReader.getDatakey(*entry)
+
+        return DataFrame({"ProblemId" : np.repeat([problemid for problemid, _ in tablerows], lengths).astype(np.int32),
+                          "Table" : Categorical(tables),
+                          "Column" : Categorical(columns),
+                          "Row" : Categorical(rows),
+                          "Key" : Categorical([keys[entry] for entry in entries]),
+                          "Value" : np.array([value for _, cells in tablerows for value in cells.values()], dtype = float)},
+                         columns = TestRun.TABLECOLUMNS)
+
+    def appendTableData(self, tablerows):
+        """ Append the table data of finished problems to the long-format table data
+
+        The table data is sorted by data keys and problem ids, such that the values of a data key can be found quickly.
+        Values of problems that are collected again replace their previous values, as in the problem data.
+        """
+        tabledata = self.buildTableData(tablerows)
+        if self.getLongTableData() is not None:
+            tabledata = concat([self.getLongTableData(), tabledata], ignore_index = True)
+            tabledata = tabledata.drop_duplicates(["ProblemId", "Key"], keep = "last")
+            for column in ["Table", "Column", "Row", "Key"]:
+                tabledata[column] = Categorical(tabledata[column])
+        self.tabledata = tabledata.sort_values(["Key", "ProblemId"], kind = "mergesort").reset_index(drop = True)
+
+    def getLongTableData(self):
+        """ Return the table data as a data frame with the columns TABLECOLUMNS and one row per table entry, or None
+
+        The columns Table, Column, Row and Key are categorical.
+        """
+        # test runs saved by earlier versions store the table data together with the other data
+        return getattr(self, "tabledata", None)
+
+    def getTableKeys(self):
+        """ Return the sorted list of the data keys of the table data
+        """
+        tabledata = self.getLongTableData()
+        if tabledata is None:
+            return []
+        return list(tabledata["Key"].cat.categories)
+
+    def getTableRows(self, datakey):
+        """ Return the rows of the long-format table data of a data key, or None if there is no such data key
+        """
+        tabledata = self.getLongTableData()
+        if tabledata is None:
+            return None
+        keys = tabledata["Key"].cat
+        try:
+            code = keys.categories.get_loc(datakey)
+        except KeyError:
+            return None
+        return tabledata.iloc[keys.codes.searchsorted(code, "left"):keys.codes.searchsorted(code, "right")]
+
+    def getTableData(self, datakeys = None, patterns = ()):
+        """ Return the table data as a data frame with one column per data key, indexed like the data of this test run
+
+        Parameters
+        ----------
+        datakeys
+            the data keys of the table data to include, or None to include all
+        patterns
+            regular expression patterns of further data keys to include
+        """
+        tabledata = self.getLongTableData()
+        if tabledata is None:
+            return DataFrame(index = self.data.index)
+        if datakeys is not None:
+            datakeys = set(datakeys)
+            keys = [key for key in self.getTableKeys() if key in datakeys or any(re.search(pattern, key) for pattern in patterns)]
+            tabledata = tabledata[tabledata["Key"].isin(keys)]
+
+        widedata = tabledata.pivot(index = "ProblemId", columns = "Key", values = "Value")
+        widedata.columns = list(widedata.columns)
+        widedata = widedata.reindex(self.data.index)
+
+        # as in a data frame of all problem data, a data key whose cells are empty for every problem has None values
+        for datakey in widedata.columns[widedata.isnull().values.all(axis = 0)]:
+            if len(self.getTableRows(datakey)) == len(widedata.index) > 0:
+                widedata[datakey] = Series([None] * len(widedata.index), index = widedata.index, dtype = object)
+        return widedata
+
+    def getTableDatum(self, problemid, datakey):
+        """ Return the value of a data key of the table data for a problem, or None
+        """
+        rows = self.getTableRows(datakey)
+        if rows is None:
+            return None
+        problemids = rows["ProblemId"].values
+        idx = problemids.searchsorted(problemid)
+        if idx == len(problemids) or problemids[idx] != problemid or np.isnan(rows["Value"].values[idx]):
+            return None
+        return rows["Value"].values[idx]
+
+    def deleteTableData(self, selected):
+        """ Delete the table data of all problems whose ids are selected by a function, which also accepts arrays of ids
+        """
+        self.tablerows = [(problemid, cells) for problemid, cells in getattr(self, "tablerows", []) if not selected(problemid)]
+        tabledata = self.getLongTableData()
+        if tabledata is not None:
+            tabledata = tabledata[~selected(tabledata["ProblemId"].values)].reset_index(drop = True)
+            tabledata["Key"] = tabledata["Key"].cat.remove_unused_categories()
+            self.tabledata = tabledata
+
+    @staticmethod
+    def buildHistoryArrays(histories):
+        """ Return the ragged arrays (problemids, offsets, times, bounds) of the bound histories of one data key
+
+        Parameters
+        ----------
+        histories
+            dictionary {problemid : history}, where every history is a list of tuples (time, bound), other values are ignored
+        """
+        problemids = sorted(problemid for problemid, history in histories.items() if type(history) is list)
+        offsets = np.zeros(len(problemids) + 1, dtype = np.int64)
+        np.cumsum([len(histories[problemid]) for problemid in problemids], out = offsets[1:])
+        points = np.array([point for problemid in problemids for point in histories[problemid]], dtype = float).reshape(-1, 2)
+        return (np.array(problemids, dtype = np.int64), offsets, np.ascontiguousarray(points[:, 0]), np.ascontiguousarray(points[:, 1]))
+
+    @staticmethod
+    def selectHistoryArrays(arrays, selection):
+        """ Return the ragged arrays of the bound histories of the problems in the given order or boolean selection
+        """
+        problemids, offsets, times, bounds = arrays
+        starts, lengths = offsets[:-1][selection], np.diff(offsets)[selection]
+        newoffsets = np.zeros(len(lengths) + 1, dtype = np.int64)
+        np.cumsum(lengths, out = newoffsets[1:])
+        # the index of every point of the selected histories
+        points = np.arange(newoffsets[-1]) + np.repeat(starts - newoffsets[:-1], lengths)
+        return (problemids[selection], newoffsets, times[points], bounds[points])
+
+    def appendHistories(self, histories):
+        """ Add the bound histories of finished problems to the ragged arrays
+
+        The histories of problems that are already stored are replaced, or deleted if the new value is not a list.
+        The arrays remain sorted by problem ids.
+
+        Parameters
+        ----------
+        histories
+            dictionary {datakey : {problemid : history}}, see buildHistoryArrays()
+        """
+        if not histories:
+            return
+        merged = dict(self.getHistories())
+        for datakey, problemhistories in histories.items():
+            arrays = self.buildHistoryArrays(problemhistories)
+            if datakey in merged:
+                previous = self.selectHistoryArrays(merged[datakey], ~np.isin(merged[datakey][0], list(problemhistories)))
+                offsets = np.concatenate([previous[1][:-1], arrays[1] + previous[1][-1]])
+                arrays = (np.concatenate([previous[0], arrays[0]]), offsets,
+                          np.concatenate([previous[2], arrays[2]]), np.concatenate([previous[3], arrays[3]]))
+                if np.any(arrays[0][1:] < arrays[0][:-1]):
+                    arrays = self.selectHistoryArrays(arrays, np.argsort(arrays[0], kind = "mergesort"))
+            merged[datakey] = arrays
+        # the dictionary is replaced such that joined data of this test run is updated, see Experiment.getJoinedData()
+        self.histories = merged
+
+    def getHistories(self):
+        """ Return a dictionary {datakey : (problemids, offsets, times, bounds)} of the bound histories, see getHistoryArrays()
+        """
+        # test runs saved by earlier versions store the histories together with the other data
+        return getattr(self, "histories", {})
+
+    def getHistoryArrays(self, datakey):
+        """ Return the ragged arrays (problemids, offsets, times, bounds) of the bound histories of a data key, or None
+
+        The problem ids are sorted. The history of the i-th problem consists of the times and bounds from offsets[i]
+        to offsets[i + 1]. Histories of problems that are still collected are not contained, see setupAfterDataCollection().
+        """
+        return self.getHistories().get(datakey)
+
+    def getHistory(self, problemid, datakey):
+        """ Return the times and bounds of the bound history of a problem as two arrays, or None
+
+        The arrays of stored histories are views of the ragged arrays and must not be modified.
+        """
+        # histories that are still collected and histories of test runs saved by earlier versions are lists of tuples
+        if self.datadict != {}:
+            history = self.datadict.get(datakey, {}).get(problemid)
+        elif datakey in self.data.columns and problemid in self.data.index:
+            history = self.data.at[problemid, datakey]
+        else:
+            history = None
+        if type(history) is list:
+            points = np.array(history, dtype = float).reshape(-1, 2)
+            return points[:, 0], points[:, 1]
+
+        arrays = self.getHistoryArrays(datakey)
+        if arrays is None:
+            return None
+        problemids, offsets, times, bounds = arrays
+        idx = problemids.searchsorted(problemid)
+        if idx == len(problemids) or problemids[idx] != problemid:
+            return None
+        return times[offsets[idx]:offsets[idx + 1]], bounds[offsets[idx]:offsets[idx + 1]]
+
+    def getHistoryColumn(self, datakey):
+        """ Return the bound histories of a data key as lists of tuples (time, bound), indexed like the data of this test run
+        """
+        problemids, offsets, times, bounds = self.getHistoryArrays(datakey)
+        times, bounds = times.tolist(), bounds.tolist()
+        histories = [list(zip(times[start:end], bounds[start:end])) for start, end in zip(offsets[:-1], offsets[1:])]
+        return Series(histories, index = problemids, dtype = object).reindex(self.data.index)
+
+    def deleteHistories(self, selected):
+        """ Delete the bound histories of all problems whose ids are selected by a function, which also accepts arrays of ids
+        """
+        if self.getHistories():
+            self.histories = {datakey : self.selectHistoryArrays(arrays, ~selected(arrays[0])) for datakey, arrays in self.getHistories().items()}
+
+    def deleteProblemDataFromId(self, problemid):
+        """ Delete all collected data of the problems with an id of at least problemid
+        """
+        for problemdata in self.datadict.values():
+            for pid in [pid for pid in problemdata if pid >= problemid]:
+                del problemdata[pid]
+        self.deleteTableData(lambda pid : pid >= problemid)
+        self.deleteHistories(lambda pid : pid >= problemid)
+        self.problemnameindex = None
+
+    def getEmptyCopy(self):
+        """ Return a test run for the current file without collected problem data
+
+        The copy shares the validation and starts from a copy of the current meta data, such
+        that separate parts of the current file can be parsed into it independently.
+        """
+        testrun = TestRun()
+        testrun.filenames = list(self.filenames)
+        testrun.currentfile = self.currentfile
+        testrun.validation = self.validation
+        testrun.metadatadict = dict(self.metadatadict)
+        return testrun
+
+    def mergeProblemData(self, datadict, nproblems, metadatadict, tablerows = ()):
+        """ Append problem data that was collected into an empty copy of this test run
+
+        Parameters
+        ----------
+        datadict
+            the data dictionary of the copy, indexed by the problem ids of the copy
+        nproblems
+            the number of problems finalized by the copy
+        metadatadict
+            the meta data of the copy after its last problem
+        tablerows
+            the table data of the finished problems of the copy, see buildTableData()
+        """
+        for key, problemdata in datadict.items():
+            merged = self.datadict.setdefault(key, {})
+            for problemid, datum in problemdata.items():
+                merged[problemid + self.currentproblemid] = datum
+        self.tablerows.extend((problemid + self.currentproblemid, cells) for problemid, cells in tablerows)
+
+        # meta data of previous parts are also valid for the problems of this part until they are overwritten
+        for key, datum in self.metadatadict.items():
+            if key == Key.ProblemName:
+                continue
+            merged = self.datadict.setdefault(key, {})
+            for problemid in range(self.currentproblemid, self.currentproblemid + nproblems):
+                merged.setdefault(problemid, datum)
+
+        self.metadatadict.update(metadatadict)
+        self.currentproblemid += nproblems
+        self.problemnameindex = None
+
+    def iterationSetCurrentLines(self, lines):
+        """ Set a generator of tuples (linenumber, line) of the current file, which is then read only once, as stdin
+        """
+        if getattr(self, "currentlines", None) is not None:
+            self.currentlines.close()
+        self.currentlines = lines
 
     def iterationCleanUp(self):
+        self.iterationSetCurrentLines(None)
         self.currentfileiterator = None
 
     def iterationGetCurrentFile(self):
@@ -102,7 +516,11 @@ class TestRun:
         # TODO test this
         """Append a file name to the list of filenames of this test run
         """
-        filename = os.path.abspath(filename)
+        archivename, membername = misc.filenameSplitArchiveMember(filename)
+        if membername is None:
+            filename = os.path.abspath(filename)
+        else:
+            filename = misc.filenameJoinArchiveMember(os.path.abspath(archivename), membername)
         if filename not in self.filenames:
             self.filenames.append(filename)
         else:
@@ -110,7 +528,7 @@ class TestRun:
 
         extension = misc.filenameGetContext(filename)
         if extension in [Key.CONTEXT_ERRFILE, Key.CONTEXT_LOGFILE]:
-            metafile = os.path.splitext(filename)[0] + ".meta"
+            metafile = os.path.splitext(misc.filenameStripCompression(filename))[0] + ".meta"
 
             if os.path.isfile(metafile) and (metafile not in self.filenames):
                 self.filenames.append(metafile)
@@ -123,9 +541,8 @@ class TestRun:
 
         after data was added, the method getProblemDataById() can be used for access
         """
-        for problemid, name in self.datadict.setdefault(Key.ProblemName, {}).items():
-            if name == problem:
-                self.addDataById(datakeys, data, problemid)
+        for problemid in self.getProblemIdsByName(problem):
+            self.addDataById(datakeys, data, problemid)
 
     def addData(self, datakey, data):
         """Add data to current problem
@@ -160,8 +577,14 @@ class TestRun:
         # check for the right dictionary to store the data
         logger.debug("TestRun %s receives data Datakey %s, %s to problem %s" % (self.getName(), repr(datakeys), repr(data), problemid))
 
-        if not self.data.empty:
+        if datakeys == Key.ProblemName or type(datakeys) is list and Key.ProblemName in datakeys:
+            self.problemnameindex = None
+
+        if not self.data.empty and datakeys in self.HISTORYKEYS and datakeys not in self.data.columns:
+            self.appendHistories({datakeys : {problemid : data}})
+        elif not self.data.empty:
             self.data.loc[problemid, datakeys] = data
+            self.widedata = None
         else:
             if type(datakeys) is list and type(data) is list:
                 for key, datum in zip(datakeys, data):
@@ -181,9 +604,28 @@ class TestRun:
 
     def getParameterData(self):
         """Return two dictionaries that map parameter names to  their value and default value
+
+        The dictionaries may be shared with other test runs and must not be modified, see addParameterData().
         """
         return (self.parametervalues, self.defaultparametervalues)
 
+    def setParameterData(self, parametervalues, defaultparametervalues):
+        """Replace the dictionaries that map parameter names to their value and default value
+        """
+        self.parametervalues = parametervalues
+        self.defaultparametervalues = defaultparametervalues
+
+    def addParameterData(self, parametervalues, defaultparametervalues):
+        """Add the parameter values and default values of a settings file that may also belong to other test runs
+
+        A test run without parameters shares the given dictionaries instead of copying them.
+        """
+        if not self.parametervalues and not self.defaultparametervalues:
+            self.setParameterData(parametervalues, defaultparametervalues)
+        else:
+            # never modify dictionaries that may be shared
+            self.setParameterData({**self.parametervalues, **parametervalues}, {**self.defaultparametervalues, **defaultparametervalues})
+
     def getLogFile(self, fileextension = ".out"):
         """Returns the name of the logfile
         """
@@ -196,14 +638,15 @@ class TestRun:
         """Return a list or set of keys (which are the columns headers of the data)
         """
         if self.datadict != {}:
-            return list(self.datadict.keys())
+            return list(self.datadict.keys()) + [key for key in self.getHistories() if key not in self.datadict]
         else:
-            return set(self.data.columns)
+            return set(self.data.columns) | set(self.getTableKeys()) | set(self.getHistories())
 
     def emptyData(self):
         """Empty all data of current testrun
         """
         self.data = DataFrame(dtype = object)
+        self.problemnameindex = None
 
     def getMetaData(self):
         """Return a data frame containing meta data
@@ -231,7 +674,13 @@ class TestRun:
 
             for key in self.currentproblemdata.keys():
                 self.datadict.setdefault(key, {})[self.currentproblemid] = self.currentproblemdata[key]
+            # the index of problem names is maintained if it exists
+            if getattr(self, "problemnameindex", None) is not None and Key.ProblemName in self.currentproblemdata:
+                self.problemnameindex.setdefault(self.currentproblemdata[Key.ProblemName], []).append(self.currentproblemid)
             self.currentproblemdata = {}
+            if self.currenttabledata:
+                self.tablerows.append((self.currentproblemid, self.currenttabledata))
+                self.currenttabledata = {}
             self.currentproblemid = self.currentproblemid + 1
 
     def finishedReadingFile(self, solver, context = CONTEXT_LOGFILE):
@@ -248,24 +697,47 @@ class TestRun:
         """
         self.datadict = self.data.to_dict()
         self.data = DataFrame(dtype = object)
+        self.tablerows = []
+        self.currenttabledata = {}
 
     def setupAfterDataCollection(self):
         """ Save data in a pandas dataframe for futher use (i.e. reading and finding data)
         """
+        self.appendHistories({key : self.datadict.pop(key) for key in self.HISTORYKEYS if key in self.datadict})
         self.data = DataFrame(self.datadict)
         self.datadict = {}
+        if self.tablerows:
+            self.appendTableData(self.tablerows)
+            self.tablerows = []
+
+    def getProblemNameIndex(self):
+        """ Return a dictionary that maps every problem name to the list of ids of the problems with this name
+
+        The index is built from the collected data when it is first needed, and maintained while further
+        problems are collected.
+        """
+        # test runs saved by earlier versions have no index
+        if getattr(self, "problemnameindex", None) is None:
+            if self.datadict != {}:
+                names = self.datadict.get(Key.ProblemName, {}).items()
+            elif Key.ProblemName in self.data.columns:
+                names = self.data[Key.ProblemName].items()
+            else:
+                names = ()
+            self.problemnameindex = {}
+            for problemid, name in names:
+                self.problemnameindex.setdefault(name, []).append(problemid)
+        return self.problemnameindex
+
+    def getProblemIdsByName(self, problemname):
+        """ Return the list of ids of the problems with given name
+        """
+        return self.getProblemNameIndex().get(problemname, [])
 
     def hasProblemName(self, problemname):
         """ Return if already collected data for a problem with given name
         """
-        if self.datadict != {}:
-            return problemname in self.datadict.get(Key.ProblemName, {}).values()
-        else:
-            if Key.ProblemName in self.data.keys():
-                for name in self.data[Key.ProblemName]:
-                    if problemname == name:
-                        return True
-            return False
+        return problemname in self.getProblemNameIndex()
 
     def hasProblemId(self, problemid):
         """ Returns if there is already data collected for a problem with given id
@@ -275,7 +747,7 @@ class TestRun:
     def getNumberOfProblems(self):
         """ Return number of problemns
         """
-        return max(len(self.datadict.get(Key.ProblemName, [])), len(self.data.keys()))
+        return max(len(self.datadict.get(Key.ProblemName, [])), len(self.data.index))
 
     def getProblemIds(self):
         """ Return a list of problemids
@@ -296,17 +768,10 @@ class TestRun:
     def getProblemDataByName(self, problemname, datakey):
         """Return the data collected for problems with given name
         """
-        collecteddata = []
-        if self.datadict != {}:
-            for key, dat in self.datadict.get("ProblemName", None):
-                if dat == problemname:
-                    collecteddata.append(self.getProblemDataById(key, datakey))
-        else:
-            collecteddata = list(self.data[self.data[Key.ProblemName] == problemname].loc[:, datakey])
-        try:
-            return collecteddata[0]
-        except IndexError:
+        problemids = self.getProblemIdsByName(problemname)
+        if not problemids:
             return None
+        return self.getProblemDataById(problemids[0], datakey)
 
     def getProblemDataById(self, problemid, datakey = None):
         """Return data for a specific datakey, or None, if no such data exists for this (probname, datakey) key pair
@@ -318,13 +783,17 @@ class TestRun:
                 return "<%s> not contained in keys, have only\n%s" % \
                     (problemid, ",".join((ind for ind in self.getProblemIds())))
         else:
+            if datakey in self.getHistories():
+                history = self.getHistory(problemid, datakey)
+                return None if history is None else list(zip(history[0].tolist(), history[1].tolist()))
             if self.datadict != {}:
                 return self.datadict.get(datakey, {}).get(problemid, None)
             else:
+                self.materializeTables([datakey])
                 try:
                     data = self.data.loc[problemid, datakey]
                 except KeyError:
-                    data = None
+                    data = self.getTableDatum(problemid, datakey)
                 if type(data) is list or notnull(data):
                     return data
                 else:
@@ -334,8 +803,15 @@ class TestRun:
         """ Return data for a list of problems
         """
         if self.datadict != {}:
+            if datakey in self.getHistories():
+                return [self.getProblemDataById(id, datakey) for id in problemids]
             return [self.datadict.get(datakey, {}).get(id, None) for id in problemids]
         else:
+            if datakey in self.getHistories() and datakey not in self.data.columns:
+                return self.getHistoryColumn(datakey).loc[problemids]
+            self.materializeTables([datakey])
+            if datakey not in self.data.columns:
+                return self.getTableData([datakey]).loc[problemids, datakey]
             return self.data.loc[problemids, datakey]
 
     def deleteProblemDataById(self, problemid):
@@ -353,6 +829,17 @@ class TestRun:
             except TypeError:
                 # needs to be caught for pandas version < 0.13
                 self.data = self.data.drop(problemid)
+            self.widedata = None
+        self.deleteTableData(lambda pid : pid == problemid)
+        self.deleteHistories(lambda pid : pid == problemid)
+        self.problemnameindex = None
+
+    def __getstate__(self):
+        """ Return the state of this test run for pickling, without the cached data of all data keys
+        """
+        state = dict(self.__dict__)
+        state["widedata"] = None
+        return state
 
     def saveToFile(self, filename):
         """ Dump the pickled instance of itself into a .trn-file
@@ -369,7 +856,7 @@ class TestRun:
         """
         try:
             f = open(filename, 'w')
-            f.write(self.data.to_csv())
+            f.write(self.getData().to_csv())
             f.close()
         except IOError:
             print("Could not open %s for saving test run data" % filename)
@@ -390,7 +877,7 @@ class TestRun:
     def toJson(self):
         """ Return the data-object in json
         """
-        return self.data.to_json()
+        return self.getData().to_json()
 
     @staticmethod
     def loadFromFile(filename):
@@ -409,15 +896,47 @@ class TestRun:
         f.close()
         return testrun
 
-    def getData(self):
-        """Return a data frame object of the acquired data
-        """
-        return self.data
+    def getData(self, datakeys = None, patterns = ()):
+        """Return a data frame object of the acquired data together with the table data and the bound histories
+
+        Parameters
+        ----------
+        datakeys
+            the data keys of the table data and the bound histories to include, or None to include all, see getTableData()
+        patterns
+            regular expression patterns of further data keys of the table data and the bound histories to include
+
+        The data of all data keys is built only once until the data of this test run changes, and must not be modified.
+        """
+        self.materializeTables(datakeys, patterns)
+        if datakeys is not None:
+            return self.joinData(datakeys, patterns)
+
+        # the table data and the histories are replaced on every change, the data frame is changed in place, see addDataById()
+        sources = (self.data, self.getLongTableData(), self.getHistories())
+        # test runs saved by earlier versions do not cache their data
+        widedata = getattr(self, "widedata", None)
+        if widedata is None or any(source is not cachedsource for source, cachedsource in zip(sources, widedata[0])):
+            widedata = self.widedata = (sources, self.joinData())
+        return widedata[1]
+
+    def joinData(self, datakeys = None, patterns = ()):
+        """ Return the data frame of the acquired data joined with the table data and the bound histories, see getData()
+        """
+        tabledata = self.getTableData(datakeys, patterns)
+        tabledata = tabledata[[key for key in tabledata.columns if key not in self.data.columns]]
+        historykeys = [key for key in self.getHistories() if key not in self.data.columns and
+                       (datakeys is None or key in datakeys or any(re.search(pattern, key) for pattern in patterns))]
+        if historykeys:
+            tabledata = DataFrame({key : self.getHistoryColumn(key) for key in historykeys}, index = self.data.index).join(tabledata)
+        if tabledata.columns.empty:
+            return self.data
+        return self.data.join(tabledata)
 
     def getCurrentLogfilename(self):
         """ Return the name of the current logfile
         """
-        return os.path.basename(self.filenames[0])
+        return os.path.basename(misc.filenameStripArchive(self.filenames[0]))
 
     def getSettings(self):
         """ Return the settings associated with this test run
@@ -425,7 +944,7 @@ class TestRun:
         try:
             return self.data['Settings'][0]
         except KeyError:
-            return os.path.basename(self.filenames[0]).split('.')[-2]
+            return os.path.basename(misc.filenameStripArchive(self.filenames[0])).split('.')[-2]
 #
     def getName(self):
         """ Convenience method to make test run a manageable object
@@ -436,4 +955,4 @@ class TestRun:
         """ Return identification string of this test run
         """
         # TODO Is this still the way to do this? What if we are reading from stdin?
-        return os.path.splitext(os.path.basename(self.filenames[0]))[0]
+        return os.path.splitext(os.path.basename(misc.filenameStripCompression(misc.filenameStripArchive(self.filenames[0]))))[0]
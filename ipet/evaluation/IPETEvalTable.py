@@ -725,6 +725,7 @@ class IPETEvaluation(IpetNode):
     DEFAULT_INDEX = " ".join([Key.ProblemName, Key.LogFileName])
     DEFAULT_INDEXSPLIT = -1
     ALLTOGETHER = "_alltogether_"
+    AUTOINDEX_KEYS = [Key.ProblemName, Key.Solver, Key.Settings, Key.Version, Key.LogFileName]
 
     editableAttributes = ["defaultgroup", "sortlevel", "comparecolformat", "grouptags", "index", "indexsplit", "validate", "suppressions", "fillin", "integral"]
     attributes2Options = {
@@ -1151,6 +1152,41 @@ class IPETEvaluation(IpetNode):
                 adj.setdefault(key, set()).update(val)
         return adj
 
+    def getRequiredDatakeys(self) -> set:
+        """ Collect the data keys that this evaluation reads from the data of an experiment.
+
+        The data keys are required by the columns, the filter groups, the index and the validation.
+        Regular expression columns may require further data keys, see getRequiredDatakeyPatterns().
+
+        Returns
+        -------
+            A set of data keys.
+        """
+        datakeys = set(self.AUTOINDEX_KEYS if self.autoIndex else self.getIndex())
+        for dependencies in self.getDependencies(self.columns).values():
+            datakeys.update(dependencies)
+        for filtergroup in self.filtergroups:
+            for filter_ in filtergroup.filters:
+                datakeys.update(filter_.getDependencies())
+        datakeys.update(Validation.datakeys)
+        return datakeys
+
+    def getRequiredDatakeyPatterns(self) -> set:
+        """ Collect the regular expressions of all regular expression columns, including child columns.
+
+        Returns
+        -------
+            A set of regular expression patterns, every data key that is matched by one of them is required.
+        """
+        patterns = set()
+        columns = list(self.columns)
+        while columns:
+            col = columns.pop()
+            if col.isRegex():
+                patterns.add(col.regex)
+            columns.extend(col.children)
+        return patterns
+
     def getValidate(self):
         """this evaluations validation attribute
 
@@ -1652,7 +1688,7 @@ class IPETEvaluation(IpetNode):
             return
 
         lowerbound = 1  # 1 or bigger
-        possible_indices = [Key.ProblemName, Key.Solver, Key.Settings, Key.Version, Key.LogFileName]
+        possible_indices = self.AUTOINDEX_KEYS
         height = data.shape[0]
 
         # find the indices that are represented in the data with their numbers of unique values
@@ -1719,7 +1755,11 @@ class IPETEvaluation(IpetNode):
         self.recomputeIntegrals(exp)
 
         # data is concatenated along the rows and eventually extended by external data
-        data = exp.getJoinedData().copy()
+        if getattr(type(exp), "getJoinedData", None) is Experiment.getJoinedData:
+            data = exp.getJoinedDataFor(self.getRequiredDatakeys(), self.getRequiredDatakeyPatterns()).copy()
+        else:
+            # experiments that provide their own joined data provide all of it
+            data = exp.getJoinedData().copy()
 
         logger.debug("Result of getJoinedData:\n{}\n".format(data))
 
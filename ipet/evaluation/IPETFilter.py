@@ -507,6 +507,11 @@ class IPETFilter(IpetNode):
             return value
         return None
 
+    def getDependencies(self) -> list:
+        """Return the data keys that this filter reads, the data key of a value filter and the non-numeric expressions
+        """
+        return [dep for dep in (self.getDependency(1), self.getDependency(2), self.datakey) if dep is not None]
+
     def equals(self, other):
         """Compare this and another filter for equality
         """
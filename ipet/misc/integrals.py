@@ -44,6 +44,63 @@ def calcIntegralValue(thedatalist, pwlinear = False):
         gaps = gaps[:-1]
     return np.sum((times[1:] - times[:-1]) * gaps)
 
+def getHistoryDeviation(lowerbound, upperbound, *neighborbounds):
+    """
+    returns the largest gap in percent between the bounds of a range and the bounds of neighboring history points
+
+    The gap of a bound to any reference value, see misc.getGap() with useCplexGap, changes by at most the gap between
+    the bound and a neighboring bound. The gap between a neighboring bound and a bound of the range is largest
+    for the lowest or the highest bound of the range.
+    """
+    return max(misc.getGap(bound, neighborbound, True) for bound in (lowerbound, upperbound) for neighborbound in neighborbounds)
+
+def compressHistory(history, tolerance):
+    """
+    returns the points of a bound history that are needed to keep its integrals within a tolerance
+
+    A point is dropped if the bounds of all points dropped since the last kept point deviate by at most the tolerance
+    from the bounds of the last kept point and the next point. The primal and dual integral of the compressed history,
+    see getProcessPlotData() and calcIntegralValue(), then differ by at most the tolerance times the time span of the history
+    for every reference value, both as piece-wise constant and as piece-wise linear function. The first and the last
+    point of the history are always kept.
+
+    Parameters
+    ----------
+    history: a list of tuples (time, bound), sorted by time
+    tolerance: the maximum deviation of the gap in percent
+    """
+    compressed = list(history[:1])
+    lowerbound = upperbound = None
+    for point, nextpoint in zip(history[1:-1], history[2:]):
+        bound = point[1]
+        if lowerbound is None:
+            newlowerbound = newupperbound = bound
+        else:
+            newlowerbound, newupperbound = min(lowerbound, bound), max(upperbound, bound)
+
+        if getHistoryDeviation(newlowerbound, newupperbound, compressed[-1][1], nextpoint[1]) <= tolerance:
+            lowerbound, upperbound = newlowerbound, newupperbound
+        else:
+            compressed.append(point)
+            lowerbound = upperbound = None
+
+    compressed.extend(history[1:][-1:])
+    return compressed
+
+def getCplexGaps(values, reference):
+    """
+    returns an array of the CPlex gaps of an array of values w.r.t. a reference value, see misc.getGap()
+    """
+    if reference in [None, misc.FLOAT_INFINITY]:
+        return numpy.full(len(values), misc.FLOAT_INFINITY)
+    values = numpy.asarray(values, dtype = float)
+    maximum = numpy.maximum(numpy.abs(values), abs(reference))
+    with numpy.errstate(divide = "ignore", invalid = "ignore"):
+        gaps = numpy.abs(values - reference) / maximum * 100
+    gaps[maximum <= 10e-9] = 0.0
+    gaps[values == misc.FLOAT_INFINITY] = misc.FLOAT_INFINITY
+    return gaps
+
 def getProcessPlotData(testrun, probid, normalize = True, access = "id", reference = None,
     historytouse = DEFAULT_HISTORYTOUSE, xaftersolvekey = DEFAULT_XAFTERSOLVEKEY, xlimitkey = DEFAULT_XLIMITKEY,
     cutoffgap = DEFAULT_CUTOFFGAP, scale=False, lim=(None, None) ,
@@ -67,10 +124,11 @@ def getProcessPlotData(testrun, probid, normalize = True, access = "id", referen
     # read keys from kw dictionary
     if access == "id":
         getmethod = testrun.getProblemDataById
+        history = testrun.getHistory(probid, historytouse)
     else:
         getmethod = testrun.getProblemDataByName
-
-    history = getmethod(probid, historytouse)
+        problemids = testrun.getProblemIdsByName(probid)
+        history = testrun.getHistory(problemids[0], historytouse) if problemids else None
 
     xaftersolve = getmethod(probid, xaftersolvekey)
 
@@ -81,39 +139,30 @@ def getProcessPlotData(testrun, probid, normalize = True, access = "id", referen
 
     if xlim is None and xaftersolve is None:
         return None
-    if history is None:
-        history = []
 
-    try:
-        lastbound = history[-1][1]
-    except:
-        lastbound = misc.FLOAT_INFINITY
-
-    if len(history) > 0:
-        x, y = list(zip(*history))
-        x = list(x)
-        y = list(y)
-    else:
-        x = []
-        y = []
+    # the history is given as arrays of times and bounds, see TestRun.getHistory()
+    if history is None:
+        history = (numpy.empty(0), numpy.empty(0))
+    x, y = history
+    lastbound = float(y[-1]) if len(y) > 0 else misc.FLOAT_INFINITY
 
     if normalize:
-        x.insert(0, 0.0)
-        y.insert(0, misc.FLOAT_INFINITY)
+        x = numpy.concatenate(([0.0], x))
+        y = numpy.concatenate(([misc.FLOAT_INFINITY], y))
 
     if xaftersolve is not None and lastbound is not None:
-        if len(history) > 0:
-            xaftersolve = max(xaftersolve, history[-1][0])
-        x.append(xaftersolve)
-        y.append(lastbound)
+        if len(history[0]) > 0:
+            xaftersolve = max(xaftersolve, float(history[0][-1]))
+        x = numpy.append(x, xaftersolve)
+        y = numpy.append(y, lastbound)
 
-    # depending on the normalization parameter, the normfunction used is either the CPlex gap, or the identity
+    # depending on the normalization parameter, the y values are either mapped to the CPlex gap, or kept
     if normalize:
-        normfunction = lambda z : min(cutoffgap, misc.getGap(z, reference, True))
+        y = numpy.fmin(cutoffgap, getCplexGaps(y, reference))
     else:
-        normfunction = lambda z : z
+        y = numpy.array(y, dtype = float)
 
-    x = numpy.array(x)
+    x = numpy.array(x, dtype = float)
 
     if scale:
         x = x / xlim
@@ -122,8 +171,6 @@ def getProcessPlotData(testrun, probid, normalize = True, access = "id", referen
         if thelim is not None:
             x = func(x,thelim)
 
-    y = numpy.array(list(map(normfunction, y)))
-
     return x, y
 
 def getMeanIntegral(testrun, problemlist, access = "id", **kw):
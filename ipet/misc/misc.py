@@ -26,6 +26,8 @@ numericExpression = re.compile("([+\-]*[\d]+[.\d]*(?:e[+-])?-*[\d]*[kMG]{0,1}|[\
 numericExpressionOrInf = re.compile("([+\-]*[\d]+[.\d]*(?:e[+-])?-*[\d]*[kMG]{0,1}|[\-]+|inf)")
 tablenumericExpression = re.compile("([+\-]*[\d]+[.\d]*(?:e[+-])?-*[\d]*[kMG]{0,1}|[\-]+|cutoff)")
 wordExpression = re.compile(r'[^\s]+')
+COMPRESSION_EXTENSIONS = [".gz", ".bz2", ".xz"]
+ARCHIVE_SEPARATOR = "::"
 useStringSplit = False
 
 def sortingKeyContext(context):
@@ -37,13 +39,255 @@ def sortingKeyContext(context):
     except IndexError:
         raise IndexError("Unknown context %d" % context)
 
+def filenameStripCompression(filename):
+    """
+    get filename without the extension of a supported compression format
+    """
+    base, extension = os.path.splitext(filename)
+    if extension in COMPRESSION_EXTENSIONS:
+        return base
+    return filename
+
+def filenameSplitArchiveMember(filename):
+    """
+    split a file name of the form 'archive::member' into the archive and the member name, the member name of other files is None
+    """
+    archivename, separator, membername = filename.partition(ARCHIVE_SEPARATOR)
+    if not separator:
+        return filename, None
+    return archivename, membername
+
+def filenameJoinArchiveMember(archivename, membername):
+    """
+    get the file name of a member of an archive
+    """
+    return archivename + ARCHIVE_SEPARATOR + membername
+
+def filenameStripArchive(filename):
+    """
+    get the file name of a member of an archive as if it was extracted next to the archive, other file names are returned unchanged
+    """
+    archivename, membername = filenameSplitArchiveMember(filename)
+    if membername is None:
+        return filename
+    return os.path.join(os.path.dirname(archivename), os.path.basename(membername))
+
 def filenameGetContext(filename):
     """
-    get filecontext via fileextension
+    get filecontext via fileextension, the extension of a compressed file is the one of the uncompressed file,
+    a directory of log files of single problems is a log file
     """
-    extension = os.path.splitext(os.path.basename(filename))[1]
+    if os.path.isdir(filename):
+        return Key.CONTEXT_LOGFILE
+    extension = os.path.splitext(os.path.basename(filenameStripCompression(filename)))[1]
     return Key.fileextension2context[extension]
 
+def getLiteralPrefix(pattern : str, startofline : bool = False) -> str:
+    """ Get the literal text that every match of a regular expression pattern starts with.
+
+    The prefix is used to decide quickly if a line can be matched by a pattern at all,
+    without invoking the regular expression engine.
+
+    Parameters
+    ----------
+    pattern
+        A regular expression pattern string.
+    startofline
+        Set to True if the pattern is used with search(). In this case, only patterns
+        anchored at the start of the line by '^' have a literal prefix.
+
+    Returns
+    -------
+    str
+        The literal prefix of every match, or the empty string if there is none.
+    """
+    # a top level alternative can start anywhere
+    depth = 0
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            idx += 1
+        elif char == "[":
+            # skip the character class, a ']' directly after the opening bracket is literal
+            idx += 2 if pattern[idx + 1:idx + 2] == "^" else 1
+            if pattern[idx:idx + 1] == "]":
+                idx += 1
+            while idx < len(pattern) and pattern[idx] != "]":
+                if pattern[idx] == "\\":
+                    idx += 1
+                idx += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return ""
+        idx += 1
+
+    idx = 0
+    while pattern[idx:idx + 1] == "^":
+        idx += 1
+    if startofline and idx == 0:
+        return ""
+
+    prefix = []
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            escaped = pattern[idx + 1:idx + 2]
+            # escaped letters and digits denote character classes or group references
+            if escaped == "" or escaped.isalnum():
+                break
+            prefix.append(escaped)
+            idx += 2
+        elif char in ".^$*+?{}[]|()":
+            break
+        else:
+            prefix.append(char)
+            idx += 1
+
+        # a quantifier makes the last literal character optional
+        if pattern[idx:idx + 1] in ("*", "?", "{"):
+            prefix.pop()
+            break
+
+    return "".join(prefix)
+
+def getLiteralSubstring(pattern : str) -> str:
+    """ Get the longest literal text that every match of a regular expression pattern contains.
+
+    Unlike the literal prefix, the substring may be preceded by other parts of the pattern, e.g., by leading white space.
+
+    Parameters
+    ----------
+    pattern
+        A regular expression pattern string.
+
+    Returns
+    -------
+    str
+        The longest literal text of every match, or the empty string if there is none.
+    """
+    try:
+        flags = re.compile(pattern).flags
+    except re.error:
+        return ""
+    # global flags may change the meaning of the literal text
+    if flags & (re.IGNORECASE | re.VERBOSE):
+        return ""
+
+    runs = [[]]
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            escaped = pattern[idx + 1:idx + 2]
+            # escaped letters and digits denote character classes, anchors, group references or character codes
+            if escaped == "" or escaped.isalnum():
+                runs.append([])
+            else:
+                runs[-1].append(escaped)
+            idx += 2
+            # the digits and names of character codes are not literal text
+            if escaped in ("x", "u", "U"):
+                idx += {"x" : 2, "u" : 4, "U" : 8}[escaped]
+            elif escaped == "N" and pattern[idx:idx + 1] == "{":
+                idx = pattern.find("}", idx) + 1
+            elif escaped.isdigit():
+                # octal escapes have up to three digits, group references up to two
+                end = idx + 2
+                while idx < end and pattern[idx:idx + 1].isdigit():
+                    idx += 1
+        elif char == "[":
+            # skip the character class, a ']' directly after the opening bracket is literal
+            idx += 2 if pattern[idx + 1:idx + 2] == "^" else 1
+            if pattern[idx:idx + 1] == "]":
+                idx += 1
+            while idx < len(pattern) and pattern[idx] != "]":
+                if pattern[idx] == "\\":
+                    idx += 1
+                idx += 1
+            runs.append([])
+            idx += 1
+        elif char == "(":
+            # skip the group, whose literal text may be optional or an alternative
+            depth = 0
+            while idx < len(pattern):
+                if pattern[idx] == "\\":
+                    idx += 1
+                elif pattern[idx] == "[":
+                    idx += 2 if pattern[idx + 1:idx + 2] == "^" else 1
+                    while idx < len(pattern) and pattern[idx] != "]":
+                        if pattern[idx] == "\\":
+                            idx += 1
+                        idx += 1
+                elif pattern[idx] == "(":
+                    depth += 1
+                elif pattern[idx] == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                idx += 1
+            runs.append([])
+            idx += 1
+        elif char == "|":
+            # a top level alternative need not contain any literal text of the other alternatives
+            return ""
+        elif char in "*?{":
+            # a quantifier makes the last literal character optional
+            if runs[-1]:
+                runs[-1].pop()
+            runs.append([])
+            if char == "{":
+                while idx < len(pattern) and pattern[idx] != "}":
+                    idx += 1
+            idx += 1
+        elif char in ".^$+)":
+            runs.append([])
+            idx += 1
+        else:
+            runs[-1].append(char)
+            idx += 1
+
+    return "".join(max(runs, key = len))
+
+def getTriePattern(literals) -> str:
+    """ Get a regular expression pattern that matches the longest of the given literals at a position.
+
+    The literals are arranged in a trie, such that matching the pattern at a position costs time proportional
+    to the length of the match instead of the number of literals.
+
+    Parameters
+    ----------
+    literals
+        An iterable of nonempty literal strings.
+
+    Returns
+    -------
+    str
+        A regular expression pattern, or the empty string if there are no literals.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        # the empty string marks the end of a literal
+        node[""] = {}
+
+    def triePattern(node):
+        branches = [re.escape(char) + triePattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        pattern = "(?:%s)" % "|".join(branches)
+        # a greedy optional group prefers the longer literal
+        return pattern + "?" if "" in node else pattern
+
+    return triePattern(trie)
+
 def getWordAtIndex(line : str, index : int) -> str:
     """ Get the i'th word in a space separated string of words.
     
@@ -0,0 +1,133 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import logging
+from ipet.parsing.LogFile import LogFile
+
+logger = logging.getLogger(__name__)
+
+class LazyTables:
+    """
+    the statistics tables of the problems of a log file, which are parsed only when their data is requested
+
+    While tables are parsed lazily, see ReaderManager.setLazyTables(), the table readers do not read the log file
+    during data collection. Instead, the line span and the solver of every problem of the log file are recorded,
+    from which the table readers collect the data of the problems on demand, see TestRun.materializeTables().
+    """
+
+    def __init__(self, filename : str, tablereaders, problemexpression : str, problemendexpression : str,
+                 maxlinelength : int = None, skiplonglines : bool = False):
+        """
+        constructs new LazyTables of a log file without problems
+
+        Parameters
+        ----------
+        filename
+            the log file, which must still be readable when the tables are parsed
+        tablereaders
+            list of TableReader objects that are not used by any test run
+        problemexpression
+            the expression that starts a new problem in the log file
+        problemendexpression
+            the expression that ends a problem in the log file
+        maxlinelength
+            the maximum number of characters of a line that are passed to the table readers, or None for no limit
+        skiplonglines
+            True if longer lines should be skipped instead of truncated, see ReaderManager.setMaxLineLength()
+        """
+        self.filename = filename
+        self.tablereaders = tablereaders
+        self.boundaryexpressions = (problemexpression, problemendexpression)
+        self.maxlinelength = maxlinelength
+        self.skiplonglines = skiplonglines
+        self.problems = {}
+
+    def addProblem(self, problemid : int, beginline : int, endline : int, solverid : str):
+        """
+        adds or replaces the span of lines from the start line to the end line of a problem and its solver
+
+        The solver id is None if the solver of the problem is unknown, whose tables are parsed by all table readers.
+        """
+        self.problems[problemid] = (beginline, endline, solverid)
+
+    def getProblemIds(self) -> list:
+        """
+        returns the sorted ids of the problems whose tables are parsed lazily
+        """
+        return sorted(self.problems)
+
+    def canContribute(self, datakeys, patterns = ()) -> bool:
+        """
+        returns True if one of the table readers can contribute one of the given data keys, see StatisticReader.canContribute()
+        """
+        return any(reader.canContribute(datakeys, patterns) for reader in self.tablereaders)
+
+    def collectData(self, testrun) -> list:
+        """
+        parses the tables of all problems in a single pass over the log file
+
+        Parameters
+        ----------
+        testrun
+            the test run of the problems, whose empty copy receives the data of the table readers
+
+        Returns
+        -------
+        list
+            the table data of the problems, see TestRun.buildTableData()
+        """
+        collector = testrun.getEmptyCopy()
+        for reader in self.tablereaders:
+            reader.setTestRun(collector)
+
+        tablerows = []
+        spans = sorted((beginline, endline, problemid, solverid) for problemid, (beginline, endline, solverid) in self.problems.items())
+        spans.reverse()
+        readers = None
+        maxlinelength = self.maxlinelength
+        for linenumber, line in LogFile(self.filename):
+            while spans and linenumber > spans[-1][1]:
+                self.finishProblem(collector, spans.pop()[2], tablerows)
+                readers = None
+            if not spans:
+                break
+            beginline, endline, problemid, solverid = spans[-1]
+            if linenumber < beginline:
+                continue
+            # as during data collection, the line that ends a problem or starts the next problem is not read
+            if linenumber == endline and line.startswith(self.boundaryexpressions):
+                continue
+            # as during data collection, long lines are truncated or skipped
+            if maxlinelength is not None and len(line) > maxlinelength:
+                if self.skiplonglines:
+                    continue
+                line = line[:maxlinelength] + "\n"
+            if readers is None:
+                readers = [reader for reader in self.tablereaders if reader.appliesToSolver(solverid)]
+            for reader in readers:
+                reader.operateOnLine(line)
+
+        while spans:
+            self.finishProblem(collector, spans.pop()[2], tablerows)
+
+        for reader in self.tablereaders:
+            reader.setTestRun(None)
+        return tablerows
+
+    def finishProblem(self, collector, problemid : int, tablerows : list):
+        """
+        moves the data that the table readers stored in the collector into the table data of a problem
+        """
+        for reader in self.tablereaders:
+            reader.execEndOfProb()
+        if collector.currenttabledata:
+            tablerows.append((problemid, collector.currenttabledata))
+            collector.currenttabledata = {}
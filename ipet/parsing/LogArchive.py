@@ -0,0 +1,135 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import io
+import os
+import tarfile
+import zipfile
+import logging
+from ipet.misc import misc
+
+logger = logging.getLogger(__name__)
+
+class LogArchive:
+    """
+    provides the members of a tar or zip archive of log files without extracting them to disk
+
+    Tar archives, which are usually compressed as a whole, are read as a stream in a single sequential pass.
+    Members that are passed on the way to a requested member are kept in memory if they are expected to be
+    requested later on, such that the expected members can be requested in any order. Only if a member was
+    passed without being kept, the archive has to be read again from its beginning.
+    Zip archives are accessed randomly.
+    """
+    EXTENSIONS = [".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz", ".zip"]
+
+    SPOOL_MAXSIZE = 64 * 1024 * 1024
+    """ the maximum size in bytes of a passed member that is kept in memory """
+
+    def __init__(self, filename : str, membernames = ()):
+        """
+        constructs a new LogArchive, the archive is opened at the first request of a member
+
+        Parameters
+        ----------
+        filename
+            path to the archive
+        membernames
+            names of the members that are expected to be requested
+        """
+        self.filename = filename
+        self.expected = set(membernames)
+        self.requested = set()
+        self.passed = set()
+        self.spooled = {}
+        self.archivefile = None
+
+    @staticmethod
+    def isArchive(filename : str) -> bool:
+        """
+        returns True if the file name has the extension of a supported archive format
+        """
+        return filename.endswith(tuple(LogArchive.EXTENSIONS))
+
+    def isZip(self) -> bool:
+        return self.filename.endswith(".zip")
+
+    def getMemberNames(self) -> list:
+        """
+        returns the names of all regular files in the archive in the order of the archive
+        """
+        if self.isZip():
+            with zipfile.ZipFile(self.filename) as z:
+                return [info.filename for info in z.infolist() if not info.is_dir()]
+        with tarfile.open(self.filename, "r|*") as t:
+            return [info.name for info in t if info.isfile()]
+
+    def getMemberFilenames(self, extensions = None) -> list:
+        """
+        returns the file names 'archive::member' of the regular files in the archive
+
+        Parameters
+        ----------
+        extensions
+            list of file extensions of the members to consider, the extension of a compressed member is the one
+            of the uncompressed member, or None to consider all members
+
+        Returns
+        -------
+        list
+            file names in the order of the archive
+        """
+        return [misc.filenameJoinArchiveMember(self.filename, membername) for membername in self.getMemberNames()
+                if extensions is None or os.path.splitext(misc.filenameStripCompression(membername))[1] in extensions]
+
+    def openMember(self, membername : str):
+        """
+        opens a member for reading bytes
+
+        A member of a tar archive can only be read until the next member is opened.
+        """
+        self.requested.add(membername)
+        if self.isZip():
+            if self.archivefile is None:
+                self.archivefile = zipfile.ZipFile(self.filename)
+            return self.archivefile.open(membername)
+
+        if membername in self.spooled:
+            return io.BytesIO(self.spooled.pop(membername))
+
+        if self.archivefile is None or membername in self.passed:
+            if self.archivefile is not None:
+                logger.debug("Rereading archive %s for member %s" % (self.filename, membername))
+                self.archivefile.close()
+            self.archivefile = tarfile.open(self.filename, "r|*")
+            self.passed = set()
+
+        while True:
+            info = self.archivefile.next()
+            if info is None:
+                raise KeyError("There is no member %s in archive %s" % (membername, self.filename))
+            self.passed.add(info.name)
+            if not info.isfile():
+                continue
+            if info.name == membername:
+                return self.archivefile.extractfile(info)
+            # keep members that are requested later on
+            if info.name in self.expected and info.name not in self.requested and info.size <= self.SPOOL_MAXSIZE:
+                self.spooled[info.name] = self.archivefile.extractfile(info).read()
+
+    def close(self):
+        """
+        closes the archive and discards all members kept in memory
+        """
+        if self.archivefile is not None:
+            self.archivefile.close()
+            self.archivefile = None
+        self.passed = set()
+        self.spooled = {}
@@ -0,0 +1,361 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import queue
+import threading
+import logging
+from ipet.misc import misc
+from ipet.parsing.LogArchive import LogArchive
+
+logger = logging.getLogger(__name__)
+
+class LogFile:
+    """
+    provides the lines of a (range of a) log file by reading it in large binary chunks
+
+    Every chunk ends at a line break and is decoded at once. Lines are split at the same line breaks
+    as for a file opened in text mode, such that line numbers are consistent with a text mode iteration.
+    Problem boundaries can be found by byte searches in the memory mapped file without decoding it.
+
+    Files compressed with gzip, bzip2 or xz and members 'archive::member' of tar or zip archives are
+    decompressed while reading, optionally on a separate thread. Byte offsets of such files refer to the
+    decompressed data.
+
+    A directory of log files is read file by file, where the range refers to the indices of the files.
+    """
+    CHUNKSIZE = 8 * 1024 * 1024
+    """ the number of bytes read at once """
+
+    ENCODING = "utf-8"
+
+    PREFETCH_CHUNKS = 2
+    """ the number of decompressed chunks that are read ahead by the prefetching thread """
+
+    PREFETCH_FILES = 64
+    """ the number of chunks of the files of a directory that are read ahead, a small file consists of a single chunk """
+
+    compression2open = {".gz" : gzip.open,
+                        ".bz2" : bz2.open,
+                        ".xz" : lzma.open}
+
+    def __init__(self, filename : str, startoffset : int = 0, endoffset : int = None, startline : int = 0, prefetch : bool = True,
+                 archive : LogArchive = None):
+        """
+        constructs a new LogFile
+
+        Parameters
+        ----------
+        filename
+            path to the log file
+        startoffset
+            byte offset of the first line to read, must be the beginning of a line, or the index of the first file of a directory
+        endoffset
+            byte offset at which reading stops, or the index of the file of a directory at which reading stops,
+            or None to read until the end
+        startline
+            the line number of the first line
+        prefetch
+            should compressed files and the files of a directory be read on a separate thread while the lines are processed?
+        archive
+            the opened archive of a member of an archive, or None to open the archive for reading this file only
+        """
+        self.filename = filename
+        self.startoffset = startoffset
+        self.endoffset = endoffset
+        self.startline = startline
+        self.prefetch = prefetch
+        self.archive = archive
+
+    def isCompressed(self) -> bool:
+        """
+        returns True if the log file is compressed, in which case it cannot be accessed randomly
+        """
+        return os.path.splitext(self.filename)[1] in self.compression2open
+
+    def isArchiveMember(self) -> bool:
+        """
+        returns True if the log file is a member of an archive
+        """
+        return misc.filenameSplitArchiveMember(self.filename)[1] is not None
+
+    def isDirectory(self) -> bool:
+        """
+        returns True if the log file is a directory of log files
+        """
+        return os.path.isdir(self.filename)
+
+    def isRandomAccess(self) -> bool:
+        """
+        returns True if byte ranges of the log file can be read directly
+        """
+        return not self.isCompressed() and not self.isArchiveMember() and not self.isDirectory()
+
+    def open(self, archive : LogArchive = None):
+        """
+        opens the log file for reading bytes, compressed files are decompressed and members are read from the given archive
+        """
+        membername = misc.filenameSplitArchiveMember(self.filename)[1]
+        compressionopen = self.compression2open.get(os.path.splitext(self.filename)[1])
+        if membername is None:
+            return (compressionopen or open)(self.filename, "rb")
+
+        member = archive.openMember(membername)
+        if compressionopen is None:
+            return member
+        return compressionopen(member, "rb")
+
+    def getSize(self) -> int:
+        """
+        returns the size of the log file in bytes
+        """
+        return os.path.getsize(self.filename)
+
+    def getFiles(self) -> list:
+        """
+        returns the sorted paths of the files in the range of a directory, hidden files and subdirectories are ignored
+        """
+        names = sorted(entry.name for entry in os.scandir(self.filename) if entry.is_file() and not entry.name.startswith("."))
+        return [os.path.join(self.filename, name) for name in names][self.startoffset:self.endoffset]
+
+    def iterChunks(self):
+        """
+        yields chunks of bytes of the file range that end at a line break, except for possibly the last one
+        """
+        if self.prefetch and (self.isCompressed() or self.isArchiveMember()):
+            return self.iterPrefetched(self.readChunks(), self.PREFETCH_CHUNKS)
+        return self.readChunks()
+
+    def iterPrefetched(self, items, nitems : int):
+        """
+        yields the items of an iterator, which are read ahead on a separate thread
+
+        Parameters
+        ----------
+        items
+            an iterator, e.g., over the chunks of the file range
+        nitems
+            the maximum number of items that are read ahead
+        """
+        queued = queue.Queue(nitems)
+        stop = threading.Event()
+
+        def put(item):
+            # give up if the items are no longer consumed
+            while not stop.is_set():
+                try:
+                    queued.put(item, timeout = 0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for item in items:
+                    if not put(item):
+                        return
+                put(None)
+            except Exception as e:
+                put(e)
+
+        thread = threading.Thread(target = produce, daemon = True)
+        thread.start()
+        try:
+            while True:
+                item = queued.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def readChunks(self):
+        """
+        reads the chunks of the file range
+        """
+        archive = self.archive
+        if archive is None and self.isArchiveMember():
+            archive = LogArchive(misc.filenameSplitArchiveMember(self.filename)[0])
+        try:
+            with self.open(archive) as f:
+                if self.isRandomAccess():
+                    f.seek(self.startoffset)
+                else:
+                    # streams of decompressed data are skipped up to the start offset
+                    skip = self.startoffset
+                    while skip > 0:
+                        skipped = len(f.read(min(self.CHUNKSIZE, skip)))
+                        if skipped == 0:
+                            break
+                        skip -= skipped
+                remaining = self.endoffset - self.startoffset if self.endoffset is not None else -1
+                rest = b""
+                while remaining != 0:
+                    chunk = f.read(self.CHUNKSIZE if remaining < 0 else min(self.CHUNKSIZE, remaining))
+                    if not chunk:
+                        break
+                    if remaining > 0:
+                        remaining -= len(chunk)
+                    chunk = rest + chunk
+                    cut = chunk.rfind(b"\n") + 1
+                    if cut == 0:
+                        rest = chunk
+                        continue
+                    rest = chunk[cut:]
+                    yield chunk[:cut]
+                if rest:
+                    yield rest
+        finally:
+            if archive is not self.archive:
+                archive.close()
+
+    def readFiles(self):
+        """
+        reads the files of a directory, every file starts with a tuple (filename, None) followed by tuples (filename, chunk)
+        """
+        for filename in self.getFiles():
+            yield filename, None
+            for chunk in LogFile(filename, prefetch = False).readChunks():
+                yield filename, chunk
+
+    def iterFileLines(self):
+        """
+        yields tuples (filename, linenumber, line) for the lines of the files in the range of a directory
+
+        Every file starts with a tuple (filename, 0, None), the lines of every file are numbered from 1 on.
+        The files are read ahead in batches on a separate thread, which hides the latency of opening many small files.
+        """
+        chunks = self.iterPrefetched(self.readFiles(), self.PREFETCH_FILES) if self.prefetch else self.readFiles()
+        linenumber = 0
+        for filename, chunk in chunks:
+            if chunk is None:
+                linenumber = 0
+                yield filename, 0, None
+                continue
+            for line in io.TextIOWrapper(io.BytesIO(chunk), encoding = self.ENCODING, errors = "replace", newline = None):
+                linenumber += 1
+                yield filename, linenumber, line
+
+    def iterLines(self):
+        """
+        yields the lines of the file range as strings including their line break
+        """
+        for chunk in self.iterChunks():
+            yield from io.TextIOWrapper(io.BytesIO(chunk), encoding = self.ENCODING, errors = "replace", newline = None)
+
+    def __iter__(self):
+        """
+        yields tuples (linenumber, line) for every line in the file range
+        """
+        yield from enumerate(self.iterLines(), self.startline)
+
+    def readLineAt(self, offset : int) -> str:
+        """
+        returns the line of a random access file that starts at a byte offset, or an empty string at the end of the file
+        """
+        with open(self.filename, "rb") as f:
+            f.seek(offset)
+            return io.TextIOWrapper(f, encoding = self.ENCODING, errors = "replace", newline = None).readline()
+
+    def findLines(self, prefixes) -> list:
+        """
+        finds all lines of the file range that start with one of the given prefixes
+
+        Parameters
+        ----------
+        prefixes
+            a list of strings
+
+        Returns
+        -------
+        list
+            sorted list of tuples (byte offset, line number, prefix) of all lines that start with one of the prefixes
+        """
+        # compressed files are searched chunk by chunk
+        if not self.isRandomAccess():
+            result = []
+            offset = self.startoffset
+            linenumber = self.startline
+            for chunk in self.iterChunks():
+                result += self.findLinesInBuffer(chunk, 0, len(chunk), prefixes, offset, linenumber)
+                offset += len(chunk)
+                linenumber += countLineBreaks(chunk)
+            return result
+
+        end = self.endoffset if self.endoffset is not None else self.getSize()
+        if end <= self.startoffset:
+            return []
+
+        with open(self.filename, "rb") as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+            return self.findLinesInBuffer(mm, self.startoffset, end, prefixes, 0, self.startline)
+
+    def findLinesInBuffer(self, buffer, start : int, end : int, prefixes, base : int, startline : int) -> list:
+        """
+        finds all lines between two positions of a buffer that start with one of the given prefixes
+
+        Parameters
+        ----------
+        buffer
+            bytes or a memory map, the start position must be the beginning of a line
+        start
+            the start position in the buffer
+        end
+            the end position in the buffer
+        prefixes
+            a list of strings
+        base
+            the byte offset of the beginning of the buffer
+        startline
+            the line number of the line at the start position
+
+        Returns
+        -------
+        list
+            sorted list of tuples (byte offset, line number, prefix)
+        """
+        found = []
+        for prefix in prefixes:
+            bprefix = prefix.encode(self.ENCODING)
+            if buffer[start:start + len(bprefix)] == bprefix:
+                found.append((start, prefix))
+            # a line may also start after a single carriage return, as in text mode
+            for linebreak in (b"\n", b"\r"):
+                pattern = linebreak + bprefix
+                pos = buffer.find(pattern, start, end)
+                while pos != -1:
+                    found.append((pos + 1, prefix))
+                    pos = buffer.find(pattern, pos + 1, end)
+        found.sort()
+
+        # count the line breaks between consecutive positions
+        result = []
+        linenumber = startline
+        lastpos = start
+        for pos, prefix in found:
+            linenumber += countLineBreaks(buffer[lastpos:pos])
+            lastpos = pos
+            result.append((base + pos, linenumber, prefix))
+        return result
+
+def countLineBreaks(data : bytes) -> int:
+    """
+    counts the line breaks in a sequence of bytes in the same way as a file in text mode
+    """
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
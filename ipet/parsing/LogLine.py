@@ -0,0 +1,77 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+
+class LogLine(str):
+    """
+    a line of a log file that computes its tokens lazily and caches them for the solver and all readers of the line
+
+    The reader manager passes every line as a LogLine. Methods that may also receive plain strings, e.g., from tests,
+    obtain a LogLine by LogLine.fromString(). The cached lists are shared by all consumers and must not be modified.
+    """
+    words = None
+    fields = None
+    matches = None
+
+    @staticmethod
+    def fromString(line : str):
+        """
+        returns the line itself if it is a LogLine, or a new LogLine of a plain string
+        """
+        if type(line) is LogLine:
+            return line
+        return LogLine(line)
+
+    def getWords(self) -> list:
+        """
+        returns the whitespace separated words of the line
+        """
+        if self.words is None:
+            self.words = self.split()
+        return self.words
+
+    def getFields(self) -> list:
+        """
+        returns the fields of the line that are separated by '|', e.g., the columns of a table line
+        """
+        if self.fields is None:
+            self.fields = self.split("|")
+        return self.fields
+
+    def findAll(self, expr) -> list:
+        """
+        returns all matches of a compiled regular expression in the line in the same way as expr.findall()
+        """
+        if self.matches is None:
+            self.matches = {}
+        found = self.matches.get(expr)
+        if found is None:
+            found = self.matches[expr] = expr.findall(self)
+        return found
+
+    def findFirst(self, expr):
+        """
+        returns the first element of findAll(), or None if the expression does not match
+
+        The line is only searched up to the first match, unless all matches of the expression are already known.
+        """
+        if self.matches is not None and expr in self.matches:
+            found = self.matches[expr]
+            return found[0] if found else None
+
+        match = expr.search(self)
+        if match is None:
+            return None
+        if expr.groups == 0:
+            return match.group()
+        if expr.groups == 1:
+            return match.group(1)
+        return match.groups()
@@ -0,0 +1,208 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import hashlib
+import inspect
+import os
+import shutil
+import threading
+import time
+import logging
+import xml.etree.ElementTree as ElementTree
+from ipet.version import __version__
+from ipet.misc import misc
+from ipet.parsing.LogFile import LogFile
+
+logger = logging.getLogger(__name__)
+
+class ParseCache:
+    """
+    stores parsed test run files under a hash of everything that determines the parsing result
+
+    The hash consists of a configuration part, which covers the ipet version, the readers, the solvers
+    and the validation of an experiment, and the size, modification time and inode of every parsed file.
+    Members of archives are identified by their names and the archive file, directories by the files they contain.
+
+    Cache files are never updated, a changed file or configuration leads to a new cache file instead. Cache files
+    that were not used for a while or that exceed the size of the cache are removed by prune(), least recently used first.
+    """
+    FILE_EXTENSION = ".trn"
+
+    DEFAULT_CACHEDIR = os.path.join("~", ".ipet", "cache")
+    """ the default directory of the cached test run files """
+
+    DEFAULT_MAXSIZE = 1024
+    """ the default maximum size of all cached test run files in megabytes """
+
+    DEFAULT_MAXAGE = 30
+    """ the default number of days after which an unused cache file is removed """
+
+    def __init__(self, cachedir : str = None, maxsize : float = DEFAULT_MAXSIZE, maxage : float = DEFAULT_MAXAGE):
+        """
+        constructs a new ParseCache
+
+        Parameters
+        ----------
+        cachedir
+            directory for the cached test run files, default: ~/.ipet/cache
+        maxsize
+            the maximum size of all cached test run files in megabytes, or None for no limit
+        maxage
+            the number of days after which a cache file that was not used is removed, or None to keep unused files
+        """
+        if cachedir is None:
+            cachedir = os.path.expanduser(self.DEFAULT_CACHEDIR)
+        self.cachedir = cachedir
+        self.maxsize = maxsize
+        self.maxage = maxage
+
+    @staticmethod
+    def getConfigurationKey(experiment) -> str:
+        """
+        returns a hash of the ipet version and the readers, solvers and validation of an experiment
+        """
+        readermanager = experiment.getReaderManager()
+        h = hashlib.sha256()
+        h.update(__version__.encode())
+        h.update(ElementTree.tostring(readermanager.toXMLElem()))
+        h.update(repr(sorted(readermanager.getAllRepresentations(onlyactive = True))).encode())
+        h.update(repr((readermanager.problemexpression, readermanager.problemendexpression, readermanager.parsestatistics,
+                       readermanager.lazytables, readermanager.getMaxLineLength(), readermanager.skipsLongLines())).encode())
+
+        for solver in readermanager.solvers:
+            solverclass = type(solver)
+            h.update(("%s.%s" % (solverclass.__module__, solverclass.__qualname__)).encode())
+            h.update(repr(solver.getHistoryCompression()).encode())
+            # additional solvers may change between two runs under the same name
+            try:
+                h.update(inspect.getsource(solverclass).encode())
+            except (OSError, TypeError):
+                pass
+
+        validation = experiment.validation
+        h.update(repr((experiment.gaptol, experiment.validatedual, validation.tol, validation.feastol)).encode())
+        h.update(repr(sorted(validation.referencedict.items(), key = str)).encode())
+        h.update(repr(sorted(validation.objsensedict.items(), key = str)).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def getFiles(filenames) -> list:
+        """
+        returns the sorted absolute paths of the given files together with the meta files that are parsed with them
+        """
+        files = set()
+        for filename in filenames:
+            # members of archives are covered by their archive
+            archivename, membername = misc.filenameSplitArchiveMember(filename)
+            filename = os.path.abspath(archivename)
+            files.add(filename)
+            if membername is not None:
+                continue
+            # the files of a directory may change without changing the directory
+            if os.path.isdir(filename):
+                files.update(LogFile(filename).getFiles())
+                continue
+            metafile = os.path.splitext(misc.filenameStripCompression(filename))[0] + ".meta"
+            if os.path.isfile(metafile):
+                files.add(metafile)
+        return sorted(files)
+
+    def getKey(self, configurationkey : str, filenames) -> str:
+        """
+        returns the cache key for parsing the given files with the configuration of the given configuration key
+        """
+        h = hashlib.sha256(configurationkey.encode())
+        # members of the same archive are distinguished by their names
+        membernames = [misc.filenameSplitArchiveMember(filename)[1] for filename in filenames]
+        h.update(repr(sorted(membername for membername in membernames if membername is not None)).encode())
+        for filename in self.getFiles(filenames):
+            stat = os.stat(filename)
+            h.update(repr((filename, stat.st_size, stat.st_mtime_ns, stat.st_ino)).encode())
+        return h.hexdigest()
+
+    def getCacheFile(self, key : str) -> str:
+        """
+        returns the path of the cached test run file for a key
+        """
+        return os.path.join(self.cachedir, key + self.FILE_EXTENSION)
+
+    def restore(self, key : str, filename : str) -> bool:
+        """
+        copies the cached test run file for a key to the given file name
+
+        Returns
+        -------
+        bool
+            True if the key was found in the cache, False otherwise
+        """
+        cachefile = self.getCacheFile(key)
+        if not os.path.isfile(cachefile):
+            return False
+        shutil.copyfile(cachefile, filename)
+        # the modification time of a cache file is the time of its last use, see prune()
+        try:
+            os.utime(cachefile)
+        except OSError:
+            pass
+        logger.debug("Restored %s from cache file %s" % (filename, cachefile))
+        return True
+
+    def store(self, key : str, filename : str):
+        """
+        stores a copy of a test run file in the cache under a key
+        """
+        os.makedirs(self.cachedir, exist_ok = True)
+        cachefile = self.getCacheFile(key)
+        # write to a temporary file first such that parallel processes and threads never read a partial cache file
+        tmpfile = "%s.%d.%d.tmp" % (cachefile, os.getpid(), threading.get_ident())
+        shutil.copyfile(filename, tmpfile)
+        os.replace(tmpfile, cachefile)
+        logger.debug("Stored %s as cache file %s" % (filename, cachefile))
+
+    def prune(self) -> int:
+        """
+        removes the cache files that were not used for longer than the maximum age, and the least recently used
+        cache files as long as the size of all cache files exceeds the maximum size
+
+        Returns
+        -------
+        int
+            the number of removed cache files
+        """
+        if not os.path.isdir(self.cachedir):
+            return 0
+
+        cachefiles = []
+        for entry in os.scandir(self.cachedir):
+            if entry.is_file() and entry.name.endswith(self.FILE_EXTENSION):
+                stat = entry.stat()
+                cachefiles.append((stat.st_mtime, stat.st_size, entry.path))
+        # most recently used first
+        cachefiles.sort(reverse = True)
+
+        now = time.time()
+        totalsize = 0
+        nremoved = 0
+        for mtime, size, path in cachefiles:
+            totalsize += size
+            if (self.maxage is None or now - mtime <= self.maxage * 86400) and \
+                    (self.maxsize is None or totalsize <= self.maxsize * 1024 * 1024):
+                continue
+            try:
+                os.remove(path)
+                nremoved += 1
+            except OSError:
+                pass
+            totalsize -= size
+
+        if nremoved:
+            logger.info("Removed %d cache files from %s" % (nremoved, self.cachedir))
+        return nremoved
@@ -0,0 +1,181 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import time
+import logging
+import pandas as pd
+from ipet.parsing.LogFile import LogFile
+
+logger = logging.getLogger(__name__)
+
+class ParseProfile:
+    """
+    records the wall time, the number of calls and the number of matches of every reader and of the extraction
+    methods of every solver, as well as the bytes and lines read from every file and the number of its lines that
+    were truncated or skipped because they exceed the maximum line length, see ReaderManager.setMaxLineLength()
+
+    A reader manager profiles its data collection while a profile is set, see ReaderManager.setProfile().
+    The readers, solvers and test runs are instrumented for the duration of a data collection only, such that
+    parsing without a profile runs the original methods. A call counts as a match if it stored any data.
+
+    Time of nested extraction methods of a solver is included in the time of the calling method.
+    """
+    TYPE_READER = "Reader"
+    TYPE_SOLVER = "Solver"
+
+    COLUMNS = ["Type", "Name", "Time", "Calls", "Matches"]
+    FILECOLUMNS = ["File", "Time", "Bytes", "Lines", "LongLines"]
+
+    TESTRUN_STOREMETHODS = ["addData", "addDataByName", "addDataById", "addParameterValue", "addTableData"]
+    """ test run methods through which readers store data """
+    SOLVER_STOREMETHODS = ["addData", "addHistoryData"]
+    """ solver methods through which the extraction methods of a solver store data """
+
+    def __init__(self):
+        """
+        constructs a new, empty ParseProfile
+        """
+        self.methods = {}
+        self.files = {}
+        self.nstored = 0
+        self.instrumented = []
+
+    def countStored(self, method):
+        """
+        returns a wrapper of a method that stores data, which counts the calls of the method
+        """
+        def counted(*args, **kw):
+            self.nstored += 1
+            return method(*args, **kw)
+        return counted
+
+    def timed(self, methodtype : str, name : str, method):
+        """
+        returns a wrapper of a method that records the wall time, the calls and the matches of the method
+        """
+        record = self.methods.setdefault((methodtype, name), [0.0, 0, 0])
+        def profiled(*args, **kw):
+            nstored = self.nstored
+            start = time.perf_counter()
+            try:
+                return method(*args, **kw)
+            finally:
+                record[0] += time.perf_counter() - start
+                record[1] += 1
+                if self.nstored != nstored:
+                    record[2] += 1
+        return profiled
+
+    def replaceMethod(self, obj, methodname : str, wrapper):
+        """
+        replaces a method of an object by a wrapper of the method until the instrumentation is removed
+        """
+        self.instrumented.append((obj, methodname, obj.__dict__.get(methodname)))
+        setattr(obj, methodname, wrapper(getattr(obj, methodname)))
+
+    def instrument(self, readers, solvers, testrun):
+        """
+        instruments readers, solvers, and the test run that receives the data of the readers
+
+        Parameters
+        ----------
+        readers
+            list of StatisticReader objects, whose operateOnLine() method is profiled
+        solvers
+            list of Solver objects, whose readLine() method and extract methods are profiled
+        testrun
+            the TestRun object into which the readers store their data
+        """
+        for methodname in self.TESTRUN_STOREMETHODS:
+            self.replaceMethod(testrun, methodname, self.countStored)
+
+        for reader in readers:
+            self.replaceMethod(reader, "operateOnLine", lambda method, name = reader.getName() : self.timed(self.TYPE_READER, name, method))
+
+        for solver in solvers:
+            for methodname in self.SOLVER_STOREMETHODS:
+                self.replaceMethod(solver, methodname, self.countStored)
+            for methodname in ["readLine"] + sorted(m for m in dir(type(solver)) if m.startswith("extract")):
+                name = "%s.%s" % (solver.getName(), methodname)
+                self.replaceMethod(solver, methodname, lambda method, name = name : self.timed(self.TYPE_SOLVER, name, method))
+            # the extraction methods of a solver that are called for every line are collected in advance
+            solver.setupExtractors()
+
+    def removeInstrumentation(self):
+        """
+        restores the original methods of all instrumented objects
+        """
+        solvers = []
+        for obj, methodname, original in reversed(self.instrumented):
+            if original is not None:
+                setattr(obj, methodname, original)
+            else:
+                delattr(obj, methodname)
+            if methodname == "readLine":
+                solvers.append(obj)
+        self.instrumented = []
+
+        for solver in solvers:
+            solver.setupExtractors()
+
+    def iterLines(self, filename : str, lines):
+        """
+        yields the tuples (linenumber, line) of a file and records the number of lines and bytes
+        """
+        record = self.files.setdefault(filename, [0.0, 0, 0, 0])
+        for linenumber, line in lines:
+            record[1] += len(line.encode(LogFile.ENCODING))
+            record[2] += 1
+            yield linenumber, line
+
+    def addFileTime(self, filename : str, seconds : float):
+        """
+        adds the wall time that was spent collecting the data of a file
+        """
+        self.files.setdefault(filename, [0.0, 0, 0, 0])[0] += seconds
+
+    def addLongLines(self, filename : str, nlonglines : int):
+        """
+        adds the number of lines of a file that were truncated or skipped because they exceed the maximum line length
+        """
+        self.files.setdefault(filename, [0.0, 0, 0, 0])[3] += nlonglines
+
+    def merge(self, other):
+        """
+        adds the records of another profile to this profile, e.g., of a profile of a different process
+        """
+        for records, otherrecords in [(self.methods, other.methods), (self.files, other.files)]:
+            for key, otherrecord in otherrecords.items():
+                record = records.setdefault(key, [0.0] + [0] * (len(otherrecord) - 1))
+                for idx, value in enumerate(otherrecord):
+                    record[idx] += value
+
+    def getData(self) -> pd.DataFrame:
+        """
+        returns a data frame with the time, calls and matches of every reader and solver method, slowest first
+        """
+        data = pd.DataFrame([list(key) + record for key, record in self.methods.items()], columns = self.COLUMNS)
+        return data.sort_values("Time", ascending = False).reset_index(drop = True)
+
+    def getFileData(self) -> pd.DataFrame:
+        """
+        returns a data frame with the time, bytes, lines and truncated or skipped long lines of every file
+
+        The bytes are counted after the line breaks of a file have been normalized.
+        """
+        data = pd.DataFrame([[filename] + record for filename, record in self.files.items()], columns = self.FILECOLUMNS)
+        return data.sort_values("Time", ascending = False).reset_index(drop = True)
+
+    def __str__(self):
+        data = self.getData()
+        data = data[data.Calls > 0]
+        return "%s\n\n%s" % (data.to_string(index = False, float_format = "%.3f"),
+                             self.getFileData().to_string(index = False, float_format = "%.3f"))
@@ -0,0 +1,890 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import os
+import copy
+import hashlib
+import time
+import re
+import pickle
+import logging
+from .StatisticReader_TableReader import TableReader
+from .LogFile import LogFile
+from .LogLine import LogLine
+from .LogArchive import LogArchive
+from .LazyTables import LazyTables
+from ipet.misc import misc
+from ipet import Key
+from ipet.IPETError import IPETInconsistencyError
+from ipet.Key import CONTEXT_ERRFILE, CONTEXT_LOGFILE, CONTEXT_SETFILE
+
+logger = logging.getLogger(__name__)
+
+class ParseSession():
+    """
+    collects the data of a single test run with the readers and solvers of a reader manager
+
+    A session owns all state of a data collection: copies of the active readers and of the solvers, which store
+    their data in the test run of the session, the active solver, the line dispatch and its sleeping readers,
+    the buffered lines of the solver detection, the archives opened by the session and the parse statistics of
+    the current problem. The reader manager and its readers and solvers only hold the configuration and remain
+    unchanged, such that several sessions of a reader manager can collect data at the same time,
+    see ReaderManager.getSession().
+    """
+
+    def __init__(self, readermanager, testrun, profile = None):
+        """
+        constructs a new parse session
+
+        Parameters
+        ----------
+        readermanager
+            the ReaderManager whose configuration, active readers and solvers are used
+        testrun
+            the TestRun into which the data is collected
+        profile
+            a ParseProfile that records the time spent by every reader and solver method, or None
+        """
+        self.readermanager = readermanager
+        self.testrun = testrun
+        self.profile = profile
+        self.readers = [reader.getSessionCopy(testrun) for reader in readermanager.getManageables(True)]
+        self.solvers = [solver.getSessionCopy() for solver in readermanager.solvers]
+        self.activeSolver = self.solvers[0]
+        # archives that the reader manager opened for several test runs remain open after this session
+        self.archives = dict(getattr(readermanager, "archives", {}))
+        self.solverlines = None
+        self.problemstatistics = None
+        self.problemsolverids = {}
+        self.longline = False
+        self.sleepingreaders = []
+        self.setupSolverDetection()
+
+    def getProfile(self):
+        """
+        returns the ParseProfile of this session, or None if profiling is disabled
+        """
+        return self.profile
+
+    def updateLineNumberData(self, linenumber, currentcontext, prefix):
+        """
+        Saves the information about in what lines to find relevant information
+        """
+        contextstring = self.readermanager.context2string.get(currentcontext)
+        if contextstring is None:
+            return
+        self.testrun.addData("%s%s" % (prefix, contextstring), linenumber)
+
+    def finishProblemParsing(self, line, filecontext, readers):
+        """
+        only for error and logfiles: the lineinformation is written and the datacollection
+        is being finalized, active solver is being reset
+        """
+        # a solver that is not detected for the problem reads its lines now
+        self.replaySolverLines()
+        if self.sleepingreaders:
+            self.wakeUpReaders()
+        if filecontext in [Key.CONTEXT_ERRFILE, Key.CONTEXT_LOGFILE] and not self.testrun.emptyCurrentProblemData():
+            self.updateLineNumberData(line[0], filecontext, "LineNumbers_End")
+            for reader in readers:
+                reader.execEndOfProb()
+
+            if self.problemstatistics is not None and filecontext == Key.CONTEXT_LOGFILE:
+                self.addParseStatistics(line)
+
+            # lazy tables are parsed with the readers of the same line dispatch, see addLazyTables()
+            if self.readermanager.lazytables and filecontext == Key.CONTEXT_LOGFILE:
+                self.problemsolverids[self.testrun.currentproblemid] = self.dispatchsolverid
+
+            self.testrun.finalizeCurrentCollection(self.activeSolver, filecontext)
+            self.activeSolver.reset()
+
+    def iterCountedLines(self, lines):
+        """
+        yields the tuples (linenumber, line) of the current log file and counts the lines and bytes read so far
+        """
+        statistics = self.problemstatistics
+        for linenumber, line in lines:
+            statistics[0] += 1
+            statistics[1] += len(line.encode(LogFile.ENCODING))
+            yield linenumber, line
+
+    def startParseStatistics(self, line):
+        """
+        remembers the number of lines, bytes and long lines read before the start line of a problem and the start time
+        """
+        statistics = self.problemstatistics
+        statistics[3:] = [statistics[0] - 1, statistics[1] - len(line[1].encode(LogFile.ENCODING)), statistics[2] - self.longline,
+                          time.perf_counter()]
+
+    def addParseStatistics(self, line):
+        """
+        adds the lines, bytes, parse time, history points and long lines of the current problem, which ends at the given line
+        """
+        nlines, nbytes, nlonglines, startlines, startbytes, startlonglines, starttime = self.problemstatistics
+        # a problem that ends because the next problem starts does not contain the start line of the next problem
+        if self.readermanager.startOfProblemReached(line[1]):
+            nlines -= 1
+            nbytes -= len(line[1].encode(LogFile.ENCODING))
+            nlonglines -= self.longline
+
+        historypoints = sum(len(self.activeSolver.getData(key) or []) for key in [Key.PrimalBoundHistory, Key.DualBoundHistory])
+        self.testrun.addData([Key.ParseLines, Key.ParseBytes, Key.ParseSeconds, Key.ParseHistoryPoints, Key.ParseLongLines],
+                             [nlines - startlines, nbytes - startbytes, time.perf_counter() - starttime, historypoints,
+                              nlonglines - startlonglines])
+
+    def updateProblemName(self, line, currentcontext, readers):
+        """
+        sets up data structures for a new problem if necessary
+        """
+        self.updateLineNumberData(line[0], currentcontext, "LineNumbers_Begin")
+
+        problemname, problempath = self.readermanager.getProblemName(line[1])
+        oldname = self.testrun.getProblemDataById(self.testrun.currentproblemid, Key.ProblemName)
+        # if oldname is not None then the .out file was already parsed
+        # and we are currently parsing the .err file. Check if the problemname
+        # is contained in the line.
+        if (oldname is not None) and ("_{}.".format(oldname) not in line[1]) and not (oldname == problemname):
+            raise IPETInconsistencyError("Inconsistency in order of instances in .out and .err file: {} does not correspond to {}.".format(problemname, oldname))
+
+        self.testrun.addData(Key.ProblemName, problemname)
+        self.testrun.addData(Key.LogFileName, self.testrun.getCurrentLogfilename())
+        self.testrun.addData(Key.Path, problempath)
+
+    def setupLineDispatch(self, readers):
+        """
+        builds an index that maps lines to the readers that can extract data from them
+
+        The literal line prefixes and the required substrings of all readers are compiled into one expression each,
+        such that a line is scanned only once, independent of the number of readers. Readers that only declare a line
+        pattern are tested with the combined pattern of all of them, and only the readers whose pattern is found in a
+        line receive it. All other readers receive every line.
+
+        As soon as the solver of a problem is detected, only the readers that apply to the logs of this solver receive
+        the lines of the problem, see useLineDispatch().
+        """
+        self.dispatchreaders = readers
+        self.solver2dispatch = {}
+        self.readerorder = {reader : idx for idx, reader in enumerate(readers)}
+
+        # sleeping readers are removed from copies of the reader lists, which are restored at the end of a problem
+        self.sleepingreaders = []
+        self.awakedispatch = None
+        self.useLineDispatch(None)
+
+        logger.debug("Line dispatch: %d prefixes, %d substrings, %d pattern readers, %d unrestricted readers" % \
+                     (len(self.prefix2readers), len(self.substring2readers), len(self.patternreaders), len(self.unrestrictedreaders)))
+
+    def buildLineDispatch(self, readers) -> tuple:
+        """
+        returns the line dispatch of a list of readers
+
+        Returns
+        -------
+        tuple
+            the unrestricted readers, the pattern readers, the combined pattern expression, the pattern master expression,
+            the dictionary of pattern readers to their groups in the master expression, the prefix expression,
+            the dictionary of prefixes to readers, the substring expression and the dictionary of substrings to readers
+        """
+        unrestrictedreaders = []
+        patternreaders = []
+        prefixreaders = []
+        substringreaders = []
+        for reader in readers:
+            prefixes = reader.getLinePrefixes()
+            substrings = reader.getLineSubstrings()
+            pattern = reader.getLinePattern()
+            if prefixes and all(prefixes):
+                prefixreaders.append((prefixes, reader))
+            elif substrings and all(substrings):
+                substringreaders.append((substrings, reader))
+            elif pattern is not None and self.isFusablePattern(pattern):
+                patternreaders.append(reader)
+            else:
+                unrestrictedreaders.append(reader)
+
+        # the longest prefix that starts a line is found by a single match, and all prefixes of a line are a prefix of it
+        prefixexpr, prefix2readers = self.fuseLiterals(prefixreaders, str.startswith)
+        # every occurrence of a substring is found by searching from every position of a found occurrence
+        substringexpr, substring2readers = self.fuseLiterals(substringreaders, str.__contains__)
+
+        patternexpr = None
+        patternmasterexpr = None
+        patterngroups = {}
+        if patternreaders:
+            # most lines are rejected by a single search for any of the patterns
+            patternexpr = re.compile("|".join("(?:%s)" % reader.getLinePattern() for reader in patternreaders))
+            # every pattern becomes an optional lookahead with a named group that searches the whole line, such that
+            # a single match at the beginning of a line reveals all readers whose pattern is found in the line
+            patternmasterexpr = re.compile("".join("(?:(?=[\\s\\S]*?(?P<reader%d>%s))|)" % (idx, reader.getLinePattern())
+                                                   for idx, reader in enumerate(patternreaders)))
+            patterngroups = {reader : patternmasterexpr.groupindex["reader%d" % idx] for idx, reader in enumerate(patternreaders)}
+
+        return unrestrictedreaders, patternreaders, patternexpr, patternmasterexpr, patterngroups, \
+            prefixexpr, prefix2readers, substringexpr, substring2readers
+
+    def getLineDispatch(self, solverid) -> tuple:
+        """
+        returns the line dispatch of the readers that apply to the logs of a solver, or of all readers if the solver id is None
+        """
+        dispatch = self.solver2dispatch.get(solverid)
+        if dispatch is None:
+            readers = self.dispatchreaders
+            if solverid is not None:
+                readers = [reader for reader in readers if reader.appliesToSolver(solverid)]
+            if solverid is not None and len(readers) == len(self.dispatchreaders):
+                dispatch = self.getLineDispatch(None)
+            else:
+                dispatch = self.buildLineDispatch(readers)
+            self.solver2dispatch[solverid] = dispatch
+        return dispatch
+
+    def useLineDispatch(self, solverid):
+        """
+        passes lines only to the readers that apply to the logs of a solver, or to all readers if the solver id is None
+
+        Readers that sleep remain sleeping.
+        """
+        self.dispatchsolverid = solverid
+        dispatch = self.getLineDispatch(solverid)
+        if dispatch is not self.awakedispatch:
+            self.awakedispatch = dispatch
+            self.restoreLineDispatch()
+
+    def restoreLineDispatch(self):
+        """
+        resets the reader lists of the line dispatch to the current dispatch without the sleeping readers
+        """
+        self.unrestrictedreaders, self.patternreaders, self.patternexpr, self.patternmasterexpr, self.patterngroups, \
+            self.prefixexpr, prefix2readers, self.substringexpr, substring2readers = self.awakedispatch
+        self.prefix2readers = dict(prefix2readers)
+        self.substring2readers = dict(substring2readers)
+        for reader in self.sleepingreaders:
+            self.removeFromLineDispatch(reader)
+
+    @staticmethod
+    def fuseLiterals(literalreaders, contains):
+        """
+        compiles the literals of all readers into a single expression that finds the longest literal at a position
+
+        Parameters
+        ----------
+        literalreaders
+            list of tuples (literals, reader)
+        contains
+            function that decides if a literal implies another literal, such that a reader of the implied literal
+            also receives all lines of the implying literal
+
+        Returns
+        -------
+        tuple
+            the compiled expression, or None if there are no literals, and a dictionary that maps every literal
+            to the list of readers of all literals implied by it, in the order of the readers
+        """
+        literal2readers = {}
+        for literals, reader in literalreaders:
+            for literal in literals:
+                literal2readers.setdefault(literal, []).append(reader)
+        if not literal2readers:
+            return None, {}
+
+        expr = re.compile(misc.getTriePattern(literal2readers))
+        closure = {}
+        for literal in literal2readers:
+            closure[literal] = [reader for readerliterals, reader in literalreaders
+                                if any(contains(literal, other) for other in readerliterals)]
+        return expr, closure
+
+    @staticmethod
+    def isFusablePattern(pattern) -> bool:
+        """
+        returns True if a pattern keeps its meaning as an alternative of a combined expression
+        """
+        try:
+            expr = re.compile(pattern)
+        except re.error:
+            return False
+        # group names, group references and global flags depend on the rest of a combined expression
+        return not expr.groupindex and expr.flags == re.compile("").flags and \
+            re.search(r"\\\d|\(\?P=|\(\?\(", pattern) is None
+
+    def putToSleep(self, reader):
+        """
+        removes a reader from the line dispatch until the end of the current problem
+        """
+        self.sleepingreaders.append(reader)
+        self.removeFromLineDispatch(reader)
+
+    def removeFromLineDispatch(self, reader):
+        """
+        removes a reader from the reader lists of the current line dispatch
+        """
+        self.unrestrictedreaders = [r for r in self.unrestrictedreaders if r is not reader]
+        self.patternreaders = [r for r in self.patternreaders if r is not reader]
+        for literal2readers in (self.prefix2readers, self.substring2readers):
+            for literal, readers in list(literal2readers.items()):
+                if reader in readers:
+                    literal2readers[literal] = [r for r in readers if r is not reader]
+
+    def wakeUpReaders(self):
+        """
+        passes lines to all sleeping readers again
+        """
+        self.sleepingreaders = []
+        self.restoreLineDispatch()
+
+    def dispatchLine(self, line):
+        """
+        passes a line to all readers that can extract data from it
+
+        A reader that has found all its data of the current problem is put to sleep, see StatisticReader.sleepAfterReturn.
+        """
+        for reader in self.unrestrictedreaders:
+            if reader.operateOnLine(line) and reader.sleepAfterReturn:
+                self.putToSleep(reader)
+
+        if self.patternexpr is not None and self.patternexpr.search(line):
+            match = self.patternmasterexpr.match(line)
+            for reader in self.patternreaders:
+                if match.start(self.patterngroups[reader]) != -1 and reader.operateOnLine(line) and reader.sleepAfterReturn:
+                    self.putToSleep(reader)
+
+        if self.substringexpr is not None:
+            match = self.substringexpr.search(line)
+            if match is not None:
+                substrings = []
+                while match is not None:
+                    substrings.append(match.group())
+                    match = self.substringexpr.search(line, match.start() + 1)
+
+                if len(substrings) == 1:
+                    readers = self.substring2readers[substrings[0]]
+                else:
+                    readers = sorted({reader for substring in substrings for reader in self.substring2readers[substring]},
+                                     key = self.readerorder.get)
+                for reader in readers:
+                    if reader.operateOnLine(line) and reader.sleepAfterReturn:
+                        self.putToSleep(reader)
+
+        if self.prefixexpr is not None:
+            match = self.prefixexpr.match(line)
+            if match is not None:
+                for reader in self.prefix2readers[match.group()]:
+                    if reader.operateOnLine(line) and reader.sleepAfterReturn:
+                        self.putToSleep(reader)
+
+    def setupSolverDetection(self):
+        """
+        compiles the recognition expressions of all solvers into a single expression
+
+        The alternatives of the expression are tried in the order of the solvers, such that the
+        first solver that recognizes a line is found by a single match. If a solver overrides its
+        recognition method, all solvers are asked one by one instead.
+        """
+        self.recognitionexpr = None
+        self.recognitiongroup2solver = {}
+        if any(solver.isOverridden("recognizeOutput") or solver.recognition_expr is None for solver in self.solvers):
+            return
+
+        patterns = ["(?P<solver%d>%s)" % (idx, solver.recognition_expr.pattern) for idx, solver in enumerate(self.solvers)]
+        self.recognitionexpr = re.compile("|".join(patterns))
+        self.recognitiongroup2solver = {self.recognitionexpr.groupindex["solver%d" % idx] : solver for idx, solver in enumerate(self.solvers)}
+
+    def recognizeSolver(self, line):
+        """
+        returns the first solver that recognizes the line as its output, or None
+        """
+        if self.recognitionexpr is not None:
+            match = self.recognitionexpr.match(line)
+            return None if match is None else self.recognitiongroup2solver[match.lastindex]
+
+        for solver in self.solvers:
+            if solver.recognizeOutput(line):
+                return solver
+        return None
+
+    def readSolverLine(self, line):
+        """
+        passes a line of a log file to the active solver
+
+        As long as the solver of the current problem is not detected, the line is buffered instead. As soon as
+        a solver recognizes a line, it becomes the active solver and reads all buffered lines.
+        """
+        if self.solverlines is not None:
+            solver = self.recognizeSolver(line)
+            if solver is None:
+                self.solverlines.append(line)
+                return
+            if solver is not self.activeSolver:
+                solver.reset()
+                self.activeSolver = solver
+            self.useLineDispatch(solver.solverId)
+            self.replaySolverLines()
+        self.activeSolver.readLine(line)
+
+    def replaySolverLines(self):
+        """
+        passes all buffered lines to the active solver and stops the solver detection for the current problem
+        """
+        if self.solverlines is None:
+            return
+        lines, self.solverlines = self.solverlines, None
+        for line in lines:
+            self.activeSolver.readLine(line)
+
+    def profileLines(self, filename, lines):
+        """
+        returns the lines of a file, counted by the profile if profiling is enabled
+        """
+        if self.profile is None:
+            return lines
+        return self.profile.iterLines(filename or "<stdin>", lines)
+
+    def collectData(self):
+        """
+        runs data collection on the test run of this session
+        """
+        assert(self.testrun != None)
+
+        openedarchives = self.openArchives(self.testrun.getSortedFilenames())
+        if self.profile is not None:
+            self.profile.instrument(self.readers, self.solvers, self.testrun)
+        try:
+            self.testrun.iterationPrepare()
+            while self.testrun.iterationNextFile():
+                filename = self.testrun.iterationGetCurrentFile()
+                archivename, membername = misc.filenameSplitArchiveMember(filename)
+                if membername is not None:
+                    # read members of archives only once, the lines that are consumed by the solver detection are reused
+                    self.testrun.iterationSetCurrentLines(iter(LogFile(filename, archive = self.archives[archivename])))
+                elif filename != "" and LogFile(filename).isDirectory():
+                    self.testrun.iterationSetCurrentLines(self.iterDirectoryLines(filename))
+
+                context = misc.filenameGetContext(filename)
+                readers = self.getFileReaders(filename, context)
+                self.setupLineDispatch(readers)
+
+                starttime = time.perf_counter()
+                firstproblemid = self.testrun.currentproblemid
+                self.problemsolverids = {}
+                if self.readermanager.follow and context == CONTEXT_LOGFILE and filename != "" and LogFile(filename).isRandomAccess():
+                    firstproblemid = self.collectDataFollowing(context, readers)
+                elif self.useParallelCollection(context):
+                    self.collectDataInParallel(context, readers)
+                elif context == CONTEXT_SETFILE:
+                    self.collectSettings(self.profileLines(filename, self.testrun), context, readers)
+                else:
+                    self.collectDataFromLines(self.profileLines(filename, self.testrun), context, readers)
+
+                self.testrun.finishedReadingFile(self.activeSolver, context = context)
+                if self.readermanager.parsesTablesLazily(filename, context):
+                    self.addLazyTables(filename, context, firstproblemid)
+                if self.profile is not None:
+                    self.profile.addFileTime(filename or "<stdin>", time.perf_counter() - starttime)
+
+            self.testrun.iterationCleanUp()
+        finally:
+            self.closeArchives(openedarchives)
+            if self.profile is not None:
+                self.profile.removeInstrumentation()
+        return 1
+
+    def collectSettings(self, lines, context, readers):
+        """
+        collects the parameters of a settings file, which are parsed only once for all test runs with identical settings files
+
+        The parameters are cached by the content of the settings file and the readers in the settings cache of the
+        reader manager, such that the test runs share the same parameter dictionaries, see TestRun.addParameterData().
+        """
+        lines = list(lines)
+        h = hashlib.sha256()
+        for _, line in lines:
+            h.update(line.encode(LogFile.ENCODING))
+        key = (h.digest(), tuple(reader.getName() for reader in readers))
+
+        settingscache = self.readermanager.getSettingsCache()
+        parameters = settingscache.get(key)
+        if parameters is None:
+            # parse into empty dictionaries that are not shared yet
+            previous = self.testrun.getParameterData()
+            self.testrun.setParameterData({}, {})
+            self.collectDataFromLines(iter(lines), context, readers)
+            parameters = settingscache[key] = self.testrun.getParameterData()
+            self.testrun.setParameterData(*previous)
+        else:
+            logger.debug("Reusing the parameters of an identical settings file")
+
+        self.testrun.addParameterData(*parameters)
+
+    def getFileReaders(self, filename, context) -> list:
+        """
+        returns the readers of this session that read a file of the given context during data collection
+        """
+        readers = [r for r in self.readers if r.supportsContext(context)]
+        if self.readermanager.parsesTablesLazily(filename, context):
+            readers = [r for r in readers if not isinstance(r, TableReader)]
+        return readers
+
+    def addLazyTables(self, filename, context, firstproblemid):
+        """
+        records the problems of the given log file from the given problem id on, whose tables are parsed lazily
+
+        The tables of a problem are parsed by the table readers that apply to the solver of the line dispatch of the problem,
+        which are all table readers if the solver of the problem was not recognized.
+        """
+        readermanager = self.readermanager
+        tablereaders = [r for r in readermanager.getManageables(True) if r.supportsContext(context) and isinstance(r, TableReader)]
+        if not tablereaders:
+            return
+
+        filename = os.path.abspath(filename)
+        lazytables = self.testrun.getLazyTables(filename)
+        if lazytables is None:
+            tablereaders = [r.getSessionCopy(None) for r in tablereaders]
+            lazytables = LazyTables(filename, tablereaders, readermanager.problemexpression, readermanager.problemendexpression,
+                                    readermanager.getMaxLineLength(), readermanager.skipsLongLines())
+
+        contextstring = readermanager.context2string[context]
+        beginlines = self.testrun.datadict.get("LineNumbers_Begin%s" % contextstring, {})
+        endlines = self.testrun.datadict.get("LineNumbers_End%s" % contextstring, {})
+        for problemid in range(firstproblemid, self.testrun.currentproblemid):
+            if problemid in beginlines and problemid in endlines:
+                lazytables.addProblem(problemid, beginlines[problemid], endlines[problemid], self.problemsolverids.get(problemid))
+
+        if lazytables.getProblemIds():
+            self.testrun.addLazyTables(lazytables)
+
+    def iterDirectoryLines(self, dirname, start = 0, end = None):
+        """
+        yields tuples (linenumber, line) of a directory of log files as if the log files were concatenated into one log file
+
+        Every file is a problem that is named after the file, whose lines are enclosed by a problem start line
+        and a problem end line. The line numbers of every problem refer to the lines of its file.
+
+        Parameters
+        ----------
+        dirname
+            path to the directory
+        start
+            index of the first file
+        end
+            index of the file at which reading stops, or None to read all remaining files
+        """
+        endline = None
+        for filename, linenumber, line in LogFile(dirname, start, end).iterFileLines():
+            if line is None:
+                if endline is not None:
+                    yield endline
+                yield 0, "%s %s\n" % (self.readermanager.problemexpression, filename)
+            else:
+                yield linenumber, line
+            endline = (linenumber + 1, "%s\n" % self.readermanager.problemendexpression)
+        if endline is not None:
+            yield endline
+
+    def openArchives(self, filenames) -> list:
+        """
+        opens the archives of all members 'archive::member' among the given file names that are not open yet
+
+        Parameters
+        ----------
+        filenames
+            list of file names, members are expected to be read in the order of this list
+
+        Returns
+        -------
+        list
+            the names of the archives that were opened by this call
+        """
+        archive2membernames = {}
+        for filename in filenames:
+            archivename, membername = misc.filenameSplitArchiveMember(filename)
+            if membername is not None and archivename not in self.archives:
+                archive2membernames.setdefault(archivename, []).append(membername)
+
+        for archivename, membernames in archive2membernames.items():
+            self.archives[archivename] = LogArchive(archivename, membernames)
+        return list(archive2membernames.keys())
+
+    def closeArchives(self, archivenames):
+        """
+        closes the given archives, which must have been opened by this session
+        """
+        for archivename in archivenames:
+            self.archives.pop(archivename).close()
+
+    def collectDataFromLines(self, lines, context, readers, endline = None):
+        """
+        runs data collection on an iterable of tuples (linenumber, line) of the current file
+
+        Parameters
+        ----------
+        lines
+            iterable of tuples (linenumber, line)
+        context
+            the context of the current file
+        readers
+            the readers that support this context
+        endline
+            the tuple (linenumber, line) of the line at which the last problem ends if the lines are only a part of the file,
+            or None, if the last problem ends with the last line
+
+        The solver is detected for every problem of a log file in the same pass, see readSolverLine().
+        """
+        readermanager = self.readermanager
+        self.solverlines = [] if context == CONTEXT_LOGFILE else None
+        # the solver of the first problem is not known yet
+        self.useLineDispatch(None)
+        if readermanager.parsestatistics and context == CONTEXT_LOGFILE:
+            # lines, bytes and long lines read, and lines, bytes, long lines and time at the start of the current problem
+            self.problemstatistics = [0, 0, 0, 0, 0, 0, time.perf_counter()]
+            lines = self.iterCountedLines(lines)
+        else:
+            self.problemstatistics = None
+
+        maxlinelength, skiplonglines = readermanager.getMaxLineLength(), readermanager.skipsLongLines()
+        nlonglines, firstlongline = 0, 0
+        linenumber, line = 0, ""
+        for linenumber, line in lines:
+            # the regular expressions of the solver and the readers may take very long on pathological lines
+            self.longline = maxlinelength is not None and len(line) > maxlinelength
+            if self.longline:
+                line = line[:maxlinelength] + "\n"
+                if not nlonglines:
+                    firstlongline = linenumber
+                nlonglines += 1
+                if self.problemstatistics is not None:
+                    self.problemstatistics[2] += 1
+
+            # the solver and the readers share the tokens of the line
+            line = LogLine(line)
+            if readermanager.startOfProblemReached(line):
+                if context in [CONTEXT_ERRFILE, CONTEXT_LOGFILE]:
+                    # .errfiles do not contain problemdexpression ==ready==
+                    self.finishProblemParsing((linenumber, line), context, readers)
+
+                if self.problemstatistics is not None:
+                    self.startParseStatistics((linenumber, line))
+
+                try:
+                    self.updateProblemName((linenumber, line), context, readers)
+                except IPETInconsistencyError as e:
+                    logger.warning(e.msg)
+                    if context == CONTEXT_ERRFILE:
+                        logger.warning("Skipping parsing of the rest of the .err file.")
+                        break
+
+                # log files may contain the output of different solvers
+                if context == CONTEXT_LOGFILE:
+                    self.solverlines = []
+                    self.useLineDispatch(None)
+
+            if readermanager.endOfProblemReached(line):
+                self.finishProblemParsing((linenumber, line), context, readers)
+            elif not (self.longline and skiplonglines):
+                if context == CONTEXT_LOGFILE:
+                    self.readSolverLine(line)
+                self.dispatchLine(line)
+
+        if nlonglines:
+            logger.warning("%s %d lines longer than %d characters, starting at line %d" %
+                           ("Skipped" if skiplonglines else "Truncated", nlonglines, maxlinelength, firstlongline))
+            if self.profile is not None:
+                self.profile.addLongLines(self.testrun.iterationGetCurrentFile() or "<stdin>", nlonglines)
+
+        if endline is not None:
+            linenumber, line = endline
+            self.longline = maxlinelength is not None and len(line) > maxlinelength
+            if self.problemstatistics is not None:
+                # the line is read with the next part of the file, but belongs to the last problem of this part
+                self.problemstatistics[0] += 1
+                self.problemstatistics[1] += len(line.encode(LogFile.ENCODING))
+                self.problemstatistics[2] += self.longline
+
+        # in case solver crashed, make sure that parsing is finished
+        self.finishProblemParsing((linenumber, line), context, readers)
+
+    def getValidFollowState(self, filename):
+        """
+        returns the follow state of the current test run for the given log file, or None if the log file cannot be resumed
+        """
+        state = self.testrun.getFollowState(filename)
+        if state is None:
+            return None
+
+        offset = state[0]
+        expression = self.readermanager.problemendexpression.encode(LogFile.ENCODING)
+        if os.path.getsize(filename) < offset + len(expression):
+            return None
+
+        # a log file that was rewritten in the meantime does not have the problem end at the same position
+        with open(filename, "rb") as f:
+            f.seek(offset)
+            if f.read(len(expression)) != expression:
+                return None
+
+        return state
+
+    def collectDataFollowing(self, context, readers) -> int:
+        """
+        runs data collection on the current log file from the last finished problem on and stores the new follow state
+
+        Data of problems that were unfinished at the last collection is replaced.
+
+        Returns
+        -------
+        int
+            the id of the first problem whose data is collected
+        """
+        filename = self.testrun.iterationGetCurrentFile()
+        state = self.getValidFollowState(filename)
+        firstproblemid = self.testrun.currentproblemid
+        if state is None:
+            offset, linenumber = 0, 0
+            if self.useParallelCollection(context):
+                self.collectDataInParallel(context, readers)
+            else:
+                self.collectDataFromLines(self.profileLines(filename, LogFile(filename)), context, readers)
+        else:
+            offset, linenumber, problemid, metadatadict = state
+            logger.info("Resuming %s at line %d with problem %d" % (filename, linenumber, problemid))
+            self.testrun.deleteProblemDataFromId(problemid)
+            self.testrun.currentproblemid = firstproblemid = problemid
+            self.testrun.metadatadict.update(metadatadict)
+            self.activeSolver.reset()
+            self.collectDataFromLines(self.profileLines(filename, LogFile(filename, offset, startline = linenumber)), context, readers)
+
+        self.updateFollowState(filename, offset, linenumber)
+        return firstproblemid
+
+    def updateFollowState(self, filename, offset, linenumber):
+        """
+        stores the state after the last finished problem in the part of the log file that starts at the given offset
+        """
+        endlinenumbers = self.testrun.datadict.get("LineNumbers_End%s" % self.readermanager.context2string[CONTEXT_LOGFILE], {})
+        endline2problemid = {endlinenumber : problemid for problemid, endlinenumber in endlinenumbers.items()}
+
+        # problem end expressions that do not end a problem, e.g., repeated ones, are skipped
+        problemends = LogFile(filename, offset, startline = linenumber).findLines([self.readermanager.problemendexpression])
+        for offset, linenumber, _ in reversed(problemends):
+            if linenumber in endline2problemid:
+                self.testrun.setFollowState(filename, offset, linenumber, endline2problemid[linenumber] + 1, self.testrun.metadatadict)
+                return
+
+    def useParallelCollection(self, context) -> bool:
+        """
+        returns True if the current file should be split into parts that are parsed in parallel
+
+        Files are never split while profiling, because the readers of the other processes are not profiled.
+        """
+        readermanager = self.readermanager
+        if readermanager.nprocesses <= 1 or context != CONTEXT_LOGFILE or self.profile is not None:
+            return False
+        filename = self.testrun.iterationGetCurrentFile()
+        if filename == "":
+            return False
+        logfile = LogFile(filename)
+        if logfile.isDirectory():
+            return len(logfile.getFiles()) >= readermanager.parallelminfiles
+        if not logfile.isRandomAccess():
+            return False
+        return os.path.getsize(filename) >= readermanager.parallelminsize
+
+    def getFileRanges(self):
+        """
+        splits the current file at problem ends into byte ranges of roughly equal size
+
+        A range starts with the line that ends the last problem of the previous range, such that lines between two
+        problems are read together with the next problem as in a sequential parse. Files without problem end
+        expressions are split at problem starts.
+
+        A directory is split into ranges of files, whose line numbers are not used.
+
+        Returns
+        -------
+        list
+            list of tuples (start offset, end offset, start line number, end line number), where the
+            end offset and the end line number of the last range are None
+        """
+        readermanager = self.readermanager
+        logfile = LogFile(self.testrun.iterationGetCurrentFile())
+        if logfile.isDirectory():
+            nfiles = len(logfile.getFiles())
+            nranges = min(readermanager.nprocesses * readermanager.RANGES_PER_PROCESS, nfiles)
+            starts = [nfiles * i // nranges for i in range(nranges)]
+            return [(start, end, 0, None) for start, end in zip(starts, starts[1:] + [None])]
+
+        size = logfile.getSize()
+        nranges = readermanager.nprocesses * readermanager.RANGES_PER_PROCESS
+
+        boundaries = logfile.findLines([readermanager.problemendexpression])
+        if len(boundaries) == 0:
+            boundaries = logfile.findLines([readermanager.problemexpression])
+
+        # the first range always starts at the beginning of the file to include lines before the first problem
+        starts = [(0, 0)]
+        for offset, linenumber, _ in boundaries:
+            if offset >= size * len(starts) / nranges:
+                starts.append((offset, linenumber))
+
+        ends = starts[1:] + [(None, None)]
+        return [(start, end, startline, endline) for (start, startline), (end, endline) in zip(starts, ends)]
+
+    def collectDataInParallel(self, context, readers):
+        """
+        parses byte ranges of the current file in parallel and merges the problem data into the test run
+
+        Every range is parsed by a session of a copy of the reader manager on an empty copy of the test run,
+        which starts with the active solver of this session.
+        """
+        import multiprocessing as mp
+
+        ranges = self.getFileRanges()
+        logger.info("Parsing %s in %d parts using %d processes" % (self.testrun.iterationGetCurrentFile(), len(ranges), self.readermanager.nprocesses))
+
+        # the processes only need the configuration of the reader manager
+        readermanager = copy.copy(self.readermanager)
+        readermanager.testrun, readermanager.archives, readermanager.profile, readermanager.settingscache = None, {}, None, {}
+        payload = pickle.dumps((readermanager, self.testrun.getEmptyCopy(), self.solvers.index(self.activeSolver)))
+
+        tasks = [(payload, context, start, end, startline, endline) for start, end, startline, endline in ranges]
+        with mp.Pool(min(self.readermanager.nprocesses, len(tasks))) as pool:
+            for datadict, nproblems, metadatadict, tablerows, problemsolverids in pool.imap(collectDataFromRange, tasks):
+                for problemid, solverid in problemsolverids.items():
+                    self.problemsolverids[problemid + self.testrun.currentproblemid] = solverid
+                self.testrun.mergeProblemData(datadict, nproblems, metadatadict, tablerows)
+
+
+def collectDataFromRange(task):
+    """
+    parses a byte range of a log file with a session of an unpickled reader manager, used as parallel task
+
+    Returns
+    -------
+    tuple
+        the data dictionary, the number of problems, the final meta data, the table data and the
+        solvers of the line dispatch of the problems of the range
+    """
+    payload, context, start, end, startline, endline = task
+    readermanager, testrun, solverindex = pickle.loads(payload)
+    session = ParseSession(readermanager, testrun)
+    # the solver starts in the state after a finished problem
+    session.activeSolver = session.solvers[solverindex]
+    readers = session.getFileReaders(testrun.iterationGetCurrentFile(), context)
+    session.setupLineDispatch(readers)
+    logfile = LogFile(testrun.iterationGetCurrentFile(), start, end, startline)
+    if logfile.isDirectory():
+        session.collectDataFromLines(session.iterDirectoryLines(logfile.filename, start, end), context, readers)
+    elif end is None:
+        session.collectDataFromLines(logfile, context, readers)
+    else:
+        session.collectDataFromLines(logfile, context, readers, (endline, logfile.readLineAt(end)))
+    return testrun.datadict, testrun.currentproblemid, testrun.metadatadict, testrun.tablerows, session.problemsolverids
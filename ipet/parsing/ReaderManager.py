@@ -19,6 +19,10 @@ from .StatisticReader_TableReader import TableReader, CustomTableReader
 from .StatisticReader_VariableReader import VariableReader
 from .StatisticReader_CustomReader import CustomReader
 from .TraceFileReader import TraceFileReader
+from .LogFile import LogFile
+from .LogArchive import LogArchive
+from .ParseProfile import ParseProfile
+from .ParseSession import ParseSession
 from ipet.concepts.Manager import Manager
 from ipet.concepts.IPETNode import IpetNode
 from ipet.parsing.Solver import SCIPSolver, CbcSolver, XpressSolver, GurobiSolver, \
@@ -27,8 +31,7 @@ from ipet.misc import misc
 # CbcSolver, CouenneSolver, \
 #     XpressSolver, GurobiSolver, CplexSolver
 from ipet import Key
-from ipet.IPETError import IPETInconsistencyError
-from ipet.Key import CONTEXT_ERRFILE, CONTEXT_LOGFILE
+from ipet.Key import CONTEXT_LOGFILE
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +46,18 @@ class ReaderManager(Manager, IpetNode):
     context2string = {Key.CONTEXT_LOGFILE:"LogFile",
                       Key.CONTEXT_ERRFILE:"ErrFile"}
 
+    PARALLEL_MINSIZE = 64 * 1024 * 1024
+    """ the minimum size in bytes of a log file that is parsed in parallel """
+
+    PARALLEL_MINFILES = 1000
+    """ the minimum number of files of a directory that is parsed in parallel """
+
+    RANGES_PER_PROCESS = 4
+    """ the number of parts per process into which a log file is split for parallel parsing """
+
+    MAXLINELENGTH = None
+    """ the maximum number of characters of a line that are passed to the solver and the readers, or None for no limit """
+
     def __init__(self, problemexpression = "@01", problemendexpression = "=ready="):
         """
         constructs a new reader Manager
@@ -61,8 +76,19 @@ class ReaderManager(Manager, IpetNode):
         self.problemendexpression = problemendexpression
         self.solvers = []
         self.addSolvers()
-        self.activeSolver = self.solvers[0]
         self.solverCanRead = True
+        self.nprocesses = 1
+        self.nthreads = 1
+        self.parallelminsize = self.PARALLEL_MINSIZE
+        self.parallelminfiles = self.PARALLEL_MINFILES
+        self.follow = False
+        self.archives = {}
+        self.profile = None
+        self.parsestatistics = False
+        self.lazytables = False
+        self.maxlinelength = self.MAXLINELENGTH
+        self.skiplonglines = False
+        self.settingscache = {}
 
     def getEditableAttributes(self):
         return ["problemexpression", "problemendexpression"]
@@ -83,6 +109,8 @@ class ReaderManager(Manager, IpetNode):
             self.addSolver(s)
 
     def addSolver(self, solver):
+        if self.getHistoryCompression() != (None, None):
+            solver.setHistoryCompression(*self.getHistoryCompression())
         self.solvers.append(solver)
         logger.debug("Added a solver: {}".format(solver.getName()))
 
@@ -124,12 +152,10 @@ class ReaderManager(Manager, IpetNode):
 
     def setTestRun(self, testrun):
         """
-        changes the testrun for reading to the new testrun
+        changes the testrun for reading to the new testrun, see collectData()
         """
         logger.debug("Setting testrun to %s" % testrun.getName())
         self.testrun = testrun
-        for reader in self.getManageables():
-            reader.setTestRun(testrun)
 
     def addFileExtension2Context(self, extension, context):
         """
@@ -201,14 +227,31 @@ class ReaderManager(Manager, IpetNode):
              TraceFileReader()
              ])
 
-    def updateLineNumberData(self, linenumber, currentcontext, prefix):
+    def pruneReaders(self, evaluations) -> list:
         """
-        Saves the information about in what lines to find relevant information
+        deactivates all active readers that cannot contribute data required by one of the given evaluations
+
+        Parameters
+        ----------
+        evaluations
+            list of IPETEvaluation objects
+
+        Returns
+        -------
+        list
+            the deactivated readers, which can be activated again after the data collection
         """
-        contextstring = self.context2string.get(currentcontext)
-        if contextstring is None:
-            return
-        self.testrun.addData("%s%s" % (prefix, contextstring), linenumber)
+        datakeys = set()
+        patterns = set()
+        for evaluation in evaluations:
+            datakeys.update(evaluation.getRequiredDatakeys())
+            patterns.update(evaluation.getRequiredDatakeyPatterns())
+
+        pruned = [reader for reader in self.getManageables(True) if not reader.canContribute(datakeys, patterns)]
+        if pruned:
+            logger.debug("Deactivating readers not required by the evaluations: %s" % ", ".join(sorted(r.getName() for r in pruned)))
+            self.deactivate(pruned)
+        return pruned
 
     def getProblemName(self, line):
         """
@@ -224,36 +267,61 @@ class ReaderManager(Manager, IpetNode):
         # now name without extension
         return namewithoutextension, fullpath
 
-    def finishProblemParsing(self, line, filecontext, readers):
+    def setParseStatistics(self, parsestatistics : bool):
+        """
+        enables or disables recording the lines, bytes, parse time, history points and long lines of every problem of a log file
+        """
+        self.parsestatistics = parsestatistics
+
+    def setHistoryCompression(self, tolerance : float = None, maxpoints : int = None):
         """
-        only for error and logfiles: the lineinformation is written and the datacollection
-        is being finalized, active solver is being reset
+        enables or disables the online compression of the primal and dual bound histories of all solvers
+
+        Parameters
+        ----------
+        tolerance
+            the maximum deviation in percent of the gap of dropped history points, or None
+        maxpoints
+            the maximum number of points of a history, or None, see Solver.setHistoryCompression()
         """
-        if filecontext in [Key.CONTEXT_ERRFILE, Key.CONTEXT_LOGFILE] and not self.testrun.emptyCurrentProblemData():
-            self.updateLineNumberData(line[0], filecontext, "LineNumbers_End")
-            for reader in readers:
-                reader.execEndOfProb()
+        self.historycompression = (tolerance, maxpoints)
+        for solver in self.solvers:
+            solver.setHistoryCompression(tolerance, maxpoints)
 
-            self.testrun.finalizeCurrentCollection(self.activeSolver, filecontext)
-            self.activeSolver.reset()
+    def getHistoryCompression(self) -> tuple:
+        """
+        returns the tolerance and the maximum number of points of the history compression of all solvers
+        """
+        # reader managers saved by earlier versions do not compress histories
+        return getattr(self, "historycompression", (None, None))
 
-    def updateProblemName(self, line, currentcontext, readers):
+    def setMaxLineLength(self, maxlinelength : int, skiplonglines : bool = False):
         """
-        sets up data structures for a new problem if necessary
+        sets the maximum number of characters of a line that are passed to the solver and the readers
+
+        Parameters
+        ----------
+        maxlinelength
+            the maximum line length, or None for no limit. Longer lines, e.g., binary dumps in corrupted log files,
+            are truncated to this length, which should therefore only be reached by such pathological lines
+        skiplonglines
+            True if longer lines should be skipped by the solver and the readers instead of being truncated
         """
-        self.updateLineNumberData(line[0], currentcontext, "LineNumbers_Begin")
+        self.maxlinelength = maxlinelength
+        self.skiplonglines = skiplonglines
 
-        problemname, problempath = self.getProblemName(line[1])
-        oldname = self.testrun.getProblemDataById(self.testrun.currentproblemid, Key.ProblemName)
-        # if oldname is not None then the .out file was already parsed
-        # and we are currently parsing the .err file. Check if the problemname
-        # is contained in the line.
-        if (oldname is not None) and ("_{}.".format(oldname) not in line[1]) and not (oldname == problemname):
-            raise IPETInconsistencyError("Inconsistency in order of instances in .out and .err file: {} does not correspond to {}.".format(problemname, oldname))
+    def getMaxLineLength(self) -> int:
+        """
+        returns the maximum number of characters of a line that are passed to the solver and the readers, or None for no limit
+        """
+        # reader managers saved by earlier versions did not limit the line length
+        return getattr(self, "maxlinelength", self.MAXLINELENGTH)
 
-        self.testrun.addData(Key.ProblemName, problemname)
-        self.testrun.addData(Key.LogFileName, self.testrun.getCurrentLogfilename())
-        self.testrun.addData(Key.Path, problempath)
+    def skipsLongLines(self) -> bool:
+        """
+        returns True if lines longer than the maximum line length are skipped instead of truncated
+        """
+        return getattr(self, "skiplonglines", False)
 
     def endOfProblemReached(self, line):
         """
@@ -267,63 +335,131 @@ class ReaderManager(Manager, IpetNode):
         """
         return line.startswith(self.problemexpression)
 #
-    def readSolverType(self):
+    def setProfile(self, profile):
+        """
+        sets a ParseProfile that records the time spent by every reader and solver method during data collection,
+        or None to collect data without profiling
+        """
+        self.profile = profile
+
+    def getProfile(self):
         """
-        check the solver type for a given log file
+        returns the ParseProfile of this reader manager, or None if profiling is disabled
         """
-        lines = []
-        for i, line in self.testrun:
-            lines.append(line)
-            for solver in self.solvers:
-                if solver.recognizeOutput(line):
-                    self.activeSolver = solver
-                    self.testrun.iterationAddConsumedStdinput(lines)
-                    return
-        # raise ValueError("Input does not have a recognized format.")
+        return self.profile
 
     def collectData(self):
         """
-        runs data collection on the specified testrun
-        """
-        assert(self.testrun != None)
-
-        self.testrun.iterationPrepare()
-        while self.testrun.iterationNextFile():
-            self.readSolverType()
-
-            context = misc.filenameGetContext(self.testrun.iterationGetCurrentFile())
-            readers = [r for r in self.getManageables(True) if r.supportsContext(context)]
-
-            line = (0, "")
-            for line in self.testrun:
-                if self.startOfProblemReached(line[1]):
-                    if context in [CONTEXT_ERRFILE, CONTEXT_LOGFILE]:
-                        # .errfiles do not contain problemdexpression ==ready==
-                        self.finishProblemParsing(line, context, readers)
-
-                    try:
-                        self.updateProblemName(line, context, readers)
-                    except IPETInconsistencyError as e:
-                        logger.warning(e.msg)
-                        if context == CONTEXT_ERRFILE:
-                            logger.warning("Skipping parsing of the rest of the .err file.")
-                            break
-
-                if self.endOfProblemReached(line[1]):
-                    self.finishProblemParsing(line, context, readers)
-                else:
-                    if context == CONTEXT_LOGFILE:
-                        self.activeSolver.readLine(line[1])
-                    for reader in readers:
-                        reader.operateOnLine(line[1])
-
-            # in case solver crashed, make sure that parsing is finished
-            self.finishProblemParsing(line, context, readers)
-            self.testrun.finishedReadingFile(self.activeSolver, context = context)
-
-        self.testrun.iterationCleanUp()
+        runs data collection on the specified testrun, see setTestRun() and getSession()
+        """
+        assert(getattr(self, "testrun", None) != None)
+
+        session = self.getSession(self.testrun)
+        session.collectData()
+        self.mergeSession(session)
         return 1
 
+    def getSettingsCache(self) -> dict:
+        """
+        returns the cache of the parameters of all settings files parsed so far, see ParseSession.collectSettings()
+        """
+        # reader managers saved by earlier versions have no cache
+        if not hasattr(self, "settingscache"):
+            self.settingscache = {}
+        return self.settingscache
+
+    def setLazyTables(self, lazytables : bool):
+        """
+        enables or disables lazy tables, which the table readers parse only when their data is requested, see LazyTables
+        """
+        self.lazytables = lazytables
+
+    def parsesTablesLazily(self, filename, context) -> bool:
+        """
+        returns True if the table readers do not read the given file during data collection
+
+        Only the tables of log files that can be read again are parsed lazily, unlike stdin and directories of log files.
+        """
+        return self.lazytables and context == CONTEXT_LOGFILE and filename != "" and not LogFile(filename).isDirectory()
+
+    def openArchives(self, filenames) -> list:
+        """
+        opens the archives of all members 'archive::member' among the given file names
+
+        Archives that are already open remain open until they are closed explicitly, such that
+        the members of several test runs can be read in a single pass over an archive.
+
+        Parameters
+        ----------
+        filenames
+            list of file names, members are expected to be read in the order of this list
+
+        Returns
+        -------
+        list
+            the names of the archives that were opened by this call
+        """
+        archive2membernames = {}
+        for filename in filenames:
+            archivename, membername = misc.filenameSplitArchiveMember(filename)
+            if membername is not None and archivename not in self.archives:
+                archive2membernames.setdefault(archivename, []).append(membername)
+
+        for archivename, membernames in archive2membernames.items():
+            self.archives[archivename] = LogArchive(archivename, membernames)
+        return list(archive2membernames.keys())
+
+    def closeArchives(self, archivenames = None):
+        """
+        closes the given or all open archives
+        """
+        if archivenames is None:
+            archivenames = list(self.archives.keys())
+        for archivename in archivenames:
+            self.archives.pop(archivename).close()
+
+    def setFollow(self, follow : bool):
+        """
+        enables or disables follow mode, in which log files that were parsed before are only read from the last finished problem on
+        """
+        self.follow = follow
+
+    def setNProcesses(self, nprocesses : int):
+        """
+        sets the number of processes that parse a single large log file in parallel
+        """
+        self.nprocesses = nprocesses
+
+    def setNThreads(self, nthreads : int):
+        """
+        sets the number of threads that collect the data of several test runs at the same time, see getSession()
+        """
+        self.nthreads = nthreads
+
+    def getNThreads(self) -> int:
+        """
+        returns the number of threads that collect the data of several test runs at the same time
+        """
+        # reader managers saved by earlier versions collect the data of one test run at a time
+        return getattr(self, "nthreads", 1)
+
+    def getSession(self, testrun):
+        """
+        returns a parse session of this reader manager, which collects the data of the given test run
+
+        The session owns copies of the active readers and the solvers of this reader manager and all other state of the
+        data collection, see ParseSession. This reader manager remains unchanged, such that its sessions can collect data
+        at the same time, e.g., on the threads of a thread pool. See mergeSession().
+        """
+        return ParseSession(self, testrun, None if self.profile is None else ParseProfile())
+
+    def mergeSession(self, session):
+        """
+        adds the profile of a finished parse session to the profile of this reader manager
+        """
+        if self.profile is not None and session.getProfile() is not None:
+            self.profile.merge(session.getProfile())
+
     # ## XML IO methods
     def toXMLElem(self):
         me = ElementTree.Element(ReaderManager.getNodeTag())
@@ -363,4 +499,3 @@ class ReaderManager(Manager, IpetNode):
             reader = ReaderManager.xmlfactorydict[child.tag](**child.attrib)
             rm.registerReader(reader)
         return rm
-
@@ -1,8 +1,11 @@
 
 import re
 import os
+import copy
 from ipet import Key
 from ipet.misc import misc
+from ipet.misc.integrals import compressHistory, getHistoryDeviation
+from .LogLine import LogLine
 from operator import itemgetter
 from builtins import int, str
 import logging
@@ -38,6 +41,25 @@ class Solver():
 
     objsensemap = {}
 
+    # types of routes from the master expression to the data
+    ROUTE_GROUP = 0  # store the first group of the matching pattern
+    ROUTE_STATUS = 1  # store the status of the first matching status pattern
+    ROUTE_DATUM = 2  # store the datum associated with the matching pattern
+    ROUTE_GROUPNAME = "route"
+    backreference_expr = re.compile(r"\\[1-9]|\(\?\(\d")
+
+    historytolerance = None
+    """ the maximum deviation in percent of the gap of dropped history points, see setHistoryCompression() """
+
+    historymaxpoints = None
+    """ the maximum number of points of a primal or dual bound history, see setHistoryCompression() """
+
+    HISTORY_MINTOLERANCE = 1e-4
+    """ the tolerance of the first compression of a history with too many points """
+
+    HISTORY_MAXTOLERANCE = 200.0
+    """ the largest gap in percent between two finite bounds, with which all but the first and last points are dropped """
+
     codes_nobound = set(
         [Key.SolverStatusCodes.Crashed,
          Key.SolverStatusCodes.Readerror,
@@ -93,10 +115,147 @@ class Solver():
         # compile the solver status patterns
         self.solverstatusses = [(re.compile(pattern), status) for pattern, status in self.solverstatusses]
 
+        # compile the objective sense patterns
+        self.objsenses = [(re.compile(pattern), sense) for pattern, sense in self.objsensemap.items()]
+
+        self.setupExtractors()
 
         self.data = {}
         self.reset()
 
+    def getElementaryExtractors(self):
+        """ Return a list of the elementary extraction methods that store the first group of a matching expression
+
+        Every entry is a tuple of the method name, the data key, the data type and the expression.
+        All expressions are matched at the beginning of a line.
+        """
+        return [
+            ("extractPrimalbound", Key.PrimalBound, float, self.primalbound_expr),
+            ("extractDualbound", Key.DualBound, float, self.dualbound_expr),
+            ("extractSolvingTime", Key.SolvingTime, float, self.solvingtime_expr),
+            ("extractNodes", Key.Nodes, int, self.nodes_expr),
+            ("extractViolbound", Key.ViolationBds, float, self.violbound_expr),
+            ("extractViolint", Key.ViolationInt, float, self.violint_expr),
+            ("extractViollp", Key.ViolationLP, float, self.viollp_expr),
+            ("extractViolcons", Key.ViolationCons, float, self.violcons_expr),
+            ("extractVersion", Key.Version, str, self.version_expr),
+        ]
+
+    def isOverridden(self, methodname : str) -> bool:
+        """ Return True if the method of the given name is overridden by the class of this solver
+        """
+        return getattr(type(self), methodname) is not getattr(Solver, methodname)
+
+    def setupExtractors(self):
+        """ Compile the patterns of all elementary extraction methods into a single master expression
+
+        Every pattern becomes an optional lookahead with a named group, such that a single match of the master
+        expression at the beginning of a line reveals all patterns that match this line.
+        Each matching pattern is routed to its data key in the order of the original extraction methods.
+
+        Extraction methods that are overridden by a subclass are called for every line instead.
+        """
+        self.unrestrictedextractors = []
+        # routes are tuples (route type, pattern, data key, data type or datum)
+        routes = []
+        for methodname, key, datatype, expr in self.getElementaryExtractors():
+            if self.isOverridden(methodname):
+                self.unrestrictedextractors.append(getattr(self, methodname))
+            elif expr is not None:
+                routes.append((Solver.ROUTE_GROUP, expr.pattern, key, datatype))
+
+        if self.isOverridden("extractStatus"):
+            self.unrestrictedextractors.append(self.extractStatus)
+        else:
+            routes += [(Solver.ROUTE_STATUS, expr.pattern, Key.SolverStatus, status) for expr, status in self.solverstatusses]
+
+        if self.isOverridden("extractObjsense"):
+            self.unrestrictedextractors.append(self.extractObjsense)
+        else:
+            routes += [(Solver.ROUTE_DATUM, expr.pattern, Key.ObjectiveSense, sense) for expr, sense in self.objsenses]
+
+        self.masterroutes = []
+        self.masterexpr = None
+        self.masterprefixes = None
+        if len(routes) == 0:
+            return
+
+        # numbered back references would refer to the wrong groups inside the master expression
+        if any(Solver.backreference_expr.search(route[1]) for route in routes):
+            self.unrestrictedextractors = [self.extractElementaryExpressions]
+            return
+
+        masterpattern = "".join("(?:(?=(?P<%s%d>%s))|)" % (Solver.ROUTE_GROUPNAME, idx, route[1]) for idx, route in enumerate(routes))
+        try:
+            self.masterexpr = re.compile(masterpattern)
+        except re.error:
+            # patterns that cannot be combined, e.g., because of clashing group names, are matched one by one
+            logger.debug("Could not compile master expression of solver %s, matching patterns separately" % self.getName())
+            self.unrestrictedextractors = [self.extractElementaryExpressions]
+            return
+
+        for idx, (routetype, pattern, key, datum) in enumerate(routes):
+            groupindex = self.masterexpr.groupindex["%s%d" % (Solver.ROUTE_GROUPNAME, idx)]
+            self.masterroutes.append((groupindex, range(groupindex + 1, groupindex + 1 + re.compile(pattern).groups), routetype, key, datum))
+
+        # lines that do not start with any of the literal prefixes need not be matched at all
+        prefixes = tuple(misc.getLiteralPrefix(route[1]) for route in routes)
+        if "" not in prefixes:
+            self.masterprefixes = prefixes
+
+    def extractByMasterExpression(self, line : str):
+        """ Match the master expression of this solver and route all matching patterns to their data keys
+
+        Parameters
+        ----------
+        line
+            a line of solver output
+        """
+        if self.masterexpr is None:
+            return
+
+        if self.masterprefixes is not None and not line.startswith(self.masterprefixes):
+            return
+
+        m = self.masterexpr.match(line)
+        if m.lastindex is None:
+            return
+
+        statusfound = False
+        for groupindex, innergroups, routetype, key, datum in self.masterroutes:
+            if m.start(groupindex) == -1:
+                continue
+
+            if routetype == Solver.ROUTE_GROUP:
+                for i in innergroups:
+                    group = m.group(i)
+                    if group is not None:
+                        try:
+                            self.addData(key, datum(group))
+                        except:
+                            pass
+                        break
+            elif routetype == Solver.ROUTE_STATUS:
+                # only the first matching status is parsed in order to prevent parsing a weaker status
+                if not statusfound:
+                    self.addData(key, datum)
+                    statusfound = True
+            else:
+                self.addData(key, datum)
+
+    def extractElementaryExpressions(self, line : str):
+        """ Match all patterns of the elementary extraction methods one by one
+
+        Parameters
+        ----------
+        line
+            a line of solver output
+        """
+        for methodname, _, _, _ in self.getElementaryExtractors():
+            getattr(self, methodname)(line)
+        self.extractStatus(line)
+        self.extractObjsense(line)
+
     def extractStatus(self, line : str):
         """ Check if the line matches one of the solverstatusmap patterns.
 
@@ -160,8 +319,8 @@ class Solver():
     def extractObjsense(self, line : str):
         """Read objective sense of the problem as understood by the solver
         """
-        for pattern, sense in self.objsensemap.items():
-            if re.match(pattern, line):
+        for expr, sense in self.objsenses:
+            if expr.match(line):
                 self.addData(Key.ObjectiveSense, sense)
 
     def extractByExpression(self, line : str, expr, key : str, datatype : type = float) -> None:
@@ -239,12 +398,69 @@ class Solver():
         if history == [] or history[-1][1] != bound:
             if(key == Key.PrimalBoundHistory):
                 history.append((time, bound))
+                self.compressHistory(key)
             elif (key == Key.DualBoundHistory) and (history == [] or history[-1][0] != time):
                 history.append((time, bound))
+                self.compressHistory(key)
             elif (key == Key.DualBoundHistory and history[-1][0] == time):
                 history.pop(-1)
                 history.append((time, bound))
 
+    def setHistoryCompression(self, tolerance : float = None, maxpoints : int = None):
+        """Enable or disable the online compression of the primal and dual bound histories
+
+        Parameters
+        ----------
+        tolerance
+            the maximum deviation in percent of the gap of dropped history points, see integrals.compressHistory(),
+            or None to keep all points of histories that are not too long
+        maxpoints
+            the maximum number of points of a history, or None for no limit. A longer history is compressed again
+            with twice the tolerance, such that its integrals differ by at most twice the final tolerance times
+            its time span.
+        """
+        self.historytolerance = tolerance
+        self.historymaxpoints = maxpoints
+        self.historystate = {}
+
+    def getHistoryCompression(self) -> tuple:
+        """Return the tolerance and the maximum number of points of the history compression
+        """
+        return (self.historytolerance, self.historymaxpoints)
+
+    def compressHistory(self, key):
+        """Drop points of a history that was extended by a new point if its integrals stay within the tolerance
+
+        The new last point is not final, since a dual bound history may replace it. Therefore, the point
+        before the second last point is dropped if the bounds dropped since the last kept point still deviate by at most
+        the tolerance from the bounds of the last kept point and the second last point, see integrals.compressHistory().
+        """
+        if self.historytolerance is None and self.historymaxpoints is None:
+            return
+
+        history = self.data[key]
+        state = self.historystate.setdefault(key, [None, None, self.historytolerance or 0.0])
+        lowerbound, upperbound, tolerance = state
+        if len(history) >= 4:
+            bound = history[-3][1]
+            if lowerbound is None:
+                lowerbound = upperbound = bound
+            else:
+                lowerbound, upperbound = min(lowerbound, bound), max(upperbound, bound)
+
+            if getHistoryDeviation(lowerbound, upperbound, history[-4][1], history[-2][1]) <= tolerance:
+                del history[-3]
+                state[:2] = lowerbound, upperbound
+            else:
+                state[:2] = None, None
+
+        if self.historymaxpoints is not None and len(history) > self.historymaxpoints:
+            while len(history) > self.historymaxpoints and tolerance < self.HISTORY_MAXTOLERANCE:
+                tolerance = max(2 * tolerance, self.HISTORY_MINTOLERANCE)
+                history[:-1] = compressHistory(history[:-1], tolerance)
+            # the bounds dropped before the second last point are not known, which is therefore kept
+            state[:] = [misc.FLOAT_INFINITY, misc.FLOAT_INFINITY, tolerance]
+
     def readLine(self, line : str):
         """Read solver-specific data from that lin
 
@@ -265,18 +481,12 @@ class Solver():
         line
             a line of solver output that the information shall be read from
         """
-        self.extractPrimalbound(line)
-        self.extractDualbound(line)
-        self.extractSolvingTime(line)
-        self.extractNodes(line)
-        self.extractViolbound(line)
-        self.extractViolint(line)
-        self.extractViollp(line)
-        self.extractViolcons(line)
-        self.extractVersion(line)
-        self.extractStatus(line)
+        for extractor in self.unrestrictedextractors:
+            extractor(line)
+
+        self.extractByMasterExpression(line)
+
         self.extractHistory(line)
-        self.extractObjsense(line)
 
     def extractHistory(self, line):
         """ Extract the sequence of primal and dual bounds.
@@ -332,10 +542,23 @@ class Solver():
         """
         pass
 
+    def getSessionCopy(self):
+        """ Return a copy of this solver that reads the logs of a parse session
+
+        The copy shares the compiled expressions of this solver, but starts with its own, empty data.
+        Solvers that change mutable attributes in place while reading must give their copy its own attributes.
+        """
+        solver = copy.copy(self)
+        # extraction methods that are called for every line must be bound to the copy
+        solver.unrestrictedextractors = [getattr(solver, extractor.__name__) for extractor in self.unrestrictedextractors]
+        solver.reset()
+        return solver
+
     def reset(self):
         """Reset all Data except the solverId
         """
         self.data = {}
+        self.historystate = {}
         self.addData(Key.Solver, self.solverId)
         self.addData(Key.SolverStatus, Key.SolverStatusCodes.Crashed)
         #        TODO how does the historydata work ?
@@ -426,6 +649,7 @@ class SCIPSolver(Solver):
     nodes_expr = re.compile("(?:Solving Nodes      : *\d+ \(total of (\d+) nodes in \d+ runs\)$|Solving Nodes      : *(\d+)$|  nodes \(total\)    : *(\d+) \()")
     extrasol_expr = re.compile("^feasible solution found .* after (.*) seconds, objective value (\S*)")
     soplexgithash_expr = re.compile("^  SoPlex .+\[GitHash: (\S+)\]")
+    keyword_exprs = [(keyword, re.compile(r'SCIP.*\[%s: ([^]]*)\]' % keyword)) for keyword in ["mode", "LP solver", "GitHash"]]
     violbound_expr = re.compile("^  bounds           : \S+ (\S+)$")
     violint_expr = re.compile("^  integrality      : (\S+)")
     viollp_expr = re.compile("^  LP rows          : \S+ (\S+)$")
@@ -491,7 +715,7 @@ class SCIPSolver(Solver):
             if len(allmatches) == 0:
                 return
 
-            splitline = line.split("|")
+            splitline = LogLine.fromString(line).getFields()
             pointInTime = allmatches[0]
             PrimalBound = splitline[self.primalboundindex]
             # in the case of ugscip, we reacted on a disp char, so no problem at all.
@@ -504,12 +728,13 @@ class SCIPSolver(Solver):
         if not self.isTableLine(line):
             return
 
+        line = LogLine.fromString(line)
         try:
-            # TODO This works, why is eclipse complaining?
-            lineelems = misc.tablenumericExpression.findall(line)
             # parse time and dual bound from the table
-            time = lineelems[0]
-            dualbound = line.split("|")[self.dualboundindex]
+            time = line.findFirst(misc.tablenumericExpression)
+            if time is None:
+                return None
+            dualbound = line.getFields()[self.dualboundindex]
 
             # store newly found (time, dual bound) tuple if it differs from the last dual bound
             self.addHistoryData(Key.DualBoundHistory, time, dualbound)
@@ -523,7 +748,7 @@ class SCIPSolver(Solver):
         """ decide if line is a data line of the table
         """
         if self.primalboundhistory_exp.match(line):
-            columnheaders = list(map(str.strip, line.split('|')))
+            columnheaders = list(map(str.strip, LogLine.fromString(line).getFields()))
             self.dualboundindex = columnheaders.index('dualbound')
             self.primalboundindex = columnheaders.index('primalbound')
             return True
@@ -534,8 +759,17 @@ class SCIPSolver(Solver):
     def extractMoreData(self, line : str):
         """Handle more than just the version
         """
-        for keyword in ["mode", "LP solver", "GitHash"]:
-            data = re.search(r'SCIP.*\[%s: ([^]]*)\]' % keyword, line)
+        if "SCIP" in line:
+            self.extractKeywordData(line)
+        soplexhashmatch = self.soplexgithash_expr.match(line)
+        if soplexhashmatch:
+            self.addData("SpxGitHash", soplexhashmatch.groups()[0])
+
+    def extractKeywordData(self, line : str):
+        """Extract the bracketed keyword information from the SCIP version line
+        """
+        for keyword, expr in self.keyword_exprs:
+            data = expr.search(line)
             if data:
                 if keyword == "LP solver":
                     data = data.groups()[0]
@@ -547,9 +781,6 @@ class SCIPSolver(Solver):
                         self.addData("LPSolverVersion", " ".join(lp_data[1:]))
                 else:
                     self.addData(keyword, data.groups()[0])
-        soplexhashmatch = self.soplexgithash_expr.match(line)
-        if soplexhashmatch:
-            self.addData("SpxGitHash", soplexhashmatch.groups()[0])
 
     def extractPath(self, line : str):
         """Extract the path info
@@ -646,12 +877,17 @@ class GurobiSolver(Solver):
                         "^Model is unbounded" : Key.SolverStatusCodes.Unbounded,
                        }
 
-    # variables needed for bound history
-    inTable = False
-    gurobiextralist = []
-
     def __init__(self, **kw):
         super(GurobiSolver, self).__init__(**kw)
+        # variables needed for bound history, every solver has its own
+        self.inTable = False
+        self.gurobiextralist = []
+
+    def getSessionCopy(self):
+        solver = super(GurobiSolver, self).getSessionCopy()
+        solver.inTable = False
+        solver.gurobiextralist = []
+        return solver
 
     def extractPrimalboundHistory(self, line : str):
         """ Extract the sequence of primal bounds
@@ -750,11 +986,18 @@ class CplexSolver(Solver):
     lastelapsedtime = 0.0
     nnodessincelastelapsedtime = 0
     lastnnodes = 0
-    cpxprimals = []
-    inTable = False
 
     def __init__(self, **kw):
         super(CplexSolver, self).__init__(**kw)
+        # primal bounds of the current table, every solver has its own
+        self.cpxprimals = []
+        self.inTable = False
+
+    def getSessionCopy(self):
+        solver = super(CplexSolver, self).getSessionCopy()
+        solver.cpxprimals = []
+        solver.inTable = False
+        return solver
 
     def extractOptionalInformation(self, line):
         """Extract the settings
@@ -881,6 +1124,7 @@ class XpressSolver(Solver):
 
     # variables needed for primal bound history extraction
     xpresscutidx = -1
+    tableline_expr = re.compile("^[a-zA-Z*](\d| )")
 
     def __init__(self, **kw):
         super(XpressSolver, self).__init__(**kw)
@@ -890,7 +1134,7 @@ class XpressSolver(Solver):
         """
         if "BestSoln" in line:
             self.xpresscutidx = line.index("BestSoln") + len("BestSoln")
-        elif re.search("^[a-zA-Z*](\d| )", line):
+        elif self.tableline_expr.search(line):
             self.readBoundAndTime(line, -1, -1, cutidx = self.xpresscutidx)
         elif line.startswith(" \*\*\* Heuristic solution found: "):
             self.readBoundAndTime(line, -4, -2)
@@ -1018,6 +1262,7 @@ class MipclSolver(Solver):
     inTable = False
     primalboundhistory_exp = re.compile("^      Time     Nodes    Leaves   Sols       Best Solution         Lower Bound     Gap%")
     endtable = re.compile('^===========================================')
+    optimalityproven_expr = re.compile("optimality proven$")
 
     def __init__(self, **kw):
         super(MipclSolver, self).__init__(**kw)
@@ -1026,7 +1271,7 @@ class MipclSolver(Solver):
     def extractDualbound(self, line : str):
         Solver.extractDualbound(self, line)
         # Mipcl only reports a primal bound in case it solved to completion
-        if self.primalbound_expr.match(line) and re.search("optimality proven$", line):
+        if self.primalbound_expr.match(line) and self.optimalityproven_expr.search(line):
             self.extractByExpression(line, self.primalbound_expr, Key.DualBound)
 
 
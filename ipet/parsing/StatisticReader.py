@@ -11,9 +11,11 @@ please refer to README.md for how to cite IPET.
 @author: Gregor Hendel
 """
 import re
+import copy
 from ipet.concepts import IpetNode
 from ipet.misc import misc
 from ipet import Key
+from ipet.parsing.Solver import SCIPSolver, FiberSCIPSolver
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,10 @@ class StatisticReader(IpetNode):
     effort
 
     readers only need to overwrite the methods extractStatistic() and perhaps execEndOfProb()
+
+    A reader that has found all its data of the current problem returns True from extractStatistic(), and
+    receives no further lines until the problem ends if it sleeps after return, see ParseSession.dispatchLine().
+    Sleeping is opt-in: it is only safe for readers whose data cannot change anymore within the problem.
     """
 
     name = 'NO_NAME_DEFINED_YET'
@@ -34,8 +40,15 @@ class StatisticReader(IpetNode):
 
     context = Key.CONTEXT_LOGFILE
 
-    sleepAfterReturn = True
-    sleep = False
+    lineprefixes = None
+    """ literal prefixes of all lines this reader extracts data from, or None if the reader must see every line """
+    linesubstrings = None
+    """ literal strings of which one is contained in every line this reader extracts data from, or None """
+    linepattern = None
+    """ regular expression pattern that is found in every line this reader extracts data from, or None """
+
+    sleepAfterReturn = False
+    """ should the reader sleep until the end of the current problem if extractStatistic() returns True? """
 
     multipliers = dict(k=1000, M=1e6, G=1e9)
 
@@ -48,18 +61,34 @@ class StatisticReader(IpetNode):
     SOLVERTYPE_COUENNE = "Couenne"
     solvertype = SOLVERTYPE_SCIP
 
+    SCIP_SOLVERIDS = (SCIPSolver.solverId, FiberSCIPSolver.solverId)
+    """ ids of the solvers whose logs contain the SCIP statistics """
+    solverids = None
+    """ ids of the solvers whose logs this reader extracts data from, see Solver.solverId, or None for the logs of all solvers """
+
     @staticmethod
     def boolfunction(value):
         """ parses string TRUE or FALSE and returns the boolean value of this expression """
         return True if value == "TRUE" else False
 
-    @staticmethod
-    def changeSolverType(newtype):
-        StatisticReader.solvertype = newtype
+    def changeSolverType(self, newtype):
+        """ changes the solver type of this reader, which does not affect other readers """
+        self.solvertype = newtype
 
     def setTestRun(self, testrun):
         self.testrun = testrun
 
+    def getSessionCopy(self, testrun):
+        """
+        returns a copy of this reader that stores its data in the given test run, see ParseSession
+
+        The copy shares the compiled expressions of this reader. Readers that change mutable attributes
+        in place while reading must give their copy its own attributes.
+        """
+        reader = copy.copy(self)
+        reader.setTestRun(testrun)
+        return reader
+
     def supportsContext(self, context):
         """
         returns True if the reader supports a given context, otherwise False
@@ -69,6 +98,58 @@ class StatisticReader(IpetNode):
         else:
             return context in self.context
 
+    def getLinePrefixes(self):
+        """
+        returns a tuple of literal prefixes of all lines relevant for this reader, or None if there is no such tuple
+        """
+        return self.lineprefixes
+
+    def getLineSubstrings(self):
+        """
+        returns a tuple of literal strings, one of which is contained in every line relevant for this reader, or None
+        """
+        return self.linesubstrings
+
+    def getLinePattern(self):
+        """
+        returns a regular expression pattern that is found in every line relevant for this reader, or None
+        """
+        return self.linepattern
+
+    def getSolverIds(self):
+        """
+        returns a tuple of the ids of the solvers whose logs this reader extracts data from, or None for all solvers
+        """
+        return self.solverids
+
+    def appliesToSolver(self, solverid : str) -> bool:
+        """
+        returns True if this reader extracts data from the logs of the solver with the given id, otherwise False
+
+        Every reader applies to the logs of an unknown solver, whose id is None.
+        """
+        solverids = self.getSolverIds()
+        return solverids is None or solverid is None or solverid in solverids
+
+    def getDatakeys(self):
+        """
+        returns a list of all data keys this reader stores data under, or None if the data keys are only known while parsing
+        """
+        if self.datakey == StatisticReader.datakey:
+            return None
+        return [self.datakey]
+
+    def canContribute(self, datakeys, patterns=()):
+        """
+        returns True if this reader may store data under one of the given data keys or under a data key that is
+        matched by one of the given regular expression patterns, otherwise False
+        """
+        readerkeys = self.getDatakeys()
+        if readerkeys is None:
+            return True
+        return any(key in datakeys for key in readerkeys) or \
+            any(re.search(pattern, key) for pattern in patterns for key in readerkeys)
+
     def getSplitLineWithRegexp(self, regular_exp, line, index=-1, startofline=False):
         if startofline == True and not re.match(regular_exp, line):
             return None
@@ -114,7 +195,10 @@ class StatisticReader(IpetNode):
         return None
 
     def operateOnLine(self, line):
-        self.extractStatistic(line)
+        """
+        extracts data from a line, returns True if the reader has found all its data of the current problem
+        """
+        return self.extractStatistic(line)
 
     def addData(self, datakey, data):
         logger.debug("Reader %s adds data" % (self.getName()))
@@ -143,6 +227,7 @@ class NodeNameReader(StatisticReader):
     context = [Key.CONTEXT_LOGFILE]
 
     nodenameexp = re.compile('^Linux (\S*) .* GNU/Linux')
+    lineprefixes = ('Linux ',)
     name = 'NodeNameReader'
     datakey = Key.NodeName
     nodename = None
@@ -175,6 +260,7 @@ class MetaDataReader(StatisticReader):
     context = [Key.CONTEXT_METAFILE, Key.CONTEXT_LOGFILE, Key.CONTEXT_ERRFILE]
 
     metadataexp = re.compile("^@\S{3,}\s+\S+$")
+    lineprefixes = ('@',)
     name = 'MetaDataReader'
     datakey = Key.MetaData
 
@@ -193,6 +279,10 @@ class MetaDataReader(StatisticReader):
             datum = datum.split('\n')[0]
             self.testrun.metadatadict[attr] = datum
 
+    def getDatakeys(self):
+        # the meta data attributes are arbitrary
+        return None
+
 class BestSolInfeasibleReader(StatisticReader):
     """
     catches the expression 'best solution is not feasible in original problem'
@@ -201,11 +291,15 @@ class BestSolInfeasibleReader(StatisticReader):
     """
     name = 'BestSolInfeasibleReader'
     regular_exp = re.compile('best solution is not feasible in original problem')
+    linesubstrings = ('best solution is not feasible in original problem',)
     datakey = Key.BestSolutionInfeasible
+    # the reader only ever stores True, further matches cannot change its data
+    sleepAfterReturn = True
 
     def extractStatistic(self, line):
         if self.regular_exp.search(line):
             self.addData(self.datakey, True)
+            return True
 
 class DateTimeReader(StatisticReader):
     """
@@ -216,6 +310,7 @@ class DateTimeReader(StatisticReader):
     name = 'DateTimeReader'  # : the name for this reader
     datetimestartexp = re.compile(r"^@03 ([0-9]+)")  # : the expression for the date time start
     datetimeendexp = re.compile(r"^@04 ([0-9]+)")  # : the expression for the date time after termination
+    lineprefixes = ('@03 ', '@04 ')
     datetimestartkey = Key.DatetimeStart  # : data key for start of run
     datetimeendkey = Key.DatetimeEnd  # : data key for end of run
 
@@ -230,13 +325,18 @@ class DateTimeReader(StatisticReader):
                 self.addData(key, timestamp)
                 break
 
+    def getDatakeys(self):
+        return [self.datetimestartkey, self.datetimeendkey]
+
 class DualLPTimeReader(StatisticReader):
     """
     reads the dual LP time
     """
     name = 'DualLPTimeReader'
     regular_exp = re.compile('^  dual LP')
+    lineprefixes = ('  dual LP',)
     datakey = Key.DualLpTime
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = float
     lineindex = 3
 
@@ -246,6 +346,7 @@ class ErrorFileReader(StatisticReader):
     """
     name = "ErrorFileReader"
     regular_exp = re.compile("returned with error code (\d+)")
+    linesubstrings = ('returned with error code ',)
     datakey = Key.ErrorCode
     context = Key.CONTEXT_ERRFILE
 
@@ -303,7 +404,9 @@ class GapReader(StatisticReader):
     """
     name = 'GapReader'
     regular_exp = re.compile('^Gap                :')
+    lineprefixes = ('Gap                :',)
     datakey = Key.Gap
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = float
     lineindex = 2
 
@@ -322,7 +425,9 @@ class MaxDepthReader(StatisticReader):
     """
     name = 'MaxDepthReader'
     regular_exp = re.compile('  max depth        :')
+    linesubstrings = ('  max depth        :',)
     datakey = Key.MaximumDepth
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = int
     lineindex = 3
 
@@ -332,7 +437,9 @@ class NodesReader(StatisticReader):
     """
     name = 'NodesReader'
     regular_exp = re.compile("^  nodes \(total\)    :")
+    lineprefixes = ('  nodes (total)    :',)
     datakey = Key.Nodes
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = int
     lineindex = 3
 
@@ -340,11 +447,13 @@ class ObjsenseReader(StatisticReader):
     name = 'ObjsenseReader'
     regular_exp = re.compile("^  Objective        : (\w*),")
     datakey = Key.ObjectiveSense
+    solverids = StatisticReader.SCIP_SOLVERIDS
     minimize = 1
     maximize = -1
     orig_prob_state = False
     orig_prob_expr = re.compile('^Original Problem   :')
     pres_prob_expr = re.compile('^Presolved Problem  :')
+    lineprefixes = ('Original Problem   :', 'Presolved Problem  :', '  Objective        : ')
 
     def extractStatistic(self, line):
         if self.orig_prob_expr.match(line):
@@ -365,6 +474,7 @@ class ObjsenseReader(StatisticReader):
 class ObjlimitReader(StatisticReader):
     name = "ObjlimitReader"
     regular_exp = re.compile("objective value limit set to")
+    linesubstrings = ('objective value limit set to',)
     datakey = Key.ObjectiveLimit
     datatype = float
     lineindex = 5
@@ -375,7 +485,9 @@ class RootNodeFixingsReader(StatisticReader):
     """
     name = 'RootNodeFixingsReader'
     regular_exp = re.compile('^  root node')
+    lineprefixes = ('  root node',)
     datakey = Key.RootNodeFixings
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = int
     lineindex = 4
 
@@ -391,17 +503,20 @@ class TimeLimitReader(StatisticReader):
                    StatisticReader.SOLVERTYPE_CBC : "@05",
                    StatisticReader.SOLVERTYPE_XPRESS : "@05",
                    StatisticReader.SOLVERTYPE_COUENNE : "^@05"}
+    linesubstrings = ('@05',)
 
     datakey = Key.TimeLimit
 
     def extractStatistic(self, line):
-        if re.search(self.timelimitreadkeys[StatisticReader.solvertype], line):
+        if re.search(self.timelimitreadkeys[self.solvertype], line):
             self.addData(self.datakey, float(line.split()[-1]))
 
 class TimeToBestReader(StatisticReader):
     name = 'TimeToBestReader'
     regular_exp = re.compile('  Primal Bound     :')
+    lineprefixes = ('  Primal Bound     :',)
     datakey = Key.TimeToBestSolution
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = float
     lineindex = 3
 
@@ -415,7 +530,9 @@ class TimeToBestReader(StatisticReader):
 class TimeToFirstReader(StatisticReader):
     name = 'TimeToFirstReader'
     regular_exp = re.compile('  First Solution   :')
+    lineprefixes = ('  First Solution   :',)
     datakey = Key.TimeToFirstSolution
+    solverids = StatisticReader.SCIP_SOLVERIDS
     datatype = float
     lineindex = 3
 
@@ -457,6 +574,11 @@ class ListReader(StatisticReader):
             raise ValueError("Error: No 'regpattern' specified for reader %s" % str(name))
         self.regular_exp = re.compile(regpattern)
         self.regpattern = regpattern
+        prefix = misc.getLiteralPrefix(regpattern)
+        self.lineprefixes = (prefix,) if prefix else None
+        substring = misc.getLiteralSubstring(regpattern)
+        self.linesubstrings = (substring,) if substring else None
+        self.linepattern = "^(?:%s)" % regpattern
         if name is None:
             name = ListReader.name
         self.name = name
@@ -506,6 +628,7 @@ Check SOL: Integrality 1 Constraints 1 Objective 1
 Maximum violations: Integrality 3.902288396999999e-06 Constraints 2.81133904261283e-05 Objective 1.47339791e-12
     """
     name = "SolCheckerReader"
+    lineprefixes = ('Read SOL: ', 'Check SOL:')
 
     def extractStatistic(self, line : str):
         if line.startswith("Read SOL: 1"):
@@ -518,3 +641,6 @@ Maximum violations: Integrality 3.902288396999999e-06 Constraints 2.811339042612
         elif line.startswith("Check SOL:"):
             self.addData(Key.SolCheckerFeas, False)
 
+    def getDatakeys(self):
+        return [Key.SolCheckerRead, Key.SolCheckerFeas]
+
@@ -12,6 +12,7 @@ please refer to README.md for how to cite IPET.
 from .StatisticReader import StatisticReader
 import re
 from ipet.misc import misc
+from .LogLine import LogLine
 
 class CustomHistoryReader(StatisticReader):
     """
@@ -58,15 +59,24 @@ class CustomHistoryReader(StatisticReader):
         """
         self.valuehistory = []
 
+    def getSessionCopy(self, testrun):
+        """
+        returns a copy of this reader with its own value history
+        """
+        reader = StatisticReader.getSessionCopy(self, testrun)
+        reader.reset()
+        return reader
+
     def extractStatistic(self, line):
-        
+        line = LogLine.fromString(line)
+
         # search for lines with at least 8 vertical bars - such lines are table lines
-        if len(self.regular_exp.findall(line)) > 8:
+        if len(line.getFields()) > 9:
         
             # parse all numbers from the table, including '-' and '--'. If there are too few or no numbers,
             # line is most certainly one of the less frequent table header lines and can be used to retrieve
             # the index of the columns, if not already done.
-            listofnumbersintable = self.numericexpression.findall(line)
+            listofnumbersintable = line.findAll(self.numericexpression)
             if len(listofnumbersintable) > 4:
                 try:
                     # parse values from the table
@@ -92,7 +102,7 @@ class CustomHistoryReader(StatisticReader):
             
             elif -1 in self.listofindices:
                 # parse indices of columns corresponding to the headers
-                splittedlinenowhitespace = list(map(str.strip, line.split('|')))
+                splittedlinenowhitespace = list(map(str.strip, line.getFields()))
                 self.listofindices = list(map(splittedlinenowhitespace.index, self.listofheaders))
     
 
@@ -103,8 +103,10 @@ class CustomReader(StatisticReader):
     def extractStatistic(self, line):
         if self.regexp.search(line):
 
-            logging.debug("Custom Reader {} found match in line \n{}".format(self.name, line.strip()))
-            logging.debug("Numerical expression matches: {}".format(", ".join(misc.numericExpression.findall(line))))
+            # many readers may match a line, avoid formatting the debug output unless it is shown
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Custom Reader {} found match in line \n{}".format(self.name, line.strip()))
+                logger.debug("Numerical expression matches: {}".format(", ".join(misc.numericExpression.findall(line))))
 
             previousdata = self.testrun.getCurrentProblemData(self.datakey)
             if self.methodint == CustomReader.METHOD_COUNT:
@@ -173,6 +175,14 @@ class CustomReader(StatisticReader):
         self.regexp = re.compile(regpattern)
         self.regpattern = regpattern
 
+        # lines are searched, the pattern must therefore be anchored to restrict the relevant lines
+        prefix = misc.getLiteralPrefix(regpattern, startofline = True)
+        self.lineprefixes = (prefix,) if prefix else None
+        # otherwise, every match still contains the longest literal text of the unanchored pattern
+        substring = misc.getLiteralSubstring(regpattern)
+        self.linesubstrings = (substring,) if substring else None
+        self.linepattern = regpattern
+
     def set_name(self, name):
         if name == self.getName():
             return
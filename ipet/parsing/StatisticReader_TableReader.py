@@ -21,8 +21,8 @@ class TableReader(StatisticReader):
              1  : 0     5
              2  : 7     9
 
-    will be parsed into flattened data keys Foo_a_1, Foo_a_2, Foo_b_1 etc. and added to the testrun with their corresponding
-    (numeric) table entry
+    will be parsed into flattened data keys Foo_a_1, Foo_a_2, Foo_b_1 etc. and added to the table data of the testrun
+    with their corresponding (numeric) table entry, see TestRun.addTableData()
 
     It can also read single column tables of the form
     Foo:
@@ -36,6 +36,7 @@ class TableReader(StatisticReader):
     tableids = ['Presolvers', 'Constraints', 'Constraint Timings', 'Propagators', 'Propagator Timings', 'Conflict Analysis',
                 'Separators', 'Branching Rules', 'Diving Statistics', 'Diving (single)', 'Diving (adaptive)', 'LP', 'Branching Analysis', 'Primal Heuristics', 'Concurrent Solvers', 'Integrals']
     columnids = ['Root Node', 'Total Time', 'B&B Tree']
+    solverids = StatisticReader.SCIP_SOLVERIDS
     active = False
     spacesepcolumnnames = ['LP Iters']
     replacecolumnnames = [''.join(sscname.split()) for sscname in spacesepcolumnnames]
@@ -91,24 +92,45 @@ class TableReader(StatisticReader):
             if self.columns != []:
 
                 # treat tables (tables with at least two data columns)
-                datakeys = ['_'.join((self.tableid, column, rowname)) for column in self.columns]
                 data = list(map(self.convertToFloat, misc.numericExpression.findall(line[colonidx + 1:])))
             else:
                 # treat vectors (tables with only one data column)
-                datakeys = ['_'.join((self.tableid, rowname))]
                 # TODO This works, why is eclipse complaining?
                 data = [self.convertToFloat(misc.numericExpression.search(line, colonidx + 1).group(0))]
 
-            # determine minimum length (necessary if more headers were recognized than actual available data)
-            minlen = min(len(datakeys), len(data))
+            # only as many values as columns are stored (necessary if more headers were recognized than actual available data)
+            self.testrun.addTableData(self.tableid, self.columns, rowname, data)
 
-            storekeys = [re.sub("[%&()]", ".", x) for x in datakeys[:minlen]]
-
-            self.addData(storekeys, data[:minlen])
+    @staticmethod
+    def getDatakey(tableid : str, column : str, rowname : str) -> str:
+        """
+        returns the flattened data key of a table entry, the column is empty for single column tables
+        """
+        if column:
+            return re.sub("[%&()]", ".", '_'.join((tableid, column, rowname)))
+        return re.sub("[%&()]", ".", '_'.join((tableid, rowname)))
 
     def execEndOfProb(self):
         self.active = False
 
+    def getDatakeyPrefixes(self):
+        """
+        returns the prefixes of the flattened data keys of all tables and single columns read by this reader
+        """
+        return [re.sub("[%&()]", ".", ''.join(tableid.split())) + "_" for tableid in self.tableids + self.columnids]
+
+    def canContribute(self, datakeys, patterns=()):
+        prefixes = tuple(self.getDatakeyPrefixes())
+        if any(key.startswith(prefixes) for key in datakeys):
+            return True
+
+        # only patterns anchored at the start of a data key can be compared to the prefixes
+        for pattern in patterns:
+            literalprefix = misc.getLiteralPrefix(pattern, startofline = True)
+            if literalprefix.startswith(prefixes) or any(prefix.startswith(literalprefix) for prefix in prefixes):
+                return True
+        return False
+
 class CustomTableReader(TableReader):
     """customizable plugin statistics reader for user plugin data tables
     """
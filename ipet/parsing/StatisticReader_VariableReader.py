@@ -21,6 +21,8 @@ class VariableReader(StatisticReader):
     name = 'VariableReader'
     varexp = re.compile(r'^  Variables        :')
     consexp = re.compile(r'^  Constraints      :')
+    lineprefixes = ('Presolved Problem  :', 'Original Problem   :', '  Variables        :', '  Constraints      :')
+    solverids = StatisticReader.SCIP_SOLVERIDS
     varkeys = ['Vars', 'BinVars', 'IntVars', 'ImplVars', 'ContVars']
     conskeys = ["InitialNCons", "MaxNCons"]
     problemtype = None
@@ -50,3 +52,6 @@ class VariableReader(StatisticReader):
             self.problemtype = None
             
         return None
+
+    def getDatakeys(self):
+        return ["%s_%s" % (problemtype, key) for problemtype in ["OriginalProblem", "PresolvedProblem"] for key in self.varkeys + self.conskeys]
@@ -56,5 +56,8 @@ class TraceFileReader(StatisticReader):
             logger.debug("Trace File Reader adds data for problem %s", probname)
             self.testrun.addDataByName(self.datakeys, datavalues, probname)
 
+    def getDatakeys(self):
+        return self.datakeys
+
 
 
@@ -11,6 +11,7 @@ please refer to README.md for how to cite IPET.
 @author: Gregor Hendel
 """
 from .ReaderManager import ReaderManager
+from .ParseSession import ParseSession
 from .StatisticReader_CustomReader import CustomReader
 from .StatisticReader_VariableReader import VariableReader
 from .StatisticReader_CustomHistoryReader import CustomHistoryReader
@@ -39,6 +39,10 @@ class Validation:
     __feas__ = 1e99
     __infeas__ = 1e100
 
+    datakeys = [Key.ProblemName, Key.SolverStatus, Key.PrimalBound, Key.DualBound, Key.ObjectiveSense, Key.ObjectiveLimit,
+                Key.SolCheckerRead, Key.SolCheckerFeas, Key.ViolationBds, Key.ViolationCons, Key.ViolationInt, Key.ViolationLP]
+    """ data keys that are read to validate the result of a problem """
+
 
     def __init__(self, solufilename : str = None, tol : float = DEFAULT_RELTOL, feastol : float = DEFAULT_FEASTOL):
         '''
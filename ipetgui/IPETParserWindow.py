@@ -113,8 +113,8 @@ class IPETLogFileView(QWidget):
         outfile = selectedtestrun.getLogFile()
 
         with open(outfile, 'r') as in_file:
-            linesstart = selectedtestrun.getProblemDataById(str(selectedproblem), "LineNumbers_BeginLogFile")
-            linesend = selectedtestrun.getProblemDataById(str(selectedproblem), "LineNumbers_EndLogFile")
+            linesstart = selectedtestrun.getProblemDataByName(str(selectedproblem), "LineNumbers_BeginLogFile")
+            linesend = selectedtestrun.getProblemDataByName(str(selectedproblem), "LineNumbers_EndLogFile")
             self.text = []
             for idx, line in enumerate(in_file):
                 if idx > linesend:
@@ -12,8 +12,12 @@ please refer to README.md for how to cite IPET.
 import unittest
 import os
 import json
+import pickle
 import re
 import shutil
+import gzip
+import tarfile
+import zipfile
 import sys
 import numpy as np
 from pandas.testing import assert_frame_equal
@@ -21,6 +25,9 @@ from ipet import Experiment
 from ipet.TestRun import TestRun
 from ipet.parsing import ListReader
 from ipet.parsing import ReaderManager
+from ipet.parsing.ParseCache import ParseCache
+from ipet.parsing.ParseProfile import ParseProfile
+from ipet.evaluation import IPETEvaluation, IPETEvaluationColumn
 from ipet import Key
 
 DATADIR = os.path.join(os.path.dirname(__file__), "data")
@@ -106,6 +113,429 @@ class ExperimentTest(unittest.TestCase):
         # ensure that the correct number of problems are properly parsed
         self.assertEqual(len(data), 411)
 
+    def test_parallelDatacollection(self):
+        fname = "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"
+        out_file = os.path.join(DATADIR, fname)
+        solu_file = os.path.join(DATADIR, "short.solu")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.addSoluFile(solu_file)
+        self.experiment.collectData()
+
+        parallelexperiment = Experiment()
+        parallelexperiment.readermanager.setNProcesses(2)
+        parallelexperiment.readermanager.parallelminsize = 0
+        parallelexperiment.addOutputFile(out_file)
+        parallelexperiment.addSoluFile(solu_file)
+        parallelexperiment.collectData()
+
+        tr = self.experiment.getTestRuns()[0]
+        trparallel = parallelexperiment.getTestRuns()[0]
+        self.assertGreater(len(parallelexperiment.readermanager.getSession(trparallel).getFileRanges()), 1)
+        self.checkTestrunsEqual(tr, trparallel, sorted(tr.getData().columns))
+
+    def test_threadedDatacollection(self):
+        fnames = ["check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out", "bell3a.out",
+                  "gurobi700-bab5.out", "cplex1280-bab5.out", "cbc298-bab5.out"]
+        for fname in fnames:
+            self.experiment.addOutputFile(os.path.join(DATADIR, fname))
+        self.experiment.collectData()
+
+        threadedexperiment = Experiment()
+        threadedexperiment.readermanager.setNThreads(4)
+        for fname in fnames:
+            threadedexperiment.addOutputFile(os.path.join(DATADIR, fname))
+        threadedexperiment.collectData()
+
+        self.assertEqual(len(self.experiment.getTestRuns()), len(fnames))
+        for tr, trthreaded in zip(self.experiment.getTestRuns(), threadedexperiment.getTestRuns()):
+            self.assertEqual(tr.getName(), trthreaded.getName())
+            assert_frame_equal(tr.getData(), trthreaded.getData())
+
+    def test_longLines(self):
+        fname = "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"
+        out_file = os.path.join(DATADIR, fname)
+        with open(out_file) as f:
+            lines = f.readlines()
+
+        # a corrupted table line on which the numeric expression of the table reader backtracks for a long time
+        heuristics = [i for i, line in enumerate(lines) if line.startswith("Primal Heuristics  :")][0]
+        lines.insert(heuristics + 1, "  corrupted        : " + "-+" * 1000000 + "\n")
+        long_file = os.path.join(TMPDIR, fname)
+        with open(long_file, "w") as f:
+            f.writelines(lines)
+
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        data = self.experiment.getTestRuns()[0].getData()
+        columns = [c for c in data.columns if not c.startswith("LineNumbers")]
+
+        # lines are not limited by default, the limit is set explicitly for corrupted log files
+        self.assertIsNone(ReaderManager.MAXLINELENGTH)
+        for skiplonglines in [False, True]:
+            experiment = Experiment()
+            experiment.readermanager.setMaxLineLength(2000, skiplonglines)
+            experiment.readermanager.setParseStatistics(True)
+            experiment.readermanager.setProfile(ParseProfile())
+            experiment.addOutputFile(long_file)
+            experiment.collectData()
+            longdata = experiment.getTestRuns()[0].getData()
+            assert_frame_equal(data[columns], longdata[columns])
+            self.assertEqual(longdata[Key.ParseLongLines].sum(), 1)
+            # the profile reports the truncated or skipped lines of every file
+            self.assertEqual(experiment.readermanager.getProfile().getFileData().set_index("File").loc[long_file, "LongLines"], 1)
+
+    def test_followDatacollection(self):
+        fname = "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"
+        with open(os.path.join(DATADIR, fname), "rb") as f:
+            content = f.read()
+
+        # the log file grows while it is parsed, cutting it in the middle of problems
+        out_file = os.path.join(TMPDIR, fname)
+        self.experiment.readermanager.setFollow(True)
+        self.experiment.addOutputFile(out_file)
+        for end in [len(content) // 3, len(content) // 3 + 100, 2 * len(content) // 3, len(content)]:
+            with open(out_file, "wb") as f:
+                f.write(content[:end])
+            self.experiment.collectData()
+
+        tr = self.experiment.getTestRuns()[0]
+        self.assertIsNotNone(tr.getFollowState(out_file))
+
+        fullexperiment = Experiment()
+        fullexperiment.addOutputFile(out_file)
+        fullexperiment.collectData()
+        trfull = fullexperiment.getTestRuns()[0]
+        columns = sorted(trfull.getData().columns)
+        # data collected in several passes may have different column types
+        assert_frame_equal(trfull.getData()[columns], tr.getData()[columns], check_dtype = False)
+
+    def test_parseCache(self):
+        fname = "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"
+        out_file = os.path.join(TMPDIR, fname)
+        shutil.copyfile(os.path.join(DATADIR, fname), out_file)
+        trn_file = os.path.join(TMPDIR, "restored.trn")
+
+        cache = ParseCache(os.path.join(TMPDIR, "cache"))
+        configurationkey = ParseCache.getConfigurationKey(self.experiment)
+        key = cache.getKey(configurationkey, [out_file])
+        self.assertFalse(cache.restore(key, trn_file))
+
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        self.experiment.getTestRuns()[0].saveToFile(trn_file)
+        cache.store(key, trn_file)
+        os.remove(trn_file)
+        self.assertTrue(cache.restore(key, trn_file))
+        self.checkTestrunsEqual(self.experiment.getTestRuns()[0], TestRun.loadFromFile(trn_file))
+
+        # a different configuration or a modified log file must not hit the cache
+        self.experiment.addReader(ListReader("([ab]c) +([^ ]*)", "testlr"))
+        self.assertNotEqual(configurationkey, ParseCache.getConfigurationKey(self.experiment))
+        with open(out_file, "a") as f:
+            f.write("\n")
+        self.assertNotEqual(key, cache.getKey(configurationkey, [out_file]))
+
+        # unused cache files are removed, and the least recently used ones if the cache is too large
+        cache.store("old", trn_file)
+        os.utime(cache.getCacheFile("old"), (0, 0))
+        self.assertEqual(cache.prune(), 1)
+        self.assertTrue(cache.restore(key, trn_file))
+        cache.store("unused", trn_file)
+        os.utime(cache.getCacheFile("unused"), (1e9, 1e9))
+        cache.maxage = None
+        cache.maxsize = 1.5 * os.path.getsize(trn_file) / 1024 / 1024
+        self.assertEqual(cache.prune(), 1)
+        self.assertTrue(cache.restore(key, trn_file))
+        self.assertFalse(cache.restore("unused", trn_file))
+
+    def test_compressedDatacollection(self):
+        fname = "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"
+        out_file = os.path.join(DATADIR, fname)
+        gz_file = os.path.join(TMPDIR, fname + ".gz")
+        with open(out_file, "rb") as f, gzip.open(gz_file, "wb") as g:
+            g.write(f.read())
+
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+
+        compressedexperiment = Experiment()
+        compressedexperiment.addOutputFile(gz_file)
+        compressedexperiment.collectData()
+
+        tr = self.experiment.getTestRuns()[0]
+        trcompressed = compressedexperiment.getTestRuns()[0]
+        self.assertEqual(tr.getIdentification(), trcompressed.getIdentification())
+        columns = [c for c in tr.getData().columns if c not in [Key.LogFileName]]
+        self.checkTestrunsEqual(tr, trcompressed, sorted(columns))
+
+    def test_archiveDatacollection(self):
+        fnames = ["check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out", "bell3a.out", "bell3a.meta"]
+        for fname in fnames:
+            self.experiment.addOutputFile(os.path.join(DATADIR, fname))
+        self.experiment.collectData()
+        name2testrun = {tr.getIdentification() : tr for tr in self.experiment.getTestRuns()}
+
+        # the meta file follows the log file in the archive
+        tar_file = os.path.join(TMPDIR, "results.tar.gz")
+        zip_file = os.path.join(TMPDIR, "results.zip")
+        with tarfile.open(tar_file, "w:gz") as t, zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as z:
+            for fname in fnames:
+                t.add(os.path.join(DATADIR, fname), fname)
+                z.write(os.path.join(DATADIR, fname), fname)
+
+        for archivefiles in [[tar_file], [zip_file], ["%s::%s" % (tar_file, fname) for fname in fnames[1:]]]:
+            archiveexperiment = Experiment()
+            for f in archivefiles:
+                archiveexperiment.addOutputFile(f)
+            archiveexperiment.collectData()
+            for trarchive in archiveexperiment.getTestRuns():
+                tr = name2testrun[trarchive.getIdentification()]
+                columns = [c for c in tr.getData().columns if c not in [Key.LogFileName]]
+                self.checkTestrunsEqual(tr, trarchive, sorted(columns))
+            self.assertEqual(len(archiveexperiment.getTestRuns()), 2 if len(archivefiles) == 1 else 1)
+            self.assertEqual(archiveexperiment.readermanager.archives, {})
+
+    def test_directoryDatacollection(self):
+        with open(os.path.join(DATADIR, "bell3a.out")) as f:
+            lines = [line for line in f if not line.startswith(("@01", "=ready="))]
+
+        # every file of the directory is parsed as a problem of a concatenated log file
+        directory = os.path.join(TMPDIR, "instances")
+        os.mkdir(directory)
+        concatenated = os.path.join(TMPDIR, "concatenated.out")
+        with open(concatenated, "w") as c:
+            for i, problemlines in enumerate([lines, lines[:100], [], lines]):
+                filename = os.path.join(directory, "instance%d.out" % i)
+                with open(filename, "w") as f:
+                    f.writelines(problemlines)
+                c.write("@01 %s\n" % filename)
+                c.writelines(problemlines)
+                c.write("=ready=\n")
+
+        self.experiment.addOutputFile(concatenated)
+        self.experiment.collectData()
+        tr = self.experiment.getTestRuns()[0]
+
+        for nprocesses in [1, 2]:
+            directoryexperiment = Experiment()
+            directoryexperiment.readermanager.setNProcesses(nprocesses)
+            directoryexperiment.readermanager.parallelminfiles = 0
+            directoryexperiment.addOutputFile(directory)
+            directoryexperiment.collectData()
+            trdirectory = directoryexperiment.getTestRuns()[0]
+            self.assertEqual(trdirectory.getIdentification(), "instances")
+            self.assertEqual(list(trdirectory.getData()[Key.ProblemName]), ["instance%d" % i for i in range(4)])
+            self.assertEqual(list(trdirectory.getData()["LineNumbers_EndLogFile"]), [len(lines) + 1, 101, 1, len(lines) + 1])
+            columns = [c for c in tr.getData().columns if not c.startswith("LineNumbers") and c not in [Key.LogFileName]]
+            self.checkTestrunsEqual(tr, trdirectory, sorted(columns))
+
+    def test_mixedSolverDatacollection(self):
+        fnames = ["gurobi700-bab5.out", "cplex1271-bab5.out", "mipcl131-bab5.out", "cbc298-bab5.out", "gurobi700-bab5.out"]
+        columns = [Key.Solver, Key.SolverStatus, Key.PrimalBound, Key.DualBound, Key.SolvingTime, Key.Nodes]
+
+        # the solver is detected for every problem of a single log file
+        mixed_file = os.path.join(TMPDIR, "mixed.out")
+        with open(mixed_file, "w") as m:
+            for fname in fnames:
+                with open(os.path.join(DATADIR, fname)) as f:
+                    m.write(f.read())
+        self.experiment.addOutputFile(mixed_file)
+        self.experiment.collectData()
+        mixeddata = self.experiment.getTestRuns()[0].getData()
+        self.assertEqual(len(mixeddata), len(fnames))
+
+        for idx, fname in enumerate(fnames):
+            experiment = Experiment()
+            experiment.addOutputFile(os.path.join(DATADIR, fname))
+            experiment.collectData()
+            data = experiment.getTestRuns()[0].getData()
+            for column in columns:
+                self.assertEqual(data[column][0], mixeddata[column][idx], "Wrong %s of %s" % (column, fname))
+
+    def test_prunedDatacollection(self):
+        out_file = os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        data = self.experiment.getTestRuns()[0].getData()
+
+        evaluation = IPETEvaluation(index = Key.ProblemName)
+        evaluation.addColumn(IPETEvaluationColumn(origcolname = Key.Nodes))
+
+        # only readers that contribute to the evaluation are used, and they are active again afterwards
+        nreaders = len(self.experiment.getReaderManager().getManageables(True))
+        for regex, tablecolumn in [(None, False), ("^Presolvers_", True)]:
+            if regex is not None:
+                evaluation.addColumn(IPETEvaluationColumn(regex = regex))
+            experiment = Experiment()
+            experiment.addOutputFile(out_file)
+            experiment.collectData(evaluations = [evaluation])
+            pruneddata = experiment.getTestRuns()[0].getData()
+            self.assertEqual(nreaders, len(experiment.getReaderManager().getManageables(True)))
+
+            self.assertNotIn(Key.MaximumDepth, pruneddata.columns)
+            self.assertEqual(tablecolumn, "Presolvers_ExecTime_trivial" in pruneddata.columns)
+            for column in [Key.Nodes, Key.SolvingTime, Key.PrimalBound]:
+                assert_frame_equal(data[[column]], pruneddata[[column]])
+
+    def test_profiledDatacollection(self):
+        out_file = os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        data = self.experiment.getTestRuns()[0].getData()
+
+        experiment = Experiment()
+        experiment.addOutputFile(out_file)
+        readermanager = experiment.getReaderManager()
+        readermanager.setProfile(ParseProfile())
+        experiment.collectData()
+        assert_frame_equal(data, experiment.getTestRuns()[0].getData())
+
+        # the original methods are restored after the data collection
+        for obj in readermanager.getManageables() + readermanager.solvers + experiment.getTestRuns():
+            self.assertFalse(any(callable(value) for value in vars(obj).values()), "%s is still instrumented" % obj)
+
+        profiledata = readermanager.getProfile().getData().set_index("Name")
+        with open(out_file) as f:
+            nlines = len(f.readlines())
+        self.assertTrue(0 < profiledata.loc["SCIP.readLine", "Calls"] < nlines)
+        self.assertEqual(profiledata.loc["NodesReader", "Matches"], (data[Key.Nodes].notnull()).sum())
+        self.assertEqual(readermanager.getProfile().getFileData().loc[0, "Lines"], nlines)
+
+    def test_parseStatistics(self):
+        out_file = os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        data = self.experiment.getTestRuns()[0].getData()
+        self.assertNotIn(Key.ParseLines, data.columns)
+
+        parsestatisticskeys = [Key.ParseBytes, Key.ParseHistoryPoints, Key.ParseLines, Key.ParseLongLines, Key.ParseSeconds]
+        for nprocesses in [1, 2]:
+            experiment = Experiment()
+            experiment.readermanager.setParseStatistics(True)
+            experiment.readermanager.setNProcesses(nprocesses)
+            experiment.readermanager.parallelminsize = 0
+            experiment.addOutputFile(out_file)
+            experiment.collectData()
+            statisticsdata = experiment.getTestRuns()[0].getData()
+            assert_frame_equal(data, statisticsdata.drop(columns = parsestatisticskeys))
+
+            lines = statisticsdata["LineNumbers_EndLogFile"] - statisticsdata["LineNumbers_BeginLogFile"] + 1
+            self.assertTrue((statisticsdata[Key.ParseLines] == lines).all())
+            self.assertTrue((statisticsdata[Key.ParseBytes] > 0).all())
+            self.assertLessEqual(statisticsdata[Key.ParseBytes].sum(), os.path.getsize(out_file))
+            historypoints = statisticsdata[Key.PrimalBoundHistory].apply(len) + statisticsdata[Key.DualBoundHistory].apply(len)
+            self.assertTrue((statisticsdata[Key.ParseHistoryPoints] == historypoints).all())
+
+    def test_tableData(self):
+        out_file = os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        tr = self.experiment.getTestRuns()[0]
+
+        tabledata = tr.getLongTableData()
+        self.assertEqual(list(tabledata.columns), TestRun.TABLECOLUMNS)
+        self.assertEqual(tabledata["Value"].dtype, np.float64)
+        tablekeys = tr.getTableKeys()
+        self.assertIn("Presolvers_ExecTime_boundshift", tablekeys)
+        self.assertIn("RootNode_FinalDualBound", tablekeys)
+        self.assertFalse(set(tablekeys) & set(tr.data.columns))
+        self.assertTrue(set(tablekeys) <= tr.getKeySet())
+
+        # wide views only contain the requested data keys of the table data
+        data = tr.getData()
+        self.assertTrue(set(tablekeys) <= set(data.columns))
+
+        # as in a data frame of all problem data, empty cells are None if a data key has no value for any problem, otherwise NaN
+        self.assertEqual(data["ConflictAnalysis_Calls_appliedglobally"].dtype, object)
+        self.assertTrue(all(value is None for value in data["ConflictAnalysis_Calls_appliedglobally"]))
+        self.assertIsNone(tr.getProblemDataById(0, "ConflictAnalysis_Calls_appliedglobally"))
+        self.assertEqual(data["LP_Iter/sec_dualLP"].dtype, np.float64)
+        self.assertTrue(data["LP_Iter/sec_dualLP"].isnull().any())
+        narrowdata = tr.getData(["Presolvers_ExecTime_boundshift"], ["^RootNode_"])
+        self.assertEqual(sorted(set(narrowdata.columns) & set(tablekeys)),
+                         ["Presolvers_ExecTime_boundshift"] + [key for key in tablekeys if key.startswith("RootNode_")])
+        joineddata = self.experiment.getJoinedDataFor(["Presolvers_ExecTime_boundshift"])
+        self.assertEqual(set(joineddata.columns) & set(tablekeys), {"Presolvers_ExecTime_boundshift"})
+
+        for problemid in tr.getProblemIds():
+            self.assertEqual(tr.getProblemDataById(problemid, "Presolvers_ExecTime_boundshift"), data.loc[problemid, "Presolvers_ExecTime_boundshift"])
+
+        # collecting the data of a test run again, e.g., of a loaded test run, replaces its table data
+        self.experiment.collectData()
+        assert_frame_equal(tabledata, tr.getLongTableData())
+        assert_frame_equal(data[tablekeys], tr.getData()[tablekeys])
+
+        tr.deleteProblemDataById(0)
+        self.assertFalse((tr.getLongTableData()["ProblemId"] == 0).any())
+        self.assertIsNone(tr.getProblemDataById(0, "Presolvers_ExecTime_boundshift"))
+
+    def test_dataCache(self):
+        out_file = os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        tr = self.experiment.getTestRuns()[0]
+
+        # the data of all data keys is built only once until the data of the test run changes
+        data = tr.getData()
+        self.assertIs(tr.getData(), data)
+        tr.addDataById(Key.ProblemName, "renamed", 1)
+        self.assertIsNot(tr.getData(), data)
+        self.assertEqual(tr.getData().loc[1, Key.ProblemName], "renamed")
+        tr.deleteProblemDataById(1)
+        self.assertNotIn(1, tr.getData().index)
+        self.assertIsNone(pickle.loads(pickle.dumps(tr)).widedata)
+
+    def test_lazyTables(self):
+        out_file = os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        data = self.experiment.getTestRuns()[0].getData()
+        tablekeys = [key for key in data.columns if key.startswith(("Presolvers_", "Primal.Heuristics_", "LP_"))]
+        self.assertTrue(tablekeys)
+
+        for nprocesses in [1, 2]:
+            experiment = Experiment()
+            experiment.readermanager.setLazyTables(True)
+            experiment.readermanager.setNProcesses(nprocesses)
+            experiment.readermanager.parallelminsize = 0
+            experiment.addOutputFile(out_file)
+            experiment.collectData()
+            tr = experiment.getTestRuns()[0]
+            self.assertFalse(set(tablekeys) & tr.getKeySet())
+
+            # requesting a data key that is not part of a table does not parse the tables
+            experiment.getJoinedDataFor([Key.ProblemName])
+            self.assertFalse(set(tablekeys) & tr.getKeySet())
+
+            presolverskey = next(key for key in tablekeys if key.startswith("Presolvers_") and data[key].notnull()[0])
+            self.assertEqual(tr.getProblemDataById(0, presolverskey), data.loc[0, presolverskey])
+            self.assertIn(presolverskey, experiment.getJoinedDataFor([presolverskey]).columns)
+            assert_frame_equal(data.sort_index(axis = 1), tr.getData().sort_index(axis = 1))
+
+    def test_lazyTablesWithoutSolverBanner(self):
+        """
+        the problems of a log without solver banner are parsed by all readers, also if their tables are parsed lazily
+        """
+        # without a banner, the SCIP problems follow a problem whose solver is recognized
+        out_file = os.path.join(TMPDIR, "nobanner.out")
+        with open(out_file, "w") as f:
+            for filename in ["gurobi700-bab5.out", "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"]:
+                with open(os.path.join(DATADIR, filename)) as logfile:
+                    f.writelines(line for line in logfile if not line.startswith("SCIP version "))
+
+        for nprocesses in [1, 2]:
+            data = []
+            for lazytables in [False, True]:
+                experiment = Experiment()
+                experiment.readermanager.setLazyTables(lazytables)
+                experiment.readermanager.setNProcesses(nprocesses)
+                experiment.readermanager.parallelminsize = 0
+                experiment.addOutputFile(out_file)
+                experiment.collectData()
+                data.append(experiment.getTestRuns()[0].getData().sort_index(axis = 1))
+            self.assertTrue(any(key.startswith("Presolvers_") for key in data[0].columns))
+            assert_frame_equal(*data)
+
     def checkTestrunsEqual(self, tr, tr2, columns = checkColumns):
         msg = "Testruns do not have exactly same column data."
         return self.assertIsNone(assert_frame_equal(tr.getData()[columns], tr2.getData()[columns]), msg)
@@ -122,7 +552,7 @@ class ExperimentTest(unittest.TestCase):
         Experiment.loadFromFile(save_file)
 
         tr = self.experiment.getTestRuns()[0]
-        trn_file = os.path.join(DATADIR, ".testrun.trn")
+        trn_file = os.path.join(TMPDIR, ".testrun.trn")
         tr.saveToFile(trn_file)
         tr2 = TestRun.loadFromFile(trn_file)
         self.checkTestrunsEqual(tr, tr2)
@@ -150,9 +580,15 @@ class ExperimentTest(unittest.TestCase):
         data = self.experiment.getTestRuns()[0].data
 
     def test_trnfileextension(self):
-        trn_file = os.path.join(DATADIR, ".testrun.trn")
+        experiment = Experiment()
+        experiment.addOutputFile(os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"))
+        experiment.collectData()
+        trn_file = os.path.join(TMPDIR, ".testrun.trn")
+        experiment.getTestRuns()[0].saveToFile(trn_file)
+
         self.experiment.addOutputFile(trn_file)
         self.experiment.collectData()
+        self.checkTestrunsEqual(experiment.getTestRuns()[0], self.experiment.getTestRuns()[0])
 
     def test_fileExtensions(self):
         """
@@ -207,6 +643,62 @@ class ExperimentTest(unittest.TestCase):
                   (repr(values[key]), key, repr(val))
             self.assertEqual(val, values[key], msg)
 
+    def test_problemNameIndex(self):
+        fname = "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"
+        out_file = os.path.join(TMPDIR, fname)
+        shutil.copyfile(os.path.join(DATADIR, fname), out_file)
+        self.experiment.addOutputFile(out_file)
+        self.experiment.collectData()
+        names = self.experiment.getTestRuns()[0].getProblemNames()
+
+        # a trace file adds data to the problems of the log file by their names
+        trace_file = os.path.join(TMPDIR, fname.replace(".out", ".trc"))
+        with open(trace_file, "w") as f:
+            f.write("* Trace Record Definition\n")
+            for idx, name in enumerate(names):
+                f.write("%s,MIP,SCIP,NA,0,10,20,5,100,0,1,1,%d.5,NA,1.0,1.0,10,%d\n" % (name, idx, idx))
+
+        experiment = Experiment()
+        experiment.addOutputFile(out_file)
+        experiment.addOutputFile(trace_file)
+        experiment.collectData()
+        tr = experiment.getTestRuns()[0]
+
+        self.assertFalse(tr.hasProblemName("nonexistingproblem"))
+        self.assertIsNone(tr.getProblemDataByName("nonexistingproblem", Key.ProblemName))
+        for idx, name in enumerate(names):
+            self.assertTrue(tr.hasProblemName(name))
+            problemid = tr.getProblemIdsByName(name)[0]
+            self.assertEqual(tr.getProblemDataById(problemid, Key.ProblemName), name)
+            self.assertEqual(tr.getProblemDataByName(name, "ObjectiveValue"), idx + 0.5)
+
+        tr.deleteProblemDataById(tr.getProblemIdsByName(names[0])[0])
+        self.assertFalse(tr.hasProblemName(names[0]))
+
+    def test_sharedSettingsFiles(self):
+        fname = "check.bugs.scip-221aa62.linux.x86_64.gnu.opt.spx.opt97.default.set"
+        set_file = os.path.join(DATADIR, fname)
+        self.experiment.addOutputFile(set_file)
+        self.experiment.collectData()
+        values, defaultvalues = self.experiment.getTestRuns()[0].getParameterData()
+
+        # byte-identical settings files of different test runs are parsed only once
+        experiment = Experiment()
+        for name in ["first", "second", "third"]:
+            copied_file = os.path.join(TMPDIR, fname.replace("default", name))
+            shutil.copyfile(set_file, copied_file)
+            experiment.addOutputFile(copied_file)
+        experiment.collectData()
+
+        parameterdata = [tr.getParameterData() for tr in experiment.getTestRuns()]
+        self.assertEqual(len(parameterdata), 3)
+        self.assertEqual(len(experiment.readermanager.getSettingsCache()), 1)
+        for sharedvalues, shareddefaultvalues in parameterdata:
+            self.assertIs(sharedvalues, parameterdata[0][0])
+            self.assertIs(shareddefaultvalues, parameterdata[0][1])
+            self.assertEqual(sharedvalues, values)
+            self.assertEqual(shareddefaultvalues, defaultvalues)
+
     def testStatusComparisons(self):
         goodStatusList = [Key.ProblemStatusCodes.Ok, Key.ProblemStatusCodes.Better, Key.ProblemStatusCodes.SolvedNotVerified]
         badStatusList = [Key.ProblemStatusCodes.FailAbort, Key.ProblemStatusCodes.FailObjectiveValue, Key.ProblemStatusCodes.Fail]
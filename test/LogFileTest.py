@@ -0,0 +1,105 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import unittest
+import os
+import shutil
+import re
+from ipet.misc import misc
+from ipet.parsing.LogFile import LogFile
+from ipet.parsing.LogLine import LogLine
+
+DATADIR = os.path.join(os.path.dirname(__file__), "data")
+TMPDIR = os.path.join(os.path.dirname(__file__), ".tmp")
+
+class LogFileTest(unittest.TestCase):
+
+    content = b"@01 a.mps\nline 1\r\nprogress\rprogress\r@01 b.mps\nlong line\xc3\xa4\n=ready=\r\nlast"
+
+    def setUp(self):
+        try:
+            os.mkdir(TMPDIR)
+        except FileExistsError:
+            pass
+        self.filename = os.path.join(TMPDIR, "logfile.out")
+        with open(self.filename, "wb") as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        shutil.rmtree(TMPDIR)
+
+    def test_lines(self):
+        """ lines and line numbers must be the same as for a file opened in text mode, for every chunk size
+        """
+        for filename in [self.filename,
+                         os.path.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out")]:
+            with open(filename, "r", encoding = LogFile.ENCODING) as f:
+                textlines = list(enumerate(f))
+            for chunksize in [1, 7, 4096]:
+                logfile = LogFile(filename)
+                logfile.CHUNKSIZE = chunksize
+                self.assertEqual(textlines, list(logfile))
+
+    def test_findLines(self):
+        """ byte offsets and line numbers of problem boundaries must be those of the text lines
+        """
+        logfile = LogFile(self.filename)
+        found = logfile.findLines(["@01", "=ready="])
+        self.assertEqual([(offset, linenumber, prefix) for offset, linenumber, prefix in found],
+                         [(0, 0, "@01"), (36, 4, "@01"), (58, 6, "=ready=")])
+
+        textlines = list(logfile)
+        for offset, linenumber, prefix in found:
+            self.assertTrue(textlines[linenumber][1].startswith(prefix))
+            # reading from the offset continues with the same line numbers
+            self.assertEqual(textlines[linenumber:], list(LogFile(self.filename, offset, startline = linenumber)))
+
+        # ranges stop at the given end offset
+        self.assertEqual(textlines[4:6], list(LogFile(self.filename, 36, 58, 4)))
+        self.assertEqual(found[1:2], LogFile(self.filename, 36, 58, 4).findLines(["@01", "=ready="]))
+
+    def test_compressed(self):
+        """ compressed files must provide the same lines and problem boundaries as the uncompressed file
+        """
+        logfile = LogFile(self.filename)
+        textlines = list(logfile)
+        found = logfile.findLines(["@01", "=ready="])
+        for extension, compressionopen in LogFile.compression2open.items():
+            compressedfilename = self.filename + extension
+            with compressionopen(compressedfilename, "wb") as f:
+                f.write(self.content)
+            for prefetch in [True, False]:
+                compressedfile = LogFile(compressedfilename, prefetch = prefetch)
+                compressedfile.CHUNKSIZE = 7
+                self.assertTrue(compressedfile.isCompressed())
+                self.assertEqual(textlines, list(compressedfile))
+                self.assertEqual(found, compressedfile.findLines(["@01", "=ready="]))
+                self.assertEqual(textlines[4:6], list(LogFile(compressedfilename, 36, 58, 4, prefetch = prefetch)))
+
+    def test_logLine(self):
+        """ the cached tokens of a line must be the same as the tokens of the plain string
+        """
+        text = "  0.4s|     1 |     0 | cutoff | 1.861948e+05 |      --      |    Inf \n"
+        line = LogLine.fromString(text)
+        self.assertIs(line, LogLine.fromString(line))
+        self.assertEqual(line, text)
+        self.assertEqual(line.getWords(), text.split())
+        self.assertEqual(line.getFields(), text.split("|"))
+        self.assertIs(line.getFields(), line.getFields())
+
+        for expr in [misc.tablenumericExpression, re.compile(r"\d+"), re.compile(r"(\d+)\.(\d+)"), re.compile("nomatch")]:
+            expected = expr.findall(text)
+            self.assertEqual(LogLine(text).findFirst(expr), expected[0] if expected else None)
+            self.assertEqual(line.findAll(expr), expected)
+            self.assertEqual(line.findFirst(expr), expected[0] if expected else None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ import unittest
 from ipet.Experiment import Experiment
 from ipet.TestRun import TestRun
 from ipet import Key
+from ipet.misc import integrals, misc
 from os import path as osp
 DATADIR = osp.join(osp.dirname(__file__), "data")
 
@@ -29,7 +30,62 @@ class PrimalDualBoundHistoryTest(unittest.TestCase):
         pbHistory = tr.getProblemDataById(0, Key.PrimalBoundHistory)
         
         self.assertListEqual(pbHistory, correctPbHistory, "Lists should be equal\nExpected\t:{}\nGot\t:{}\n".format(correctPbHistory, pbHistory))
-        
+
+    def testHistoryCompression(self):
+        """
+        compressed histories have fewer points, but their integrals differ by at most the tolerance times their time span
+        """
+        tolerance = 1.0
+        testruns = []
+        for compression in [(None, None), (tolerance, None), (None, 20)]:
+            ex = Experiment()
+            ex.readermanager.setHistoryCompression(*compression)
+            ex.addOutputFile(osp.join(DATADIR, "scip400-memorylimit.out"))
+            ex.collectData()
+            testruns.append(ex.getTestRuns()[0])
+
+        tr, trtolerance, trmaxpoints = testruns
+        for problemid in tr.getProblemIds():
+            for historykey, boundkey, pwlinear in [(Key.PrimalBoundHistory, Key.PrimalBound, False), (Key.DualBoundHistory, Key.DualBound, True)]:
+                history = tr.getProblemDataById(problemid, historykey) or []
+                self.assertLessEqual(len(trtolerance.getProblemDataById(problemid, historykey) or []), len(history))
+                self.assertLessEqual(len(trmaxpoints.getProblemDataById(problemid, historykey) or []), 20)
+                if len(history) < 2:
+                    continue
+
+                timespan = history[-1][0] - history[0][0]
+                for reference in [history[-1][1], history[0][1], 0.0]:
+                    kw = dict(reference = reference, historytouse = historykey, xaftersolvekey = boundkey)
+                    integral = integrals.calcIntegralValue(integrals.getProcessPlotData(tr, problemid, **kw), pwlinear)
+                    compressedintegral = integrals.calcIntegralValue(integrals.getProcessPlotData(trtolerance, problemid, **kw), pwlinear)
+                    self.assertLessEqual(abs(integral - compressedintegral), tolerance * timespan + 1e-9)
+
+    def testHistoryArrays(self):
+        """
+        after data collection, the histories are stored in ragged arrays instead of the data frame of the test run
+        """
+        ex = Experiment()
+        ex.addOutputFile(osp.join(DATADIR, "check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out"))
+        ex.collectData()
+        tr = ex.getTestRuns()[0]
+        data = tr.getData()
+        for historykey in TestRun.HISTORYKEYS:
+            self.assertNotIn(historykey, tr.data.columns)
+            problemids, offsets, times, bounds = tr.getHistoryArrays(historykey)
+            self.assertEqual(len(offsets), len(problemids) + 1)
+            self.assertEqual(offsets[-1], len(times))
+            for problemid in tr.getProblemIds():
+                history = tr.getProblemDataById(problemid, historykey)
+                self.assertEqual(history, data.loc[problemid, historykey] if problemid in problemids else None)
+                if history is not None:
+                    historytimes, historybounds = tr.getHistory(problemid, historykey)
+                    self.assertEqual(list(zip(historytimes, historybounds)), history)
+                    self.assertTrue(historytimes.base is times)
+
+        for reference in [None, 0.0, 1e-10, -3.5, misc.FLOAT_INFINITY]:
+            values = [misc.FLOAT_INFINITY, -misc.FLOAT_INFINITY, 0.0, 1e-10, -3.5, 42.0]
+            self.assertEqual(list(integrals.getCplexGaps(values, reference)), [misc.getGap(value, reference, True) for value in values])
+
     
         
 
@@ -0,0 +1,201 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2018 Zuse Institute Berlin, www.zib.de
+
+Permissions are granted as stated in the license file you have obtained
+with this software. If you find the library useful for your purpose,
+please refer to README.md for how to cite IPET.
+
+@author: Gregor Hendel
+"""
+import unittest
+import re
+import os
+from ipet import Key
+from ipet.misc import misc
+from ipet.TestRun import TestRun
+from ipet.validation import Validation
+from ipet.parsing import ReaderManager, CustomReader, ListReader, TableReader
+from ipet.parsing.StatisticReader import NodesReader, TimeLimitReader, GapReader, BestSolInfeasibleReader
+
+DATADIR = os.path.join(os.path.dirname(__file__), "data")
+
+class ReaderManagerTest(unittest.TestCase):
+
+    def test_literalPrefix(self):
+        patterns = [
+            ("^SCIP Status", False, "SCIP Status"),
+            ("^  nodes \\(total\\)    :", True, "  nodes (total)    :"),
+            ("  max depth        :", True, ""),
+            ("  max depth        :", False, "  max depth        :"),
+            ("Primal Bound       : (\\S+)", False, "Primal Bound       : "),
+            ("abc?d", False, "ab"),
+            ("^[ab]c", False, ""),
+            ("a|b", False, ""),
+            ("(?:a|b)c", False, ""),
+            ("x[|]y", False, "x"),
+        ]
+        for pattern, startofline, prefix in patterns:
+            self.assertEqual(misc.getLiteralPrefix(pattern, startofline), prefix,
+                             "Wrong literal prefix for pattern '%s'" % pattern)
+
+    def test_literalSubstring(self):
+        patterns = [
+            ("\\s+key12: +\\d", "key12: "),
+            ("abc?d", "ab"),
+            ("a|b", ""),
+            ("(?i)nodes", ""),
+            ("x(ab|c)yz", "yz"),
+            ("[abc]def[^]x]gh", "def"),
+            ("\\d+ (\\w+) limit +(\\S+)", " limit "),
+            ("foo(?:bar)?bazz", "bazz"),
+            ("\\x41BC: ", "BC: "),
+            ("\\101BC: ", "BC: "),
+            ("\\0BC: ", "BC: "),
+            ("\\u0041BC: ", "BC: "),
+            ("\\U00000041BC: ", "BC: "),
+            ("\\N{LATIN CAPITAL LETTER A}BC: ", "BC: "),
+            ("(a)\\1BC", "BC"),
+        ]
+        for pattern, substring in patterns:
+            self.assertEqual(misc.getLiteralSubstring(pattern), substring,
+                             "Wrong literal substring for pattern '%s'" % pattern)
+
+    def test_triePattern(self):
+        literals = ["Time", "Timer", "Total", "Solving Time", "a.b"]
+        expr = re.compile(misc.getTriePattern(literals))
+        for text, match in [("Timer x", "Timer"), ("Time x", "Time"), ("Tot", None), ("axb", None), ("a.b", "a.b"), ("Solving Timer", "Solving Time")]:
+            found = expr.match(text)
+            self.assertEqual(found.group() if found else None, match, "Wrong match in '%s'" % text)
+
+    def test_lineDispatch(self):
+        rm = ReaderManager()
+        nodesreader = NodesReader()
+        timelimitreader = TimeLimitReader()
+        tablereader = TableReader()
+        customreader = CustomReader(name = "anchored", regpattern = "^  Anchored", datakey = "Anchored")
+        unanchoredreader = CustomReader(name = "unanchored", regpattern = "Unanchored", datakey = "Unanchored")
+        patternreader = CustomReader(name = "pattern", regpattern = "\\s+[0-9]+$", datakey = "Pattern")
+        listreader = ListReader("Key(\\S+) +(\\S+)", "listreader")
+
+        session = rm.getSession(TestRun())
+        session.setupLineDispatch([nodesreader, timelimitreader, tablereader, customreader, unanchoredreader, patternreader, listreader])
+
+        self.assertIn(tablereader, session.unrestrictedreaders)
+        self.assertIn(patternreader, session.patternreaders)
+        self.assertIn(unanchoredreader, session.substring2readers["Unanchored"])
+        self.assertIn(timelimitreader, session.substring2readers[timelimitreader.linesubstrings[0]])
+        self.assertIn(nodesreader, session.prefix2readers[nodesreader.lineprefixes[0]])
+        self.assertIn(customreader, session.prefix2readers["  Anchored"])
+        self.assertIn(listreader, session.prefix2readers["Key"])
+
+    def test_fusedLineDispatch(self):
+        """ every line must be passed exactly once to every reader whose expression matches it
+        """
+        patterns = ["^Time", "^Time limit", "Time", "Solving Time", "ime l", "limit", "\\s+[0-9]+ nodes", "(?i)nodes", "(a)\\1",
+                    "[a-z]+ limit", "\\w+ Time", "[xyz] = ", "[0-9]$", "\\s+[0-9]+$", "[xyz]\\s", "\\w\\d",
+                    "\\x41BC: ", "\\101BC: ", "\\N{LATIN CAPITAL LETTER A}BC: "]
+        readers = [CustomReader(name = "reader%d" % idx, regpattern = pattern, datakey = "key%d" % idx) for idx, pattern in enumerate(patterns)]
+        listreaders = [ListReader("(\\w+) limit +(\\S+)", "listreader"), ListReader("\\s*(\\w+) = +(\\S+)", "listreader2")]
+        lines = ["Time limit 5\n", "Solving Time limit: 3\n", "  12 nodes\n", "NODES\n", "aa\n", " x = 2\n", "ABC: 5\n", "other\n", "\n"]
+
+        session = ReaderManager().getSession(TestRun())
+        session.setupLineDispatch(readers + listreaders)
+        self.assertGreater(len(session.patternreaders), 3)
+        dispatched = []
+        for reader in readers + listreaders:
+            reader.operateOnLine = lambda line, reader = reader: dispatched.append(reader)
+
+        for line in lines:
+            del dispatched[:]
+            session.dispatchLine(line)
+            self.assertEqual(len(dispatched), len(set(dispatched)), "Line %s was passed twice to a reader" % repr(line))
+            expected = [reader for reader in readers if reader.regexp.search(line)] + \
+                       [reader for reader in listreaders if reader.regular_exp.match(line)]
+            for reader in expected:
+                self.assertIn(reader, dispatched, "Reader %s misses line %s" % (reader.getName(), repr(line)))
+            # readers that only declare a pattern receive only the lines in which their pattern is found
+            self.assertEqual([reader for reader in session.patternreaders if reader in dispatched],
+                             [reader for reader in session.patternreaders if reader in expected], "Wrong pattern readers for line %s" % repr(line))
+
+    def test_sleepingReaders(self):
+        """ a reader that has found all its data of a problem must not receive lines until the problem ends
+
+        sleeping is opt-in, readers that keep the last of several matches must receive every match
+        """
+        infeasiblereader = BestSolInfeasibleReader()
+        gapreader = GapReader()
+        testrun = TestRun(["check.test.out"])
+        testrun.setValidation(Validation())
+        session = ReaderManager().getSession(testrun)
+        session.setupLineDispatch([infeasiblereader, gapreader])
+        operated = []
+        for reader in [infeasiblereader, gapreader]:
+            reader.setTestRun(testrun)
+            reader.operateOnLine = lambda line, reader = reader, method = reader.operateOnLine: operated.append(reader) or method(line)
+
+        lines = ["best solution is not feasible in original problem\n", "Gap                :       1.00 %\n",
+                 "best solution is not feasible in original problem\n", "Gap                :       0.00 %\n"]
+        for line in lines:
+            session.dispatchLine(line)
+        self.assertEqual(operated, [infeasiblereader, gapreader, gapreader])
+        self.assertEqual(session.sleepingreaders, [infeasiblereader])
+
+        session.finishProblemParsing((len(lines), "=ready=\n"), Key.CONTEXT_LOGFILE, [])
+        self.assertEqual(session.sleepingreaders, [])
+        del operated[:]
+        session.dispatchLine(lines[0])
+        self.assertEqual(operated, [infeasiblereader])
+
+    def test_solverLineDispatch(self):
+        """ readers of the SCIP statistics must not receive the lines of other solvers
+        """
+        nodesreader = NodesReader()
+        gapreader = GapReader()
+        timelimitreader = TimeLimitReader()
+        session = ReaderManager().getSession(TestRun())
+        session.setupLineDispatch([nodesreader, gapreader, timelimitreader])
+        session.putToSleep(gapreader)
+
+        for solverid, nodesreaders in [("GUROBI", []), ("SCIP", [nodesreader]), (None, [nodesreader])]:
+            session.useLineDispatch(solverid)
+            self.assertEqual(session.prefix2readers.get(nodesreader.lineprefixes[0], []), nodesreaders)
+            self.assertEqual(session.prefix2readers.get(gapreader.lineprefixes[0], []), [])
+            self.assertEqual(session.substring2readers[timelimitreader.linesubstrings[0]], [timelimitreader])
+
+        session.wakeUpReaders()
+        self.assertEqual(session.prefix2readers[gapreader.lineprefixes[0]], [gapreader])
+    def test_parseSessions(self):
+        """ the sessions of a reader manager own all state of the data collection, the reader manager remains unchanged
+        """
+        rm = ReaderManager()
+        rm.registerDefaultReaders()
+        rm.setLazyTables(True)
+        configuration = [dict(vars(obj)) for obj in rm.getManageables() + rm.solvers]
+
+        sessions = []
+        for fname in ["check.short.scip-3.1.0.1.linux.x86_64.gnu.dbg.spx.opt85.testmode.out", "gurobi700-bab5.out"]:
+            testrun = TestRun([os.path.join(DATADIR, fname)])
+            testrun.setupForDataCollection()
+            testrun.setValidation(Validation())
+            sessions.append(rm.getSession(testrun))
+            sessions[-1].collectData()
+            self.assertGreater(len(testrun.getProblemIds()), 0)
+
+        self.assertEqual(configuration, [dict(vars(obj)) for obj in rm.getManageables() + rm.solvers])
+        for obj in rm.getManageables():
+            self.assertIsNone(getattr(obj, "testrun", None))
+
+        first, second = sessions
+        self.assertTrue(all(reader.testrun is first.testrun for reader in first.readers))
+        self.assertFalse(set(map(id, first.readers + first.solvers)) & set(map(id, second.readers + second.solvers)))
+        self.assertEqual((first.activeSolver.solverId, second.activeSolver.solverId), ("SCIP", "GUROBI"))
+
+        # a reader changes its solver type without affecting the readers of other sessions
+        timelimitreader = [reader for reader in first.readers if isinstance(reader, TimeLimitReader)][0]
+        timelimitreader.changeSolverType(TimeLimitReader.SOLVERTYPE_GUROBI)
+        self.assertTrue(all(reader.solvertype == TimeLimitReader.SOLVERTYPE_SCIP for reader in second.readers + rm.getManageables()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -633,6 +633,23 @@ class SolverTest(unittest.TestCase):
             for key in self.fileinfo.get(filename)[ALMOST].keys():
                 self.assertAlmost(filename, key)
 
+    def testMasterExpression(self):
+        """ the master expression must collect the same data as matching all patterns separately
+        """
+        for filename in self.fileinfo.keys():
+            file = self.getFileName(filename)
+            self.readFile(file)
+            masterdata = dict(self.activeSolver.data)
+            self.activeSolver.unrestrictedextractors = [self.activeSolver.extractElementaryExpressions]
+            masterexpr = self.activeSolver.masterexpr
+            self.activeSolver.masterexpr = None
+            try:
+                self.readFile(file)
+                self.assertEqual(masterdata, self.activeSolver.data, "Master expression of solver {} parsed different data from file {}".format(self.activeSolver.getName(), filename))
+            finally:
+                self.activeSolver.setupExtractors()
+            self.assertIsNotNone(masterexpr)
+
     def assertPrecise(self, filename, key):
         refvalue = self.fileinfo.get(filename)[PRECISE].get(key)
         self.assertEqual(refvalue, self.activeSolver.getData(key), "Wrong key value {}:{} parsed by solver {} from file {}".format(key, self.activeSolver.getData(key), self.activeSolver.getName(), filename))
@@ -11,6 +11,8 @@ from .FilterDataTest import FilterDataTest
 from .FillInTest import FillInTest
 from .ValidationTest import ValidationTest
 from .DiffAndEqualTest import DiffAndEqualTest
+from .ReaderManagerTest import ReaderManagerTest
+from .LogFileTest import LogFileTest
 import logging
 
 
@@ -27,7 +29,9 @@ test_cases = (
               IndexTest,
               FilterDataTest,
               ValidationTest,
-              FillInTest
+              FillInTest,
+              ReaderManagerTest,
+              LogFileTest
               )
 
 def load_tests(loader, tests, pattern):